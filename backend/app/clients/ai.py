@@ -1,19 +1,36 @@
 import logging
+import time
 from collections.abc import AsyncGenerator
 from typing import Any
 
+from app.core.ai_admission import AIAdmission, Ticket, estimate_tokens
+from app.core.ai_cache import AIResponseCache, cache_key
+from app.core.config import settings
+from app.core.metrics import ai_cache_requests, ai_streams_in_flight
+from app.core.tracing import end_span, start_span
 from app.core.translate import _
 from app.exceptions import ExternalServiceError
-from app.models.ai import ChatCompletionRequest, StreamChunk
-from openai import APIConnectionError, AuthenticationError, OpenAI
+from app.models.ai import CachedCompletion, ChatCompletionRequest, StreamChunk
+from openai import APIConnectionError, AsyncOpenAI, AuthenticationError
 
 logger = logging.getLogger(__name__)
 
 
 class AIClient:
-    def __init__(self, model: str, base_url: str | None, api_key: str | None) -> None:
-        self.client = OpenAI(base_url=base_url, api_key=api_key)
+    def __init__(
+        self,
+        model: str,
+        base_url: str | None,
+        api_key: str | None,
+        cache: AIResponseCache | None = None,
+        user_key: str | None = None,
+        admission: AIAdmission | None = None,
+    ) -> None:
+        self.client = AsyncOpenAI(base_url=base_url, api_key=api_key)
         self.model = model
+        self.cache = cache
+        self.admission = admission
+        self.user_key = user_key
         self.system_prompt = """Je bent een behulpzame assistent voor Nederlandse ambtenaren. Houd je aan de volgende richtlijnen:
       1. Communiceer altijd in formeel, correct Nederlands zonder spreektaal of Engelse leenwoorden.
       2. Gebruik de 'u'-vorm in alle communicatie om respect en professionaliteit te tonen.
@@ -26,9 +43,77 @@ class AIClient:
       9. Structureer complexe antwoorden met duidelijke kopjes en opsommingstekens voor betere leesbaarheid.
       10. Informeer gebruikers over relevante procedures, termijnen en formulieren bij vragen over overheidsprocessen."""  # noqa: E501
 
+    def _cache_key(self, chat_request: ChatCompletionRequest) -> str | None:
+        """Cache key of the request, or None if it must not be cached."""
+        if self.cache is None:
+            return None
+        scope = chat_request.cache or settings.AI_CACHE_SCOPE
+        if scope == "off" or (scope == "user" and not self.user_key):
+            return None
+        return cache_key(
+            self.model, self.system_prompt, chat_request.prompt, self.user_key if scope == "user" else None
+        )
+
+    async def start_stream(self, chat_request: ChatCompletionRequest) -> tuple[AsyncGenerator[str, Any], Ticket | None]:
+        """Look up the cache and take a place in the queue; return the answer's stream and its ticket.
+
+        Runs before the response starts, so a full queue (TooManyRequestsError) is still a 429.
+        """
+        key = self._cache_key(chat_request)
+        if key is not None and self.cache is not None:
+            cached = await self.cache.get(key)
+            ai_cache_requests.inc("hit" if cached else "miss")
+            if cached is not None:
+                return self._replay(cached), None
+
+        if self.admission is None:
+            return self._stream_completion(chat_request, key, []), None
+
+        # Cache hits skip the queue: only requests that reach the model take a slot and tokens
+        prompt_tokens = estimate_tokens(self.system_prompt) + estimate_tokens(chat_request.prompt)
+        ticket = self.admission.enqueue(self.user_key, prompt_tokens + settings.AI_ANSWER_TOKENS)
+        return self._stream_admitted(chat_request, key, self.admission, ticket, prompt_tokens), ticket
+
     async def stream_response(self, chat_request: ChatCompletionRequest) -> AsyncGenerator[str, Any]:
+        stream, _ticket = await self.start_stream(chat_request)
+        async for response in stream:
+            yield response
+
+    async def _replay(self, cached: CachedCompletion) -> AsyncGenerator[str, Any]:
+        replay = [StreamChunk(id=f"cached-{i}", content=content) for i, content in enumerate(cached.chunks)]
+        replay.append(StreamChunk(id=f"cached-{len(replay)}", finish_reason=cached.finish_reason))
+        for response in replay:
+            yield f"{response.model_dump_json()}\n\n"
+
+    async def _stream_admitted(
+        self,
+        chat_request: ChatCompletionRequest,
+        key: str | None,
+        admission: AIAdmission,
+        ticket: Ticket,
+        prompt_tokens: int,
+    ) -> AsyncGenerator[str, Any]:
+        """Report the ticket's place in the queue until it is admitted, then stream the answer."""
+        contents: list[str] = []
         try:
-            completion = self.client.chat.completions.create(
+            async for position in admission.wait(ticket):
+                queued = StreamChunk(id="queued", queue_position=position)
+                yield f"{queued.model_dump_json()}\n\n"
+            async for response in self._stream_completion(chat_request, key, contents):
+                yield response
+        finally:
+            admission.release(ticket, prompt_tokens + estimate_tokens("".join(contents)))
+
+    async def _stream_completion(
+        self, chat_request: ChatCompletionRequest, key: str | None, contents: list[str]
+    ) -> AsyncGenerator[str, Any]:
+        """Stream the model's answer, collecting its content in `contents`, and cache it if complete."""
+        ai_streams_in_flight.inc()
+        # Not made current: the stream is resumed in a different context for every chunk
+        stream_span = start_span("AI stream", model=self.model)
+        error: BaseException | None = None
+        try:
+            completion = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": self.system_prompt},
@@ -37,20 +122,35 @@ class AIClient:
                 stream=True,
             )
 
-            for chunk in completion:
+            finish_reason: str | None = None
+            async for chunk in completion:
                 response = StreamChunk(
                     id=chunk.id,
                     content=chunk.choices[0].delta.content if chunk.choices else None,
                     finish_reason=chunk.choices[0].finish_reason if chunk.choices else None,
                 )
+                if response.content:
+                    contents.append(response.content)
+                finish_reason = response.finish_reason or finish_reason
                 yield f"{response.model_dump_json()}\n\n"
 
+            # Only complete answers are cached, not ones cut off by a length limit or a filter
+            if key is not None and self.cache is not None and finish_reason == "stop":
+                answer = CachedCompletion(chunks=contents, finish_reason=finish_reason, created_at=time.time())
+                await self.cache.put(key, answer)
+
         except APIConnectionError as e:
+            error = e
             logger.exception("AI provider connection error")
             raise ExternalServiceError("AI", _("Connection failed")) from e
         except AuthenticationError as e:
+            error = e
             logger.exception("AI provider authentication failed")
             raise ExternalServiceError("AI", _("Authentication failed")) from e
         except Exception as e:
+            error = e
             logger.exception("AI provider error")
             raise ExternalServiceError("AI", _("Service temporarily unavailable")) from e
+        finally:
+            ai_streams_in_flight.dec()
+            end_span(stream_span, error)
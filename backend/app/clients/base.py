@@ -1,8 +1,13 @@
 import logging
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Collection, Generator
+from contextlib import contextmanager
 from typing import Any
 
 import httpx
+from app.context import span_name, timed
+from app.core.metrics import upstream_errors, upstream_request_duration
+from app.core.tracing import span
 from app.core.translate import _
 from app.exceptions import ExternalServiceError
 from pydantic import TypeAdapter
@@ -25,6 +30,29 @@ class BaseAPIClient:
         """Build full URL from base and path."""
         return f"{self.base_url}/{path.lstrip('/')}"
 
+    @contextmanager
+    def _timed(self, step: str = "") -> Generator[None]:
+        """Record a span of the current request for this service, e.g. "docs" or "docs-validate".
+
+        Spans without a step are upstream calls, which are also counted in the service's metrics.
+        """
+        name = span_name(self.service_name)
+        if step:
+            with timed(f"{name}-{step}"), span(f"{self.service_name} {step}"):
+                yield
+            return
+
+        start = time.perf_counter()
+        try:
+            # The traceparent of this span is added to the outgoing request by the shared HTTP client
+            with timed(name), span(self.service_name, **{"peer.service": self.service_name}):
+                yield
+        except httpx.HTTPError:
+            upstream_errors.inc(self.service_name, "transport")
+            raise
+        finally:
+            upstream_request_duration.observe(time.perf_counter() - start, self.service_name)
+
     def _auth_headers(self) -> dict[str, str]:
         """Generate authentication headers."""
         return {"Authorization": f"Bearer {self.token}"}
@@ -35,8 +63,12 @@ class BaseAPIClient:
         model_type: type[T],
         params: dict[str, Any] | None = None,
         response_parser: Callable[[dict[str, Any]], Any] | None = None,
+        empty_statuses: Collection[int] = (),
     ) -> tuple[T, dict[str, str]]:
-        """Get resource and return both data and response headers."""
+        """Get resource and return both data and response headers.
+
+        Responses with a status in empty_statuses are treated as an empty list (e.g. 304 from Nextcloud).
+        """
         try:
             url = self._build_url(path)
             kwargs: dict[str, Any] = {
@@ -45,16 +77,22 @@ class BaseAPIClient:
             }
             if self.timeout is not None:
                 kwargs["timeout"] = self.timeout
-            response = await self.client.get(url, **kwargs)
+            with self._timed():
+                response = await self.client.get(url, **kwargs)
+
+            if response.status_code in empty_statuses:
+                return TypeAdapter(model_type).validate_python([]), dict(response.headers)
 
             if response.status_code != 200:
+                upstream_errors.inc(self.service_name, "status")
                 raise ExternalServiceError(
                     self.service_name, _(f"Failed to fetch {path} (status {response.status_code})")
                 )
 
-            json_data = response.json()
-            data = response_parser(json_data) if response_parser else json_data
-            validated = TypeAdapter(model_type).validate_python(data)
+            with self._timed("validate"):
+                json_data = response.json()
+                data = response_parser(json_data) if response_parser else json_data
+                validated = TypeAdapter(model_type).validate_python(data)
             return validated, dict(response.headers)
 
         except httpx.TimeoutException:
@@ -1,53 +1,220 @@
 # pyright: reportUnknownMemberType=false, reportUnknownVariableType=false, reportAttributeAccessIssue=false, reportUnknownArgumentType=false, reportAssignmentType=false, reportCallIssue=false
-from datetime import date, datetime
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from itertools import islice
+from typing import Any
 
+import icalendar
+import recurring_ical_events  # pyright: ignore[reportMissingTypeStubs]
+from app.core.calendar_cache import calendar_cache
+from app.core.config import settings
+from app.core.task_query import SortKey, decode_cursor, encode_cursor, open_todos_queries, top_tasks
 from app.models.calendar import Calendar
-from app.models.task import Task
+from app.models.task import Task, TaskPage
 from caldav import DAVClient
 from caldav.requests import HTTPBearerAuth
+from icalendar import Component
+
+# Objects without these properties are single events and need no recurrence expansion
+RECURRENCE_PROPERTIES = ("RRULE", "RDATE", "RECURRENCE-ID")
+
+
+class ParsePool:
+    """Bounded pool that parses iCalendar data off the event loop.
+
+    At most `workers` parse jobs run at once; further requests wait for a free worker. Threads
+    keep the loop responsive; processes also take parsing off the GIL, at the cost of pickling
+    the data and the results.
+    """
+
+    def __init__(self, workers: int, processes: bool = False) -> None:
+        self.workers = workers
+        self.processes = processes
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+        if self._executor is None or self._semaphore is None:
+            executor_class = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.workers)
+            self._semaphore = asyncio.Semaphore(self.workers)
+
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._semaphore = None
+
+
+parse_pool = ParsePool(workers=settings.CALDAV_PARSE_WORKERS, processes=settings.CALDAV_PARSE_PROCESSES)
+
+
+def _as_datetime(value: date) -> datetime:
+    """All-day events have dates; they start at midnight."""
+    return value if isinstance(value, datetime) else datetime.combine(value, time.min)
+
+
+def _wall_time(value: datetime, reference: datetime) -> datetime:
+    """Drop the timezone if the reference has none, so floating and zoned times can be compared."""
+    return value.replace(tzinfo=None) if reference.tzinfo is None else value
+
+
+def _to_calendar(component: Component) -> Calendar:
+    start = _as_datetime(component.decoded("DTSTART"))
+    if "DTEND" in component:
+        end = _as_datetime(component.decoded("DTEND"))
+    elif "DURATION" in component:
+        end = start + component.decoded("DURATION")
+    else:
+        end = start
+    recurrence_id = _as_datetime(component.decoded("RECURRENCE-ID")) if "RECURRENCE-ID" in component else None
+    return Calendar(
+        title=str(component.get("SUMMARY", "")),
+        start=start,
+        end=end,
+        uid=str(component["UID"]) if "UID" in component else None,
+        recurrence_id=recurrence_id,
+    )
+
+
+def _event_key(event: Calendar) -> tuple[object, ...]:
+    """Identity of an event: its UID and RECURRENCE-ID; events without a UID by title and time."""
+    if event.uid is None:
+        return (event.title, event.start, event.end)
+    return (event.uid, event.recurrence_id)
+
+
+def parse_events(objects: list[str], start: datetime, end: datetime, max_instances: int) -> list[Calendar]:
+    """Parse calendar objects into the events that start between start and end.
+
+    Single events are read as they are: the server already selected them by time range. Only
+    recurring series are expanded, to at most max_instances occurrences each. Runs in the parse
+    pool, so it takes and returns only picklable values.
+    """
+    events: list[Calendar] = []
+    for data in objects:
+        ical = icalendar.Calendar.from_ical(data)
+        if not any(name in data for name in RECURRENCE_PROPERTIES):
+            events.extend(_to_calendar(component) for component in ical.walk("VEVENT"))
+            continue
+
+        # Occurrences come in order of start time, so the first one past the window ends the series
+        for occurrence in islice(recurring_ical_events.of(ical).after(start), max_instances):
+            event = _to_calendar(occurrence)
+            if _wall_time(event.start, end) > end:
+                break
+            events.append(event)
+    return events
+
+
+def events_by_day(events: list[Calendar], days: list[date]) -> dict[date, list[Calendar]]:
+    """Group events by the days they overlap; an event spanning several days is in each of them."""
+    grouped: dict[date, list[Calendar]] = {day: [] for day in days}
+    for event in events:
+        for day in days:
+            day_start = datetime.combine(day, time.min)
+            start, end = _wall_time(event.start, day_start), _wall_time(event.end, day_start)
+            if start < day_start + timedelta(days=1) and (end > day_start or start == day_start):
+                grouped[day].append(event)
+    return grouped
+
+
+def parse_todos(objects: list[tuple[str, str]]) -> list[Task]:
+    """Parse (href, data) calendar objects into tasks. Runs in the parse pool."""
+    tasks: list[Task] = []
+    for href, data in objects:
+        for component in icalendar.Calendar.from_ical(data).walk("VTODO"):
+            ref = href
+            if "RECURRENCE-ID" in component:
+                ref += "#" + component["RECURRENCE-ID"].to_ical().decode()
+            start = component.decoded("DTSTART") if "DTSTART" in component else None
+            due = component.decoded("DUE") if "DUE" in component else None
+            tasks.append(
+                Task(
+                    title=str(component.get("SUMMARY", "")),
+                    start=_as_datetime(start) if start else None,
+                    end=_as_datetime(due) if due else None,
+                    uid=str(component["UID"]) if "UID" in component else None,
+                    ref=ref,
+                )
+            )
+    return tasks
+
+
+def page_tasks(objects: list[tuple[str, str]], limit: int, after: SortKey | None) -> tuple[list[Task], SortKey | None]:
+    """Parse calendar objects and select a page of tasks by due date. Runs in the parse pool."""
+    return top_tasks(parse_todos(objects), limit, after)
 
 
 class CaldavClient:
-    def __init__(self, base_url: str, token: str) -> None:
+    def __init__(self, base_url: str, token: str, cache_key: str | None = None) -> None:
         self.base_url = base_url
         self.token = token
+        self.cache_key = cache_key
 
         self.client = DAVClient(url=f"{base_url}/remote.php/dav", auth=HTTPBearerAuth(token))
 
-    def get_calendars(self, check_date: date) -> list[Calendar | None]:
-        principal = self.client.principal()
-        calendars = principal.calendars()
-
-        events_today: list[Calendar | None] = []
-
-        for calendar in calendars:
-            check_date_start = datetime.combine(check_date, datetime.min.time())
-            check_date_end = datetime.combine(check_date, datetime.max.time())
-            events = calendar.search(start=check_date_start, end=check_date_end, event=True, expand=True)
-            for event in events:
-                event_instance = event.vobject_instance.vevent
-                events_today.append(
-                    Calendar(
-                        title=event_instance.summary.value,
-                        start=event_instance.dtstart.value,
-                        end=event_instance.dtend.value,
-                    )
-                )
+    def _fetch_events(self, start: datetime, end: datetime) -> list[str]:
+        """iCalendar data of the events in the window, unexpanded. Blocking: the caldav client is synchronous."""
+        calendars = self.client.principal().calendars()
+        return [event.data for calendar in calendars for event in calendar.search(start=start, end=end, event=True)]
+
+    def _fetch_todos(self, due_before: datetime | None) -> list[tuple[str, str]]:
+        """Href and iCalendar data of the open todos, filtered by the server. Blocking, like _fetch_events."""
+        calendars = self.client.principal().calendars()
+        return [
+            (str(todo.url), todo.data)
+            for calendar in calendars
+            for query in open_todos_queries(due_before)
+            for todo in calendar.search(xml=query, todo=True)
+        ]
+
+    async def get_calendars(self, check_date: date) -> list[Calendar]:
+        """Events of one day, always fetched: the day view shows new events right away."""
+        return await self.get_events(check_date, check_date, use_cache=False)
 
-        return events_today
+    async def get_events(self, start: date, end: date, use_cache: bool = True) -> list[Calendar]:
+        """Events of the days from start through end, sorted by start.
 
-    def get_tasks(self) -> list[Task]:
-        principal = self.client.principal()
-        calendars = principal.calendars()
+        Days cached for the user are reused, unless `use_cache` is False; the others are fetched
+        with one calendar-query per calendar for the window from the first to the last missing
+        day, and cached per day.
+        """
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        by_day: dict[date, list[Calendar]] = {}
+        if self.cache_key and use_cache:
+            for day in days:
+                cached = calendar_cache.get((self.cache_key, day))
+                if cached is not None:
+                    by_day[day] = cached
 
-        tasks_list: list[Task] = []
+        missing = [day for day in days if day not in by_day]
+        if missing:
+            window_start = datetime.combine(missing[0], time.min)
+            window_end = datetime.combine(missing[-1], time.max)
+            objects = await asyncio.to_thread(self._fetch_events, window_start, window_end)
+            events = await parse_pool.run(
+                parse_events, objects, window_start, window_end, settings.CALDAV_MAX_INSTANCES
+            )
+            for day, day_events in events_by_day(events, missing).items():
+                by_day[day] = day_events
+                if self.cache_key:
+                    calendar_cache.put((self.cache_key, day), day_events)
 
-        for calendar in calendars:
-            for task in calendar.todos():
-                task_instance = task.vobject_instance.vtodo
-                task_summary: str = task_instance.summary.value
-                task_start: datetime = task_instance.dtstart.value if hasattr(task_instance, "dtstart") else None
-                task_due: datetime = task_instance.due.value if hasattr(task_instance, "due") else None
-                tasks_list.append(Task(title=task_summary, start=task_start, end=task_due))
+        # Events spanning several days are in each of their days, but returned once
+        unique = {_event_key(event): event for day in days for event in by_day[day]}
+        return sorted(unique.values(), key=lambda event: event.start.replace(tzinfo=None))
 
-        return tasks_list
+    async def get_tasks(
+        self, limit: int = 50, cursor: str | None = None, due_before: datetime | None = None
+    ) -> TaskPage:
+        """A page of open tasks, sorted by due date, optionally only those due before a time."""
+        after = decode_cursor(cursor) if cursor else None
+        objects = await asyncio.to_thread(self._fetch_todos, due_before)
+        tasks, next_key = await parse_pool.run(page_tasks, objects, limit, after)
+        return TaskPage(results=tasks, next_cursor=encode_cursor(next_key) if next_key else None)
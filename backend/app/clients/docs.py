@@ -4,6 +4,7 @@ import logging
 from typing import Any
 
 from app.clients.base import BaseAPIClient
+from app.core.metrics import upstream_errors
 from app.core.translate import _
 from app.exceptions import ExternalServiceError
 from app.models.note import Note
@@ -51,14 +52,17 @@ class DocsClient(BaseAPIClient):
 
     async def post_document(self, path: str = "api/v1.0/documents/") -> Note:
         url = self._build_url(path)
-        response = await self.client.post(
-            url,
-            headers=self._auth_headers(),
-        )
+        with self._timed():
+            response = await self.client.post(
+                url,
+                headers=self._auth_headers(),
+            )
 
         if response.status_code != 201:
+            upstream_errors.inc(self.service_name, "status")
             raise ExternalServiceError("Docs", _(f"Failed to create document (status {response.status_code})"))
 
-        result = response.json()
-        note: Note = TypeAdapter(Note).validate_python(result)
+        with self._timed("validate"):
+            result = response.json()
+            note: Note = TypeAdapter(Note).validate_python(result)
         return note
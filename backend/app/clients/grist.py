@@ -1,6 +1,12 @@
+import asyncio
+import heapq
 import logging
+from itertools import islice
 
+import httpx
 from app.clients.base import BaseAPIClient
+from app.core.grist_index import grist_document_index, merge_updates
+from app.exceptions import ExternalServiceError
 from app.models.grist import GristDocument, GristOrganization, GristWorkspace
 from app.models.pagination import PaginatedResponse
 
@@ -10,6 +16,17 @@ logger = logging.getLogger(__name__)
 class GristClient(BaseAPIClient):
     service_name = "Grist"
 
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        base_url: str,
+        token: str,
+        timeout: float | None = None,
+        cache_key: str | None = None,
+    ) -> None:
+        super().__init__(http_client, base_url, token, timeout)
+        self.cache_key = cache_key
+
     async def get_organizations(self, path: str = "api/orgs") -> list[GristOrganization]:
         return await self._get_resource(path=path, model_type=list[GristOrganization])
 
@@ -17,6 +34,24 @@ class GristClient(BaseAPIClient):
         path = f"api/orgs/{organization_id}/workspaces"
         return await self._get_resource(path=path, model_type=list[GristWorkspace])
 
+    async def get_sorted_documents(self, organization_id: int) -> list[GristDocument]:
+        """All documents of an organization, most recently updated first.
+
+        When a cache_key is set, the sorted listing is reused from the user's index while it is fresh,
+        and refreshed incrementally from the previous listing when it is not.
+        """
+        entry = grist_document_index.entry((self.cache_key, organization_id)) if self.cache_key else None
+        if entry is not None and entry.is_fresh(grist_document_index.ttl):
+            return entry.value
+
+        workspaces = await self.get_workspaces(organization_id)
+        documents = [doc for workspace in workspaces for doc in workspace.docs]
+        documents = merge_updates(entry.value if entry else [], documents)
+
+        if self.cache_key:
+            grist_document_index.put((self.cache_key, organization_id), documents)
+        return documents
+
     async def get_documents(
         self,
         organization_id: int,
@@ -29,13 +64,28 @@ class GristClient(BaseAPIClient):
         page = max(1, page)
         page_size = max(1, page_size)
 
-        workspace_tasks = await self.get_workspaces(organization_id)
-
-        docs = sorted(
-            [doc for workspace in workspace_tasks for doc in workspace.docs],
-            key=lambda d: d.updated_at,
-            reverse=True,
-        )
+        docs = await self.get_sorted_documents(organization_id)
 
         offset = (page - 1) * page_size
         return PaginatedResponse[GristDocument](count=len(docs), results=docs[offset : offset + page_size])
+
+    async def get_recent_documents(self, limit: int = 5, concurrency: int = 4) -> list[GristDocument]:
+        """Most recently updated documents across all organizations of the user.
+
+        Organizations are fetched concurrently, at most `concurrency` at a time. Each listing is
+        already sorted, so they are combined with a k-way merge that stops after `limit` documents.
+        An organization that cannot be listed is left out.
+        """
+        organizations = await self.get_organizations()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(organization: GristOrganization) -> list[GristDocument]:
+            async with semaphore:
+                try:
+                    return await self.get_sorted_documents(organization.id)
+                except ExternalServiceError:
+                    logger.warning(f"Failed to list documents of Grist organization {organization.id}")
+                    return []
+
+        listings = await asyncio.gather(*(fetch(organization) for organization in organizations))
+        return list(islice(heapq.merge(*listings, key=lambda doc: doc.updated_at, reverse=True), max(0, limit)))
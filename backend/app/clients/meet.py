@@ -4,6 +4,7 @@ import logging
 from typing import Any
 
 from app.clients.base import BaseAPIClient
+from app.core.metrics import upstream_errors
 from app.core.translate import _
 from app.exceptions import ExternalServiceError
 from app.models.pagination import PaginatedResponse
@@ -44,15 +45,18 @@ class MeetClient(BaseAPIClient):
 
     async def post_room(self, name: str, path: str = "api/v1.0/rooms/") -> Room:
         url = self._build_url(path)
-        response = await self.client.post(
-            url,
-            json={"name": name},
-            headers=self._auth_headers(),
-        )
+        with self._timed():
+            response = await self.client.post(
+                url,
+                json={"name": name},
+                headers=self._auth_headers(),
+            )
 
         if response.status_code != 201:
+            upstream_errors.inc(self.service_name, "status")
             raise ExternalServiceError("Meet", _(f"Failed to create room (status {response.status_code})"))
 
-        result = response.json()
-        room: Room = TypeAdapter(Room).validate_python(result)
+        with self._timed("validate"):
+            result = response.json()
+            room: Room = TypeAdapter(Room).validate_python(result)
         return room
@@ -3,12 +3,36 @@
 Reference: https://docs.nextcloud.com/server/latest/developer_manual/client_apis/index.html
 """
 
+import asyncio
+import heapq
 import logging
+from itertools import count
 
 import defusedxml.ElementTree as ET
+import httpx
 from app.clients.base import BaseAPIClient
-from app.models.activity import Activity, FileActivity, FileActivityResponse, FileInfo
-from app.models.search import FileSearchResult
+from app.core.activity_cache import (
+    load_activity_buffer,
+    load_favorites,
+    load_nextcloud_user_id,
+    save_activity_buffer,
+    save_favorites,
+    save_nextcloud_user_id,
+)
+from app.core.config import settings
+from app.core.rate_limit import check_rate_limit
+from app.exceptions import ExternalServiceError, TooManyRequestsError
+from app.models.activity import (
+    ActivityBuffer,
+    ActivityEntry,
+    FavoritesSnapshot,
+    FileActivity,
+    FileActivityResponse,
+    FileInfo,
+)
+from app.models.search import FileSearchPage
+from app.utils.webdav import iter_multistatus_files
+from defusedxml import DefusedXmlException
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +51,17 @@ class OCSClient(BaseAPIClient):
         headers["Accept"] = "application/json"
         return headers
 
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        base_url: str,
+        token: str,
+        timeout: float | None = None,
+        cache_key: str | None = None,
+    ) -> None:
+        super().__init__(http_client, base_url, token, timeout)
+        self.cache_key = cache_key
+
     async def get_file_activities(
         self,
         limit: int = 50,
@@ -35,64 +70,202 @@ class OCSClient(BaseAPIClient):
     ) -> FileActivityResponse:
         """Get file activities with cursor-based pagination.
 
-        When is_favorite=True, fetches favorite files via WebDAV REPORT instead of the activity feed.
+        When is_favorite=True, fetches favorite files via WebDAV REPORT instead of the activity feed,
+        paginated by file id.
         Otherwise fetches activities, filters to file-related activities (including sharing),
         and returns with all files per activity preserved.
+        When a cache_key is set, pages and favorites are served from the user's cache where possible.
         """
         if is_favorite:
-            return await self._get_favorite_files()
+            return await self._get_favorite_files(limit, since)
+
+        if self.cache_key:
+            return await self._get_cached_file_activities(self.cache_key, limit, since)
+
+        activities, last_given = await self._fetch_activities({"since": since, "limit": limit})
+        return FileActivityResponse(results=self._to_file_activities(activities), last_given=last_given)
 
+    async def _fetch_activities(self, params: dict[str, int | str]) -> tuple[list[ActivityEntry], int | None]:
+        """Fetch a page of the activity feed and the x-activity-last-given cursor."""
         url_string = "ocs/v2.php/apps/activity/api/v2/activity/files"
 
-        params: dict[str, str] = {"format": "json"}
-        if since:
-            params["since"] = str(since)
-        if limit:
-            params["limit"] = str(limit)
+        query: dict[str, str] = {"format": "json"}
+        query.update({key: str(value) for key, value in params.items() if value})
 
+        # Nextcloud answers 304 Not Modified when there are no (more) activities
         activities, headers = await self._get_resource_with_headers(
             path=url_string,
-            model_type=list[Activity],
-            params=params,
+            model_type=list[ActivityEntry],
+            params=query,
             response_parser=lambda data: data.get("ocs", {}).get("data", []),
+            empty_statuses=(304,),
         )
 
-        # Filter by object_type == "files" (includes files + files_sharing apps)
-        file_activities: list[FileActivity] = []
-        for activity in activities:
-            if activity.object_type == "files":
-                file_activities.append(
-                    FileActivity(
-                        activity_id=activity.activity_id,
-                        datetime=activity.datetime,
-                        action=activity.type,
-                        files=activity.extract_files(),
-                    )
-                )
-
         # Get last_given from header for cursor-based pagination
         # Note: httpx returns headers in lowercase
         last_given_str = headers.get("x-activity-last-given")
         last_given = int(last_given_str) if last_given_str else None
 
-        return FileActivityResponse(results=file_activities, last_given=last_given)
+        return activities, last_given
+
+    @staticmethod
+    def _to_file_activities(activities: list[ActivityEntry]) -> list[FileActivity]:
+        # Filter by object_type == "files" (includes files + files_sharing apps)
+        return [
+            FileActivity(
+                activity_id=activity.activity_id,
+                datetime=activity.datetime,
+                action=activity.type,
+                files=activity.extract_files(),
+            )
+            for activity in activities
+            if activity.object_type == "files"
+        ]
+
+    async def _get_cached_file_activities(self, cache_key: str, limit: int, since: int) -> FileActivityResponse:
+        """Serve the activity feed from the user's buffer, fetching only what it does not cover.
+
+        A poll (since=0) fetches the activities newer than the buffer and merges them in. Pages the
+        buffer does not cover are fetched from Nextcloud and extend the buffer when they border it.
+        """
+        buffer = await load_activity_buffer(cache_key)
+
+        if buffer and not since:
+            buffer = await self._add_newer_activities(buffer)
+
+        if buffer and buffer.covers(since, limit):
+            if not since:
+                await save_activity_buffer(cache_key, buffer)
+            return buffer.to_response(since, limit)
+
+        activities, last_given = await self._fetch_activities({"since": since, "limit": limit})
+        file_activities = self._to_file_activities(activities)
+        response = FileActivityResponse(results=file_activities, last_given=last_given)
+
+        activity_ids = [activity.activity_id for activity in activities]
+        complete = len(activities) < limit
+        if not since:
+            buffer = ActivityBuffer(
+                entries=file_activities,
+                newest=max(activity_ids, default=0),
+                oldest=min(activity_ids, default=0),
+                complete=complete,
+            )
+        elif buffer and buffer.oldest <= since <= buffer.newest + 1:
+            buffer.merge(file_activities, newest=buffer.newest, oldest=min(activity_ids, default=buffer.oldest))
+            buffer.complete = complete
+        else:
+            return response
+
+        buffer.trim(settings.OCS_ACTIVITY_CACHE_SIZE)
+        await save_activity_buffer(cache_key, buffer)
+        return response
+
+    async def _add_newer_activities(self, buffer: ActivityBuffer) -> ActivityBuffer | None:
+        """Merge activities newer than the buffer. Returns None if the buffer cannot be brought up to date."""
+        if not buffer.newest:
+            return None
+
+        batch_size = settings.OCS_ACTIVITY_CACHE_SIZE
+        try:
+            activities, _ = await self._fetch_activities({"since": buffer.newest, "sort": "asc", "limit": batch_size})
+        except ExternalServiceError:
+            # e.g. 404 when the newest cached activity has expired on the server
+            logger.info("Could not fetch activities newer than the cached feed, rebuilding it")
+            return None
+
+        if len(activities) >= batch_size:
+            # More new activities than fit in one batch: there is a gap, start over
+            return None
+
+        if activities:
+            activity_ids = [activity.activity_id for activity in activities]
+            buffer.merge(self._to_file_activities(activities), newest=max(activity_ids), oldest=buffer.oldest)
+        return buffer
+
+    async def _get_favorite_files(self, limit: int, since: int) -> FileActivityResponse:
+        """Get a page of favorite files, newest (highest file id) first.
+
+        The cursor is the file id of the last file given, so pages stay stable when favorites
+        are added or removed in between.
+        """
+        favorites = await self._get_favorites_index()
+        if since:
+            favorites = [favorite for favorite in favorites if (favorite.files[0].id or 0) < since]
+
+        results = favorites[:limit]
+        last_given = results[-1].files[0].id if results and len(favorites) > limit else None
+        return FileActivityResponse(results=results, last_given=last_given)
 
-    async def _get_favorite_files(self) -> FileActivityResponse:
-        """Fetch favorite files using Nextcloud WebDAV REPORT.
+    async def _get_favorites_index(self) -> list[FileActivity]:
+        """Fetch all favorite files using Nextcloud WebDAV REPORT, sorted by file id descending.
+
+        When a cache_key is set, the Nextcloud user id is cached and the REPORT result is reused
+        as long as a PROPFIND (Depth: 0) shows the ETag of the user's root folder is unchanged.
+        The ETag is read before the REPORT, so a snapshot is never newer than the ETag it is stored with.
 
         Reference: https://docs.nextcloud.com/server/latest/developer_manual/client_apis/webdav/index.html
         """
-        # Resolve current user ID
+        user_id = await self._get_user_id()
+        if not user_id:
+            return []
+
+        if not self.cache_key:
+            return await self._report_favorites(user_id) or []
+
+        cached, etag = await asyncio.gather(load_favorites(self.cache_key), self._get_root_etag(user_id))
+        if cached and etag and cached.etag == etag:
+            return cached.results
+
+        favorites = await self._report_favorites(user_id)
+        if favorites is None:
+            return []
+
+        if etag:
+            await save_favorites(self.cache_key, FavoritesSnapshot(etag=etag, results=favorites))
+        return favorites
+
+    async def _get_user_id(self) -> str | None:
+        """Resolve the current Nextcloud user id, cached per user when a cache_key is set."""
+        if self.cache_key:
+            user_id = await load_nextcloud_user_id(self.cache_key)
+            if user_id:
+                return user_id
+
         url = self._build_url("ocs/v2.php/cloud/user")
-        user_response = await self.client.get(url, params={"format": "json"}, headers=self._auth_headers())
+        with self._timed():
+            user_response = await self.client.get(url, params={"format": "json"}, headers=self._auth_headers())
         if user_response.status_code != 200:
             logger.warning(
                 "Failed to resolve current user for favorites (status %s), returning empty results",
                 user_response.status_code,
             )
-            return FileActivityResponse(results=[], last_given=None)
-        user_id = user_response.json().get("ocs", {}).get("data", {}).get("id", "")
+            return None
+        user_id = str(user_response.json().get("ocs", {}).get("data", {}).get("id", ""))
+
+        if self.cache_key and user_id:
+            await save_nextcloud_user_id(self.cache_key, user_id)
+        return user_id
+
+    async def _get_root_etag(self, user_id: str) -> str | None:
+        """Get the ETag of the user's root folder, which changes whenever anything below it changes."""
+        xml_body = '<?xml version="1.0"?><d:propfind xmlns:d="DAV:"><d:prop><d:getetag/></d:prop></d:propfind>'
+        url = self._build_url(f"remote.php/dav/files/{user_id}/")
+        headers = self._auth_headers()
+        headers["Content-Type"] = "application/xml"
+        headers["Depth"] = "0"
+
+        with self._timed():
+            response = await self.client.request("PROPFIND", url, content=xml_body.encode(), headers=headers)
+        if response.status_code not in (200, 207):
+            logger.info("Failed to fetch root ETag (status %s), not using cached favorites", response.status_code)
+            return None
 
+        root = ET.fromstring(response.text)
+        return root.findtext(".//{DAV:}getetag") or None
+
+    async def _report_favorites(self, user_id: str) -> list[FileActivity] | None:
+        """Run the favorites REPORT across the user's tree. Returns None if Nextcloud refuses it."""
         # WebDAV REPORT to filter favorite files
         xml_body = (
             '<?xml version="1.0"?>'
@@ -108,51 +281,62 @@ class OCSClient(BaseAPIClient):
         headers["Content-Type"] = "application/xml"
         headers["Depth"] = "infinity"
 
-        response = await self.client.request("REPORT", report_url, content=xml_body.encode(), headers=headers)
-        if response.status_code not in (200, 207):
-            logger.warning(
-                "Failed to fetch favorites via WebDAV REPORT (status %s), returning empty results",
-                response.status_code,
-            )
-            return FileActivityResponse(results=[], last_given=None)
+        # The REPORT lists favorites in tree order, so the whole body is read, streamed, and only the
+        # newest (highest file id) OCS_FAVORITES_MAX_RESULTS are kept in a bounded min-heap
+        newest: list[tuple[int, int, FileInfo]] = []
+        order = count()
+        with self._timed():
+            async with self.client.stream("REPORT", report_url, content=xml_body.encode(), headers=headers) as response:
+                if response.status_code not in (200, 207):
+                    logger.warning(
+                        "Failed to fetch favorites via WebDAV REPORT (status %s), returning empty results",
+                        response.status_code,
+                    )
+                    return None
 
-        # Parse WebDAV multistatus XML response
-        DAV = "DAV:"
-        OC = "http://owncloud.org/ns"
-        root = ET.fromstring(response.text)
-        base_path = f"/remote.php/dav/files/{user_id}/"
-        file_activities: list[FileActivity] = []
-
-        for resp in root.findall(f"{{{DAV}}}response"):
-            href = resp.findtext(f"{{{DAV}}}href") or ""
-            propstat = resp.find(f"{{{DAV}}}propstat")
-            if propstat is None:
-                continue
-            if "200" not in (propstat.findtext(f"{{{DAV}}}status") or ""):
-                continue
-            prop = propstat.find(f"{{{DAV}}}prop")
-            if prop is None:
-                continue
-
-            display_name = prop.findtext(f"{{{DAV}}}displayname") or href.rstrip("/").split("/")[-1]
-            file_id_str = prop.findtext(f"{{{OC}}}fileid")
-            file_id = int(file_id_str) if file_id_str else None
-            path = href[len(base_path) :] if href.startswith(base_path) else href
-            link = f"{self.base_url}/f/{file_id}" if file_id else None
-
-            file_activities.append(FileActivity(files=[FileInfo(id=file_id, name=display_name, path=path, link=link)]))
-
-        return FileActivityResponse(results=file_activities, last_given=None)
+                files = iter_multistatus_files(
+                    response.aiter_bytes(), base_url=self.base_url, base_path=f"/remote.php/dav/files/{user_id}/"
+                )
+                try:
+                    async for file_info in files:
+                        entry = (file_info.id or 0, next(order), file_info)
+                        if len(newest) < settings.OCS_FAVORITES_MAX_RESULTS:
+                            heapq.heappush(newest, entry)
+                        else:
+                            heapq.heappushpop(newest, entry)
+                except (ET.ParseError, DefusedXmlException):
+                    logger.warning("Failed to parse favorites WebDAV REPORT response, returning empty results")
+                    return None
+
+        return [FileActivity(files=[file_info]) for _file_id, _order, file_info in sorted(newest, reverse=True)]
 
     async def search_files(
-        self, term: str, path: str = "ocs/v2.php/search/providers/files/search"
+        self,
+        term: str,
+        limit: int | None = None,
+        cursor: int | None = None,
+        path: str = "ocs/v2.php/search/providers/files/search",
     ) -> FileActivityResponse:
-        validated = await self._get_resource(
+        """Search files with Nextcloud unified search, rate limited per user when a cache_key is set.
+
+        Without a limit Nextcloud answers with its default page of 5 results. `last_given` is the
+        cursor of the next page, if Nextcloud has more.
+        """
+        if self.cache_key and not await check_rate_limit(
+            f"ocs-search:{self.cache_key}", settings.OCS_SEARCH_RATE_LIMIT, settings.OCS_SEARCH_RATE_WINDOW
+        ):
+            raise TooManyRequestsError(self.service_name, retry_after=settings.OCS_SEARCH_RATE_WINDOW)
+
+        params: dict[str, str | int] = {"format": "json", "term": term}
+        if limit is not None:
+            params["limit"] = limit
+        if cursor is not None:
+            params["cursor"] = cursor
+        page = await self._get_resource(
             path=path,
-            model_type=list[FileSearchResult],
-            params={"format": "json", "term": term},
-            response_parser=lambda data: data.get("ocs", {}).get("data", {}).get("entries", []),
+            model_type=FileSearchPage,
+            params=params,
+            response_parser=lambda data: data.get("ocs", {}).get("data") or {},
         )
-        search_results: list[FileSearchResult] = validated
-        file_activities = [FileActivity(files=[FileInfo(name=entry.name, link=entry.url)]) for entry in search_results]
-        return FileActivityResponse(results=file_activities, last_given=None)
+        file_activities = [FileActivity(files=[FileInfo(name=entry.name, link=entry.url)]) for entry in page.entries]
+        return FileActivityResponse(results=file_activities, last_given=page.cursor if page.is_paginated else None)
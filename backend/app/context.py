@@ -1,3 +1,7 @@
+import re
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
 from contextvars import ContextVar
 
 # Async-safe context variable for storing request ID
@@ -5,6 +9,36 @@ from contextvars import ContextVar
 request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
 
 
+class RequestTimings:
+    """
+    Time spent per span (session I/O, token exchange, upstream calls, validation) during one request.
+
+    Spans with the same name are summed, so repeated calls to a service show up as one entry.
+    """
+
+    __slots__ = ("durations",)
+
+    def __init__(self) -> None:
+        self.durations: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def as_milliseconds(self) -> dict[str, float]:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.durations.items()}
+
+    def server_timing(self, total_seconds: float | None = None) -> str:
+        """Format the spans as a Server-Timing header value."""
+        entries = [f"{name};dur={milliseconds}" for name, milliseconds in self.as_milliseconds().items()]
+        if total_seconds is not None:
+            entries.append(f"total;dur={round(total_seconds * 1000, 2)}")
+        return ", ".join(entries)
+
+
+# Holds a mutable RequestTimings, so spans recorded in tasks spawned by the request still reach it
+request_timings_var: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
 def get_request_id() -> str | None:
     """
     Get the current request ID from context.
@@ -17,3 +51,36 @@ def set_request_id(request_id: str) -> None:
     Set the request ID in context.
     """
     request_id_var.set(request_id)
+
+
+def start_request_timings() -> RequestTimings:
+    """
+    Start collecting span timings for the current request.
+    """
+    timings = RequestTimings()
+    request_timings_var.set(timings)
+    return timings
+
+
+def span_name(name: str) -> str:
+    """
+    Turn a name like "NextCloud OCS" into a Server-Timing metric name ("nextcloud-ocs").
+    """
+    return re.sub(r"[^a-z0-9_]+", "-", name.lower()).strip("-")
+
+
+@contextmanager
+def timed(name: str) -> Generator[None]:
+    """
+    Record the time spent in the block as a span of the current request, if timings are being collected.
+    """
+    timings = request_timings_var.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
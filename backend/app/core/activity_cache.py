@@ -0,0 +1,65 @@
+"""Per-user cache of the Nextcloud activity feed and favourite files.
+
+The buffer is stored as a single JSON value per user, so one poll costs one Redis read and one write.
+"""
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+from app.models.activity import ActivityBuffer, FavoritesSnapshot
+
+
+def _redis_key(user_key: str) -> str:
+    return f"ocs:activities:{user_key}"
+
+
+def _favorites_key(user_key: str) -> str:
+    return f"ocs:favorites:{user_key}"
+
+
+def _user_id_key(user_key: str) -> str:
+    return f"ocs:user-id:{user_key}"
+
+
+async def load_activity_buffer(user_key: str) -> ActivityBuffer | None:
+    """Get the cached activity buffer of a user."""
+
+    redis_client = get_redis_client()
+    data = await redis_client.get(_redis_key(user_key))
+    return ActivityBuffer.model_validate_json(data) if data else None
+
+
+async def save_activity_buffer(user_key: str, buffer: ActivityBuffer) -> None:
+    """Store the activity buffer of a user."""
+
+    redis_client = get_redis_client()
+    await redis_client.set(_redis_key(user_key), buffer.model_dump_json(), ex=settings.OCS_ACTIVITY_CACHE_TTL)
+
+
+async def load_favorites(user_key: str) -> FavoritesSnapshot | None:
+    """Get the cached favourite files of a user."""
+
+    redis_client = get_redis_client()
+    data = await redis_client.get(_favorites_key(user_key))
+    return FavoritesSnapshot.model_validate_json(data) if data else None
+
+
+async def save_favorites(user_key: str, favorites: FavoritesSnapshot) -> None:
+    """Store the favourite files of a user."""
+
+    redis_client = get_redis_client()
+    await redis_client.set(_favorites_key(user_key), favorites.model_dump_json(), ex=settings.OCS_FAVORITES_CACHE_TTL)
+
+
+async def load_nextcloud_user_id(user_key: str) -> str | None:
+    """Get the cached Nextcloud user id of a user."""
+
+    redis_client = get_redis_client()
+    data = await redis_client.get(_user_id_key(user_key))
+    return str(data) if data else None
+
+
+async def save_nextcloud_user_id(user_key: str, user_id: str) -> None:
+    """Store the Nextcloud user id of a user for as long as a session lasts."""
+
+    redis_client = get_redis_client()
+    await redis_client.set(_user_id_key(user_key), user_id, ex=settings.SESSION_MAX_AGE)
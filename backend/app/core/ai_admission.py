@@ -0,0 +1,250 @@
+"""Admission of AI completions: concurrency caps, a fair queue and token budgets.
+
+At most AI_MAX_STREAMS completions stream at once, and at most AI_MAX_STREAMS_PER_USER per
+user. Requests over the caps wait in a queue of at most AI_QUEUE_SIZE requests, served
+round-robin between users so one user with many requests does not hold up the others. While
+a request waits, its stream reports its place in the queue.
+
+Token budgets (AI_TOKENS_PER_MINUTE in total, AI_USER_TOKENS_PER_MINUTE per user; 0 is no
+limit) keep the load under the model's rate limit. A request is charged its prompt plus
+AI_ANSWER_TOKENS up front, and settled with the length of its actual answer when it ends.
+Tokens are estimated from characters: the model's tokenizer is not available here.
+
+The state lives in process memory and is only touched from the event loop, like the metrics.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.metrics import ai_queue_length, ai_queue_rejected, ai_queue_wait
+from app.exceptions import TooManyRequestsError
+
+CHARS_PER_TOKEN = 4
+# Per-user key of requests without a session; bearer clients share one user's allowance
+ANONYMOUS = "anonymous"
+# Seconds a client is asked to wait after finding the queue full
+QUEUE_FULL_RETRY_AFTER = 5
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class TokenBudget:
+    """Token bucket refilled with `per_minute` tokens a minute, holding at most a minute's worth."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.per_minute = per_minute
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.per_minute, self.tokens + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    def wait_time(self, tokens: int) -> float:
+        """Seconds until `tokens` can be taken. Requests over a minute's worth need a full bucket."""
+        self._refill()
+        missing = min(tokens, self.per_minute) - self.tokens
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def take(self, tokens: int) -> None:
+        """Take tokens; a negative amount returns them. The bucket may go into debt."""
+        self._refill()
+        self.tokens -= tokens
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.per_minute
+
+
+@dataclass(eq=False)
+class Ticket:
+    """A request's place in the queue and, once admitted, its streaming slot."""
+
+    user_key: str
+    tokens: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+    admitted: bool = False
+    released: bool = False
+    # Set when the ticket is admitted or its place in the queue may have changed
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class AIAdmission:
+    def __init__(
+        self,
+        max_streams: int,
+        max_streams_per_user: int,
+        queue_size: int,
+        tokens_per_minute: int = 0,
+        user_tokens_per_minute: int = 0,
+    ) -> None:
+        self.max_streams = max_streams
+        self.max_streams_per_user = max_streams_per_user
+        self.queue_size = queue_size
+        self.user_tokens_per_minute = user_tokens_per_minute
+        self._budget = TokenBudget(tokens_per_minute) if tokens_per_minute else None
+        self._user_budgets: dict[str, TokenBudget] = {}
+        # Waiting tickets per user; the order of the users is the round-robin order
+        self._queues: OrderedDict[str, deque[Ticket]] = OrderedDict()
+        self._active: dict[str, int] = {}
+        self._active_total = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def active(self) -> int:
+        return self._active_total
+
+    def enqueue(self, user_key: str | None, tokens: int) -> Ticket:
+        """Queue a request, admitting it right away if the caps and budgets allow.
+
+        Raises TooManyRequestsError if it has to wait and the queue is full.
+        """
+        ticket = Ticket(user_key=user_key or ANONYMOUS, tokens=tokens)
+        self._queues.setdefault(ticket.user_key, deque()).append(ticket)
+        self._dispatch()
+        if not ticket.admitted and self.queued > self.queue_size:
+            self._unqueue(ticket)
+            ai_queue_rejected.inc()
+            raise TooManyRequestsError("AI", retry_after=QUEUE_FULL_RETRY_AFTER)
+        return ticket
+
+    async def wait(self, ticket: Ticket) -> AsyncGenerator[int]:
+        """Yield the ticket's place in the queue whenever it changes, until it is admitted."""
+        position: int | None = None
+        while not ticket.admitted:
+            ticket.changed.clear()
+            current = self.position(ticket)
+            if current != position:
+                position = current
+                yield position
+                # The ticket may have been admitted while the consumer had the position
+                continue
+            await ticket.changed.wait()
+
+    def position(self, ticket: Ticket) -> int:
+        """Estimated 1-based place of a waiting ticket: its round in the rotation, ignoring the caps."""
+        users = list(self._queues)
+        own = users.index(ticket.user_key)
+        index = self._queues[ticket.user_key].index(ticket)
+        ahead = index
+        for order, user_key in enumerate(users):
+            if order != own:
+                # Users before this one in the rotation are served first in each round
+                ahead += min(len(self._queues[user_key]), index + 1 if order < own else index)
+        return ahead + 1
+
+    def release(self, ticket: Ticket, used_tokens: int | None = None) -> None:
+        """End a request: leave the queue, or free its slot and settle its estimate with `used_tokens`."""
+        if ticket.released:
+            return
+        ticket.released = True
+        if not ticket.admitted:
+            self._unqueue(ticket)
+        else:
+            self._active_total -= 1
+            self._active[ticket.user_key] -= 1
+            if not self._active[ticket.user_key]:
+                del self._active[ticket.user_key]
+            if used_tokens is not None:
+                for budget in self._budgets(ticket.user_key):
+                    budget.take(used_tokens - ticket.tokens)
+
+        # A user's budget is only kept while it still limits something
+        user_key = ticket.user_key
+        user_budget = self._user_budgets.get(user_key)
+        if user_budget and user_budget.full and user_key not in self._active and user_key not in self._queues:
+            del self._user_budgets[user_key]
+        self._dispatch()
+
+    def clear(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._queues.clear()
+        self._active.clear()
+        self._active_total = 0
+        self._user_budgets.clear()
+        if self._budget:
+            self._budget = TokenBudget(self._budget.per_minute)
+
+    def _budgets(self, user_key: str) -> list[TokenBudget]:
+        budgets = [self._budget] if self._budget else []
+        if self.user_tokens_per_minute:
+            if user_key not in self._user_budgets:
+                self._user_budgets[user_key] = TokenBudget(self.user_tokens_per_minute)
+            budgets.append(self._user_budgets[user_key])
+        return budgets
+
+    def _unqueue(self, ticket: Ticket) -> None:
+        queue = self._queues.get(ticket.user_key)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.user_key]
+
+    def _admit(self, ticket: Ticket) -> None:
+        self._unqueue(ticket)
+        ticket.admitted = True
+        self._active_total += 1
+        self._active[ticket.user_key] = self._active.get(ticket.user_key, 0) + 1
+        for budget in self._budgets(ticket.user_key):
+            budget.take(ticket.tokens)
+        ai_queue_wait.observe(time.monotonic() - ticket.enqueued_at)
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests round-robin between users, as far as the caps and budgets allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        retry_in: float | None = None
+        admitted = True
+        while admitted and self._queues and self._active_total < self.max_streams:
+            admitted = False
+            for user_key in list(self._queues):
+                if self._active_total >= self.max_streams:
+                    break
+                if self._active.get(user_key, 0) >= self.max_streams_per_user:
+                    continue
+                ticket = self._queues[user_key][0]
+                waits = [budget.wait_time(ticket.tokens) for budget in self._budgets(user_key)]
+                if any(waits):
+                    retry_in = max(waits) if retry_in is None else min(retry_in, max(waits))
+                    # Short of the total budget nobody goes first, so large requests are not passed over
+                    if self._budget and self._budget.wait_time(ticket.tokens):
+                        admitted = False
+                        break
+                    continue
+                self._admit(ticket)
+                if user_key in self._queues:
+                    self._queues.move_to_end(user_key)
+                ticket.changed.set()
+                admitted = True
+
+        if retry_in is not None:
+            self._timer = asyncio.get_running_loop().call_later(retry_in, self._dispatch)
+        for queue in self._queues.values():
+            for ticket in queue:
+                ticket.changed.set()
+        ai_queue_length.set(self.queued)
+
+
+ai_admission = AIAdmission(
+    max_streams=settings.AI_MAX_STREAMS,
+    max_streams_per_user=settings.AI_MAX_STREAMS_PER_USER,
+    queue_size=settings.AI_QUEUE_SIZE,
+    tokens_per_minute=settings.AI_TOKENS_PER_MINUTE,
+    user_tokens_per_minute=settings.AI_USER_TOKENS_PER_MINUTE,
+)
@@ -0,0 +1,77 @@
+"""Cache of AI answers by model, system prompt and normalized prompt.
+
+Only answers that streamed to completion are stored. A hit is replayed as a stream of the
+original chunks without calling the model. Answers are kept in process memory (least
+recently used dropped first, bounded to AI_CACHE_MAX_ENTRIES) in front of Redis, which
+shares them between replicas for AI_CACHE_TTL seconds.
+
+A user scope adds the user to the key, so a prompt with personal details is only ever
+replayed to the user who sent it.
+"""
+
+import hashlib
+import logging
+import time
+import unicodedata
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+from app.core.ttl_cache import TTLCache
+from app.models.ai import CachedCompletion
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, compatibility characters and whitespace, so trivially different prompts share an entry."""
+    return " ".join(unicodedata.normalize("NFKC", prompt).casefold().split())
+
+
+def cache_key(model: str, system_prompt: str, prompt: str, user_key: str | None = None) -> str:
+    system_hash = hashlib.sha256(system_prompt.encode()).hexdigest()
+    parts = [model, system_hash, normalize_prompt(prompt), user_key or ""]
+    digest = hashlib.sha256("\0".join(parts).encode()).hexdigest()
+    return f"ai:cache:{digest}"
+
+
+class AIResponseCache:
+    def __init__(self, ttl: int, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = TTLCache[str, CachedCompletion](ttl=ttl, max_entries=max_entries)
+
+    def _remember(self, key: str, completion: CachedCompletion) -> None:
+        # Expires with the Redis entry, which may have been stored a while ago by another replica
+        self._entries.put(key, completion, age=time.time() - completion.created_at)
+
+    async def get(self, key: str) -> CachedCompletion | None:
+        completion = self._entries.get(key)
+        if completion is not None:
+            return completion
+
+        try:
+            data = await get_redis_client().get(key)
+        except RedisError:
+            logger.warning("AI cache unavailable, asking the model", exc_info=True)
+            return None
+        if not data:
+            return None
+
+        completion = CachedCompletion.model_validate_json(data)
+        self._remember(key, completion)
+        return completion
+
+    async def put(self, key: str, completion: CachedCompletion) -> None:
+        self._remember(key, completion)
+        try:
+            await get_redis_client().set(key, completion.model_dump_json(), ex=self.ttl)
+        except RedisError:
+            logger.warning("AI cache unavailable, answer not shared", exc_info=True)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+ai_response_cache = AIResponseCache(ttl=settings.AI_CACHE_TTL, max_entries=settings.AI_CACHE_MAX_ENTRIES)
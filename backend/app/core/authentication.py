@@ -7,10 +7,14 @@ from fastapi.security import OAuth2AuthorizationCodeBearer
 
 from app.core import session
 from app.core.config import settings
+from app.core.jwks import verify_access_token
+from app.core.metrics import token_refresh_duration
 from app.core.oauth import oauth
+from app.core.tracing import span
 from app.core.translate import _
 from app.exceptions import CredentialError, TokenRefreshConflictError
-from app.models.user import User
+from app.models.user import AuthState, User
+from app.token_exchange import prefetch_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -21,16 +25,22 @@ oauth2_scheme = OAuth2AuthorizationCodeBearer(
 )
 
 
-async def get_current_user(
-    request: Request, _credentials: Annotated[OAuth2AuthorizationCodeBearer, Depends(oauth2_scheme)]
-) -> User:
+async def get_current_user(request: Request, credentials: Annotated[str | None, Depends(oauth2_scheme)]) -> User:
     """Get authenticated user, refreshing token if needed.
-    _credentials is unused but required to trigger OAuth2 flow in the swagger UI.
+    credentials is required to trigger OAuth2 flow in the swagger UI. When local token verification
+    is enabled it also carries the bearer token of non-browser clients without a session.
     """
 
+    with span("get_current_user"):
+        return await _authenticate(request, credentials)
+
+
+async def _authenticate(request: Request, credentials: str | None) -> User:
     auth = await session.get_auth(request)
 
     if not auth:
+        if credentials and settings.jwks_verification_enabled:
+            return await _get_bearer_user(request, credentials)
         raise CredentialError(_("Not authenticated"))
 
     if not auth.expires_at:
@@ -38,16 +48,61 @@ async def get_current_user(
         raise CredentialError(_("Session expired. Please log in again."))
 
     if _needs_refresh(auth.expires_at):
-        await _refresh_token(request, auth.refresh_token)
+        auth = await _refresh_session(request)
 
-        # Re-read auth to get updated tokens
-        auth = await session.get_auth(request)
-        if not auth:
-            raise CredentialError(_("Session expired. Please log in again."))
+    if settings.jwks_verification_enabled:
+        await _verify_session_token(request, auth.access_token)
 
     return auth.user
 
 
+async def _get_bearer_user(request: Request, token: str) -> User:
+    """Authenticate a bearer token from the Authorization header without a session."""
+    claims = await verify_access_token(token)
+
+    # Picked up by get_token() for the token exchange with the backend services
+    request.state.bearer_token = token
+
+    return User.from_claims(claims, name_claim=settings.OIDC_NAME_CLAIM, email_claim=settings.OIDC_EMAIL_CLAIM)
+
+
+async def _verify_session_token(request: Request, access_token: str) -> None:
+    """Verify the session's access token locally, clearing the session when it is no longer valid."""
+    try:
+        await verify_access_token(access_token)
+    except CredentialError as e:
+        logger.info("Session access token failed local verification, clearing session")
+        await session.clear_auth(request)
+        raise CredentialError(_("Session expired. Please log in again.")) from e
+
+
+async def _refresh_session(request: Request) -> AuthState:
+    """Refresh the session's tokens under the lock shared with the background refresher.
+
+    With rotating refresh tokens only one refresh per session may run at a time. A request that
+    finds the lock taken gets a 409, like one that loses the race at the IdP, and is retried.
+    """
+    session_id = request.session.get("session_id", "")
+    if not await session.acquire_refresh_lock(session_id):
+        logger.info("Token refresh already in progress for this session")
+        raise TokenRefreshConflictError
+
+    try:
+        # The previous holder of the lock may have refreshed the tokens already
+        auth = await session.get_auth(request)
+        if auth and _needs_refresh(auth.expires_at):
+            await _refresh_token(request, auth.refresh_token)
+
+            # Re-read auth to get updated tokens
+            auth = await session.get_auth(request)
+    finally:
+        await session.release_refresh_lock(session_id)
+
+    if not auth:
+        raise CredentialError(_("Session expired. Please log in again."))
+    return auth
+
+
 def _needs_refresh(expires_at: int | None) -> bool:
     """Check if token needs refresh (expired or expiring within 60s)."""
     if not expires_at:
@@ -63,10 +118,11 @@ async def _refresh_token(request: Request, refresh_token: str | None) -> None:
 
     try:
         logger.info("Refreshing access token via OAuth")
-        token = await oauth.oidc.fetch_access_token(  # type: ignore[reportUnknownMemberType]
-            grant_type="refresh_token",
-            refresh_token=refresh_token,
-        )
+        with token_refresh_duration.time_outcome("request"):
+            token = await oauth.oidc.fetch_access_token(  # type: ignore[reportUnknownMemberType]
+                grant_type="refresh_token",
+                refresh_token=refresh_token,
+            )
 
         logger.info("Access token refreshed successfully")
 
@@ -99,3 +155,7 @@ async def _refresh_token(request: Request, refresh_token: str | None) -> None:
         logger.exception("Unexpected OAuth token refresh error")
         await session.clear_auth(request)
         raise CredentialError(_("Session expired. Please log in again.")) from e
+
+    session_id = request.session.get("session_id")
+    if session_id:
+        await prefetch_tokens(session_id, str(token["access_token"]))  # type: ignore[reportUnknownArgumentType]
@@ -0,0 +1,19 @@
+"""Per-user cache of calendar events by day.
+
+Recurring events are expanded into occurrences once per fetched window. The occurrences
+are kept per user and day for CALDAV_CACHE_TTL seconds, so moving between adjacent days or
+weeks only fetches the days that are not cached yet.
+
+The cache holds at most CALDAV_CACHE_MAX_ENTRIES days, over all users.
+"""
+
+from datetime import date
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.models.calendar import Calendar
+
+# Events by (user, day)
+calendar_cache = TTLCache[tuple[str, date], list[Calendar]](
+    ttl=settings.CALDAV_CACHE_TTL, max_entries=settings.CALDAV_CACHE_MAX_ENTRIES
+)
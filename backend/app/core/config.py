@@ -5,7 +5,7 @@ from jose.constants import ALGORITHMS
 from pydantic import AnyUrl, BeforeValidator, RedisDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from app.types import LoggingLevelType
+from app.types import AICacheScope, LoggingFormatType, LoggingLevelType
 
 
 def parse_string_or_list(v: Any) -> list[str]:  # noqa: ANN401
@@ -35,6 +35,27 @@ class Settings(BaseSettings):
 
     LOGGING_LEVEL: LoggingLevelType = "INFO"
     LOGGING_CONFIG: dict[str, Any] | None = None
+    LOGGING_FORMAT: LoggingFormatType = "json"
+    LOGGING_QUEUE_SIZE: int = 10_000  # 0 writes logs on the calling thread
+    SERVER_TIMING_ENABLED: bool = False  # Expose per-request span timings to clients in a Server-Timing header
+    METRICS_ENABLED: bool = False  # Serve Prometheus metrics on /metrics, unauthenticated: not on a public ingress
+
+    # Readiness probe, answered from dependency checks that run in the background
+    READINESS_CHECKS_ENABLED: bool = True
+    READINESS_CHECK_INTERVAL: int = 10  # Seconds between check runs
+    READINESS_CHECK_TIMEOUT: float = 2.0  # Seconds before a single check counts as failed
+    READINESS_CHECK_BACKENDS: bool = False  # Also report on the enabled backend services
+
+    # Event loop watchdog: measures loop lag and logs the stack of calls that block the loop
+    LOOP_WATCHDOG_ENABLED: bool = False
+    LOOP_WATCHDOG_INTERVAL: float = 0.1  # Seconds between lag measurements
+    LOOP_WATCHDOG_THRESHOLD: float = 0.25  # Seconds the loop may be blocked before the stack is logged
+
+    # OpenTelemetry tracing, requires the OpenTelemetry SDK and OTLP exporter to be installed
+    TRACING_ENABLED: bool = False
+    TRACING_OTLP_ENDPOINT: str | None = None  # Defaults to the exporter's OTEL_EXPORTER_OTLP_* settings
+    TRACING_SAMPLE_RATIO: float = 0.05  # Share of traces recorded when the caller did not decide
+    TRACING_MAX_QUEUE_SIZE: int = 2048  # Spans waiting for export; more are dropped
 
     # Redis
     REDIS_URL: RedisDsn = RedisDsn("redis://redis:6379")
@@ -49,6 +70,9 @@ class Settings(BaseSettings):
     OIDC_TOKEN_ENDPOINT: str = ""
     OIDC_REVOCATION_ENDPOINT: str | None = None  # RFC 7009 token revocation
     OIDC_JWKS_ENDPOINT: str = ""
+    OIDC_JWKS_REFRESH_INTERVAL: int = 60 * 60  # Background signing key rotation
+    OIDC_JWKS_MIN_REFRESH_INTERVAL: int = 60  # Rate limit for refreshes triggered by an unknown kid
+    OIDC_VERIFY_ACCESS_TOKEN: bool = False  # Verify access tokens locally against the JWKS
     OIDC_USERNAME_CLAIM: str = "preferred_username"
     OIDC_NAME_CLAIM: str = "name"
     OIDC_EMAIL_CLAIM: str = "email"
@@ -58,6 +82,14 @@ class Settings(BaseSettings):
     OIDC_SIGNATURE_ALGORITM: str | list[str] = [ALGORITHMS.RS256, ALGORITHMS.HS256]
     ADMIN_ROLE_NAME: str = "admin"
 
+    # Background token refresh for active sessions
+    TOKEN_REFRESH_ENABLED: bool = True
+    TOKEN_REFRESH_INTERVAL: int = 30  # Seconds between passes over the active sessions
+    TOKEN_REFRESH_LEAD_TIME: int = 120  # Refresh when the access token expires within this many seconds
+    TOKEN_REFRESH_JITTER: int = 60  # Random extra lead time to spread refreshes
+    TOKEN_REFRESH_ACTIVE_WINDOW: int = 15 * 60  # Sessions used within this many seconds are kept fresh
+    TOKEN_REFRESH_CONCURRENCY: int = 5  # Sessions refreshed at once, each with its token exchanges at the IdP
+
     # La Suite Services
     OCS_URL: str | None = None
     OCS_AUDIENCE: str = "nextcloud"
@@ -65,6 +97,13 @@ class Settings(BaseSettings):
     OCS_TITLE: str = "NextCloud"
     OCS_IFRAME: bool = False
     OCS_CARD: bool = True
+    OCS_ACTIVITY_CACHE_SIZE: int = 200  # Activities kept per user in the activity feed cache
+    OCS_ACTIVITY_CACHE_TTL: int = 24 * 60 * 60
+    # Favourite flags do not change the root ETag, so cached favourites also expire after this many seconds
+    OCS_FAVORITES_CACHE_TTL: int = 5 * 60
+    OCS_FAVORITES_MAX_RESULTS: int = 1000  # Newest favourite files kept from a single WebDAV REPORT
+    OCS_SEARCH_RATE_LIMIT: int = 20  # Unified search requests per user per window
+    OCS_SEARCH_RATE_WINDOW: int = 10  # Seconds
 
     DOCS_URL: str | None = None
     DOCS_AUDIENCE: str = "docs"
@@ -86,6 +125,13 @@ class Settings(BaseSettings):
     TASK_TITLE: str = "Tasks"
     TASK_IFRAME: bool = False
     TASK_CARD: bool = False
+    CALDAV_PARSE_WORKERS: int = 2  # Concurrent iCalendar parse jobs, off the event loop
+    CALDAV_PARSE_PROCESSES: bool = False  # Parse in worker processes instead of threads
+    CALDAV_MAX_INSTANCES: int = 500  # Occurrences expanded per recurring event
+    CALDAV_TASKS_MAX_LIMIT: int = 200  # Tasks in one page of /caldav/tasks
+    CALDAV_MAX_RANGE_DAYS: int = 42  # Days in one calendar range request
+    CALDAV_CACHE_TTL: int = 5 * 60  # Seconds a user's expanded events of a day are reused
+    CALDAV_CACHE_MAX_ENTRIES: int = 10_000  # (user, day) entries kept per process
 
     DRIVE_URL: str | None = None
     DRIVE_AUDIENCE: str = "drive"
@@ -107,6 +153,9 @@ class Settings(BaseSettings):
     GRIST_TITLE: str = "Grist"
     GRIST_IFRAME: bool = False
     GRIST_CARD: bool = False
+    GRIST_INDEX_TTL: int = 60  # Seconds a user's sorted document listing of an organization is reused
+    GRIST_INDEX_MAX_ENTRIES: int = 1000  # (user, organization) listings kept per process
+    GRIST_ORG_CONCURRENCY: int = 4  # Organizations fetched at once for the overview of recent documents
 
     CONVERSATION_URL: str | None = None
     CONVERSATION_AUDIENCE: str = "conversation"
@@ -128,6 +177,26 @@ class Settings(BaseSettings):
     AI_CARD: bool = True
     AI_MODEL: str | None = "gpt-4o"
     AI_API_KEY: str | None = None
+    # Cache of complete answers, replayed as a stream. Prompts are only shared between users
+    # with the "shared" scope; "user" keeps them per user and "off" skips the cache
+    AI_CACHE_ENABLED: bool = False
+    AI_CACHE_SCOPE: AICacheScope = "user"  # Scope of requests that do not choose one
+    AI_CACHE_TTL: int = 24 * 60 * 60
+    AI_CACHE_MAX_ENTRIES: int = 1000  # Answers kept in process memory, in front of Redis
+    # Admission of completions: requests over the stream caps wait in a fair queue, see app/core/ai_admission.py
+    AI_MAX_STREAMS: int = 32
+    AI_MAX_STREAMS_PER_USER: int = 2
+    AI_QUEUE_SIZE: int = 100  # Requests that may wait; more are refused with 429
+    AI_TOKENS_PER_MINUTE: int = 0  # The model's rate limit to stay under; 0 is no limit
+    AI_USER_TOKENS_PER_MINUTE: int = 0
+    AI_ANSWER_TOKENS: int = 500  # Expected answer length, charged up front and settled when the answer ends
+
+    # Unified search across services
+    SEARCH_DEADLINE: float = 3.0  # Seconds to wait for the slowest service before answering with what is in
+    SEARCH_GRACE: float = 0.25  # Seconds the other services get to answer once one of them filled the page
+    SEARCH_MAX_LIMIT: int = 50
+    SEARCH_TYPEAHEAD_MIN_PREFIX: int = 2  # Shortest cached term that may answer a longer one
+    SEARCH_TYPEAHEAD_CACHE_TTL: int = 60
 
     THEME_CSS_URL: str = ""
     HELPDESK_URL: str = ""
@@ -250,6 +319,11 @@ class Settings(BaseSettings):
     def matrix_enabled(self) -> bool:
         return self.MATRIX_URL is not None
 
+    @computed_field
+    @property
+    def jwks_verification_enabled(self) -> bool:
+        return self.OIDC_VERIFY_ACCESS_TOKEN and bool(self.OIDC_JWKS_ENDPOINT)
+
     @computed_field
     @property
     def oidc_discovery_endpoint(self) -> str:
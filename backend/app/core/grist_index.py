@@ -0,0 +1,44 @@
+"""Per-user index of Grist documents, sorted by last update.
+
+Grist has no paginated document listing: the workspaces of an organization come back
+with all their documents at once. The index keeps that listing sorted per user and
+organization for GRIST_INDEX_TTL seconds, so later pages are slices of it.
+
+The index holds at most GRIST_INDEX_MAX_ENTRIES listings, over all users. A stale
+listing is not dropped: the next one is merged into its order.
+"""
+
+import heapq
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.models.grist import GristDocument
+
+
+def _updated_at(document: GristDocument) -> str:
+    return document.updated_at
+
+
+def merge_updates(previous: list[GristDocument], documents: list[GristDocument]) -> list[GristDocument]:
+    """Build a new sorted index from a fresh listing, reusing the order of the previous index.
+
+    Documents whose updatedAt did not change keep their relative order; only the new and
+    updated ones are sorted, and then merged in.
+    """
+    current = {document.id: document for document in documents}
+    unchanged = [
+        current[document.id]
+        for document in previous
+        if document.id in current and current[document.id].updated_at == document.updated_at
+    ]
+    unchanged_ids = {document.id for document in unchanged}
+    updated = sorted(
+        (document for document in documents if document.id not in unchanged_ids), key=_updated_at, reverse=True
+    )
+    return list(heapq.merge(unchanged, updated, key=_updated_at, reverse=True))
+
+
+# Sorted document listings by (user, organization)
+grist_document_index = TTLCache[tuple[str, int], list[GristDocument]](
+    ttl=settings.GRIST_INDEX_TTL, max_entries=settings.GRIST_INDEX_MAX_ENTRIES
+)
@@ -5,16 +5,21 @@ import httpx
 from fastapi import Depends
 
 from app.context import get_request_id
+from app.core.metrics import Gauge, Labels
+from app.core.tracing import inject_traceparent
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_TIMEOUT = 5.0
 DEFAULT_MAX_RETRIES = 2
+# The httpx defaults, set explicitly so the pool limit can be reported without reading httpx internals
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
 
 
 async def add_request_id_header(request: httpx.Request) -> None:
     """
-    Event hook to automatically add X-Request-ID header to outgoing requests.
+    Event hook to automatically add X-Request-ID header to outgoing requests,
+    and the W3C traceparent header of the current span when tracing is enabled.
 
     This enables distributed tracing by propagating the request ID from the
     incoming request to all downstream services.
@@ -22,6 +27,7 @@ async def add_request_id_header(request: httpx.Request) -> None:
     request_id = get_request_id()
     if request_id:
         request.headers["X-Request-ID"] = request_id
+    inject_traceparent(request.headers)
 
 
 class StatelessTransport(httpx.AsyncBaseTransport):
@@ -56,15 +62,18 @@ class HTTPClientDependency:
         self,
         timeout: float = DEFAULT_TIMEOUT,
         max_retries: int = DEFAULT_MAX_RETRIES,
+        limits: httpx.Limits = DEFAULT_LIMITS,
     ) -> None:
         self.timeout = timeout
         self.max_retries = max_retries
+        self.limits = limits
         self.http_client: httpx.AsyncClient | None = None
 
     async def __call__(self) -> httpx.AsyncClient:
         """Return the cached httpx.AsyncClient, creating it if needed."""
         if not self.http_client:
-            transport = StatelessTransport(httpx.AsyncHTTPTransport(retries=self.max_retries))
+            http_transport = httpx.AsyncHTTPTransport(retries=self.max_retries, limits=self.limits)
+            transport = StatelessTransport(http_transport)
 
             self.http_client = httpx.AsyncClient(
                 timeout=self.timeout,
@@ -83,9 +92,19 @@ class HTTPClientDependency:
             logger.info("Closed HTTP client")
             self.http_client = None
 
+    def max_connections(self) -> dict[Labels, float]:
+        limit = self.limits.max_connections
+        return {(): limit} if limit is not None else {}
+
 
 # Single shared HTTP client for the entire application
 http_client_dependency = HTTPClientDependency()
 
+Gauge(
+    "bureaublad_http_pool_max_connections",
+    "Connection limit of the shared HTTP client pool",
+    callback=http_client_dependency.max_connections,
+)
+
 # Type alias for dependency injection
 HTTPClient = Annotated[httpx.AsyncClient, Depends(http_client_dependency)]
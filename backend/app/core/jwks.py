@@ -0,0 +1,158 @@
+"""Local access token verification against the identity provider's JWKS.
+
+Signing keys are fetched once from OIDC_JWKS_ENDPOINT, indexed by their `kid`
+and refreshed in the background, so verifying a token never needs a round-trip
+to the identity provider. An unknown `kid` triggers an on-demand refresh (rate
+limited) to pick up keys that were rotated in between two background refreshes.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Any, cast
+
+from jose import jwt
+from jose.exceptions import JOSEError
+
+from app.core.config import settings
+from app.core.http_clients import http_client_dependency
+from app.core.translate import _
+from app.exceptions import CredentialError
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSCache:
+    """Process-wide cache of the identity provider's signing keys, indexed by `kid`."""
+
+    def __init__(self, refresh_interval: int, min_refresh_interval: int) -> None:
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.keys: dict[str, dict[str, Any]] = {}
+        self.last_refresh: float = 0.0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    async def refresh(self) -> None:
+        """Fetch the JWKS document and replace the cached keys."""
+        async with self._lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        # Counted from the attempt, so that fetches failing while the IdP is down are rate-limited too
+        self.last_refresh = time.monotonic()
+        http_client = await http_client_dependency()
+        response = await http_client.get(settings.OIDC_JWKS_ENDPOINT)
+        response.raise_for_status()
+
+        keys: dict[str, dict[str, Any]] = {}
+        for key in cast(list[dict[str, Any]], response.json().get("keys", [])):
+            kid = key.get("kid")
+            if isinstance(kid, str) and key.get("use", "sig") == "sig":
+                keys[kid] = key
+
+        self.keys = keys
+        logger.info(f"Loaded {len(keys)} signing keys from JWKS endpoint")
+
+    def _is_fresh(self) -> bool:
+        return time.monotonic() - self.last_refresh < self.min_refresh_interval
+
+    async def get_key(self, kid: str) -> dict[str, Any] | None:
+        """Return the key for `kid`, refreshing once if it is unknown and the cache is not too fresh."""
+        key = self.keys.get(kid)
+        if key is not None or self._is_fresh():
+            return key
+
+        async with self._lock:
+            # Requests that waited for the lock are served by the refresh that held it
+            key = self.keys.get(kid)
+            if key is not None or self._is_fresh():
+                return key
+
+            logger.info(f"Unknown signing key kid={kid}, refreshing JWKS")
+            await self._load()
+            return self.keys.get(kid)
+
+    async def _rotate(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.warning("Background JWKS refresh failed, keeping cached keys", exc_info=True)
+
+    async def start(self) -> bool:
+        """Load the keys and start the background rotation task. Returns False if it was already running."""
+        if self._task is not None:
+            return False
+
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Failed to load JWKS during startup")
+
+        self._task = asyncio.create_task(self._rotate())
+        return True
+
+    async def stop(self) -> None:
+        """Cancel the background rotation task."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+jwks_cache = JWKSCache(
+    refresh_interval=settings.OIDC_JWKS_REFRESH_INTERVAL,
+    min_refresh_interval=settings.OIDC_JWKS_MIN_REFRESH_INTERVAL,
+)
+
+
+async def verify_access_token(token: str) -> dict[str, Any]:
+    """Verify signature, expiry, issuer and audience of an access token and return its claims.
+
+    Raises CredentialError when the token cannot be verified.
+    """
+    try:
+        header = cast(dict[str, Any], jwt.get_unverified_header(token))  # type: ignore[reportUnknownMemberType]
+    except JOSEError as e:
+        raise CredentialError(_("Invalid access token")) from e
+
+    kid = header.get("kid")
+    if not isinstance(kid, str):
+        raise CredentialError(_("Invalid access token"))
+
+    try:
+        key = await jwks_cache.get_key(kid)
+    except Exception as e:
+        logger.exception("Failed to refresh JWKS while verifying access token")
+        raise CredentialError(_("Invalid access token")) from e
+
+    if key is None:
+        logger.warning(f"Access token signed with unknown key kid={kid}")
+        raise CredentialError(_("Invalid access token"))
+
+    try:
+        claims = cast(
+            dict[str, Any],
+            jwt.decode(  # type: ignore[reportUnknownMemberType]
+                token,
+                key,
+                algorithms=settings.OIDC_SIGNATURE_ALGORITM,
+                issuer=settings.OIDC_ISSUER or None,
+                options={"verify_aud": False, "verify_at_hash": False},
+            ),
+        )
+    except JOSEError as e:
+        logger.info(f"Access token verification failed: {e}")
+        raise CredentialError(_("Invalid access token")) from e
+
+    # Keycloak access tokens carry the client in `azp`, `aud` lists the resource servers.
+    audience = claims.get("aud")
+    audiences = cast(list[Any], audience) if isinstance(audience, list) else [audience]
+    if settings.OIDC_AUDIENCE not in audiences and claims.get("azp") != settings.OIDC_AUDIENCE:
+        raise CredentialError(_("Invalid token audience"))
+
+    return claims
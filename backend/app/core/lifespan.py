@@ -4,8 +4,15 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from app.clients.caldav import parse_pool
 from app.const import VERSION
+from app.core.config import settings
+from app.core.jwks import jwks_cache
+from app.core.loop_watchdog import loop_watchdog
+from app.core.readiness import readiness_monitor
 from app.core.redis import get_redis_client
+from app.core.token_refresher import token_refresher
+from app.core.translate import load_catalogs
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +27,31 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
         logger.info("Successfully connected to Redis")
     except Exception:
         logger.exception("Failed to connect to Redis during startup")
+
+    load_catalogs()
+
+    # Background tasks are process-wide; only the lifespan that started them stops them
+    watchdog_started = settings.LOOP_WATCHDOG_ENABLED and loop_watchdog.start()
+    jwks_started = settings.jwks_verification_enabled and await jwks_cache.start()
+    refresher_started = settings.TOKEN_REFRESH_ENABLED and token_refresher.start()
+    readiness_started = settings.READINESS_CHECKS_ENABLED and await readiness_monitor.start()
+
     yield
 
+    if readiness_started:
+        await readiness_monitor.stop()
+    if refresher_started:
+        await token_refresher.stop()
+    if jwks_started:
+        await jwks_cache.stop()
+    if watchdog_started:
+        await loop_watchdog.stop()
+
     # Close the shared HTTP client to clean up connection pools
     from app.core.http_clients import http_client_dependency
 
     await http_client_dependency.aclose()
+    parse_pool.shutdown()
 
     logger.info(f"Stopping application version {VERSION}")
     logging.shutdown()
@@ -1,9 +1,15 @@
+import atexit
 import copy
+import json
 import logging
 import logging.config
+import queue
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
-from app.types import LoggingLevelType
+from app.core.config import settings
+from app.types import LoggingFormatType, LoggingLevelType
 
 
 class RequestIDFilter(logging.Filter):
@@ -16,14 +22,94 @@ class RequestIDFilter(logging.Filter):
         from app.context import get_request_id
 
         # Add request_id to record, use "-" if not in request context
-        record.request_id = get_request_id() or "-"
+        # Records handed over by a queue handler already carry the id of the request that logged them
+        if getattr(record, "request_id", None) is None:
+            record.request_id = get_request_id() or "-"
         return True
 
 
+# Attributes every LogRecord has; anything else was passed through `extra` and is emitted as a field
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, with the fields passed through `extra` inlined.
+    """
+
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def format(self, record: logging.LogRecord) -> str:
+        body: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in body:
+                body[key] = value
+
+        if record.exc_info:
+            body["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            body["stack_info"] = self.formatStack(record.stack_info)
+        return self._encoder.encode(body)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands records to a QueueListener thread, so formatting and I/O stay off the event loop.
+
+    The queue is bounded. Once it is more than `overload_ratio` full, only one in `sample_rate`
+    records below WARNING is kept; when it is full, records are dropped. The number of dropped
+    records is logged as soon as the queue has room again, instead of blocking the caller.
+    """
+
+    def __init__(self, maxsize: int, sample_rate: int = 10, overload_ratio: float = 0.8) -> None:
+        self.records = queue.Queue[logging.LogRecord](maxsize)
+        super().__init__(self.records)
+        self.maxsize = maxsize
+        self.sample_rate = max(sample_rate, 1)
+        self.overload_size = int(maxsize * overload_ratio)
+        self.dropped = 0
+        self._sampled = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments, which may change after the call; formatting is left to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.records.qsize() >= self.overload_size and record.levelno < logging.WARNING:
+            self._sampled += 1
+            if self._sampled % self.sample_rate:
+                self.dropped += 1
+                return
+
+        try:
+            if self.dropped:
+                self.records.put_nowait(self._dropped_record())
+                self.dropped = 0
+            self.records.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _dropped_record(self) -> logging.LogRecord:
+        record = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0, f"Dropped {self.dropped} log records under load", None, None
+        )
+        record.request_id = "-"
+        return record
+
+
 LOGGING_SIZE = 10 * 1024 * 1024
 LOGGING_BACKUP_COUNT = 5
 
-LOGGING_CONFIG = {
+LOGGING_CONFIG: dict[str, Any] = {
     "version": 1,
     "disable_existing_loggers": False,
     "filters": {
@@ -37,11 +123,14 @@ LOGGING_CONFIG = {
             "style": "{",
             "fmt": "{asctime}({levelname},{name})[{request_id}]: {message}",
             "datefmt": "[%Y-%m-%d %H:%M:%S %z]",
-        }
+        },
+        "json": {
+            "()": "app.core.logging.JSONFormatter",
+        },
     },
     "handlers": {
         "console": {
-            "formatter": "generic",
+            "formatter": "json",
             "class": "logging.StreamHandler",
             "stream": "ext://sys.stdout",
             "filters": ["request_id"],
@@ -54,14 +143,64 @@ LOGGING_CONFIG = {
     },
 }
 
+_listeners: list[QueueListener] = []
+
+
+def _install_queue_handlers(maxsize: int) -> None:
+    """Replace the configured handlers of every logger by queue handlers feeding one listener per handler set."""
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+    ]
+    queue_handlers: dict[tuple[int, ...], BoundedQueueHandler] = {}
+
+    for logger in loggers:
+        handlers = [handler for handler in logger.handlers if not isinstance(handler, QueueHandler)]
+        if not handlers:
+            continue
 
-def configure_logging(level: LoggingLevelType = "INFO", config: dict[str, Any] | None = None) -> None:
+        key = tuple(id(handler) for handler in handlers)
+        if key not in queue_handlers:
+            queue_handler = BoundedQueueHandler(maxsize)
+            # The request id lives in a context variable, so it must be read on the logging thread
+            queue_handler.addFilter(RequestIDFilter())
+            listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+            listener.start()
+            _listeners.append(listener)
+            queue_handlers[key] = queue_handler
+
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handlers[key])
+
+
+def stop_logging() -> None:
+    """Stop the queue listeners, writing out the records that are still queued."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def configure_logging(
+    level: LoggingLevelType = "INFO",
+    config: dict[str, Any] | None = None,
+    log_format: LoggingFormatType = "json",
+    queue_size: int | None = settings.LOGGING_QUEUE_SIZE,
+) -> None:
+    """Configure logging. Unless queue_size is None, handlers run on a background thread behind a bounded queue."""
+    stop_logging()
     log_config = copy.deepcopy(LOGGING_CONFIG)
+    log_config["handlers"]["console"]["formatter"] = log_format
 
     if config:
         log_config.update(config)
 
     logging.config.dictConfig(log_config)
 
+    if queue_size:
+        _install_queue_handlers(queue_size)
+
     logger = logging.getLogger("app")
     logger.setLevel(level)
+
+
+# Registered after logging's own exit handler, so it runs first and queued records are still written
+atexit.register(stop_logging)
@@ -0,0 +1,103 @@
+"""Event loop lag monitoring and blocking-call detection.
+
+A task on the event loop sleeps for a short interval and measures how late it wakes up: the
+lag every other callback waits for too. Lag is exported as a histogram on /metrics.
+
+A task cannot see what blocks the loop, because it only runs once the blocking call returns.
+So the task also updates a heartbeat, and a watcher thread checks it. When the heartbeat is
+older than the threshold, the watcher logs the stack of the event loop thread (the blocking
+call and the coroutine that made it) and the request id of the task that is running.
+"""
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.context import request_id_var
+from app.core.config import settings
+from app.core.metrics import event_loop_blocked, event_loop_lag
+
+logger = logging.getLogger(__name__)
+
+
+class LoopWatchdog:
+    def __init__(self, interval: float, threshold: float) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.heartbeat = 0.0
+        self._task: asyncio.Task[None] | None = None
+        self._watcher: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    async def _measure(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self.heartbeat = time.monotonic()
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            event_loop_lag.observe(max(loop.time() - start - self.interval, 0.0))
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, thread_id: int) -> None:
+        reported = 0.0
+        while not self._stopping.wait(self.interval):
+            heartbeat = self.heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            # One report per stall: the heartbeat only moves once the loop runs again
+            if blocked > self.threshold and heartbeat != reported:
+                reported = heartbeat
+                self.report(loop, thread_id, blocked)
+
+    def report(self, loop: asyncio.AbstractEventLoop, thread_id: int, blocked: float) -> None:
+        """Log the stack of the loop thread and the request id of its running task.
+
+        Runs on the watcher thread, so the stall is counted by a callback on the loop: metrics are
+        only updated from the loop thread.
+        """
+        with contextlib.suppress(RuntimeError):  # The loop closed while it was blocked
+            loop.call_soon_threadsafe(event_loop_blocked.inc)
+        frame = sys._current_frames().get(thread_id)  # pyright: ignore[reportPrivateUsage]
+        stack = "".join(traceback.format_stack(frame)) if frame else "(stack unavailable)"
+
+        task = asyncio.current_task(loop)
+        request_id = task.get_context().get(request_id_var) if task else None
+        logger.warning(
+            f"Event loop blocked for more than {blocked * 1000:.0f}ms in {task.get_name() if task else 'a callback'}"
+            f"\n{stack}",
+            extra={"request_id": request_id or "-", "blocked_ms": round(blocked * 1000)},
+        )
+
+    def start(self) -> bool:
+        """Start measuring on the running loop and the watcher thread. Returns False if already running."""
+        if self._task is not None:
+            return False
+
+        self.heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watcher = threading.Thread(
+            target=self._watch,
+            args=(asyncio.get_running_loop(), threading.get_ident()),
+            name="loop-watchdog",
+            daemon=True,
+        )
+        self._watcher.start()
+        return True
+
+    async def stop(self) -> None:
+        """Stop the watcher thread and cancel the measuring task."""
+        self._stopping.set()
+        if self._watcher is not None:
+            await asyncio.to_thread(self._watcher.join)
+            self._watcher = None
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+loop_watchdog = LoopWatchdog(interval=settings.LOOP_WATCHDOG_INTERVAL, threshold=settings.LOOP_WATCHDOG_THRESHOLD)
@@ -0,0 +1,212 @@
+"""Prometheus metrics, rendered in the text exposition format by the /metrics endpoint.
+
+Metrics are only updated from the event loop thread, so the values are plain dicts without
+locks: an update is a dict lookup and an addition. Gauges that describe state owned by
+another object (like the HTTP connection limit) are read through a callback at scrape time.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Generator, Iterable
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from a cached Redis read to a slow upstream call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: "Metric") -> None:
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+registry = Registry()
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Labels = (), registry: Registry | None = registry
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        if registry is not None:
+            registry.register(self)
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]: ...
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Labels = (), registry: Registry | None = registry
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """A gauge that is set directly, or read from `callback` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        callback: Callable[[], dict[Labels, float]] | None = None,
+        registry: Registry | None = registry,
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.values: dict[Labels, float] = {}
+        self.callback = callback
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def samples(self) -> Iterable[str]:
+        values = self.callback() if self.callback else self.values
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: Registry | None = registry,
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = buckets
+        # Per label set: a count per bucket (plus +Inf, not cumulative) and the sum of observations
+        self.counts: dict[Labels, list[int]] = {}
+        self.sums: dict[Labels, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] = self.sums.get(labels, 0.0) + value
+
+    @contextmanager
+    def time(self, *labels: str) -> Generator[None]:
+        """Observe the duration of the block, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    @contextmanager
+    def time_outcome(self, *labels: str) -> Generator[None]:
+        """Observe the duration of the block with an extra "success" or "error" label."""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "success"
+        finally:
+            self.observe(time.perf_counter() - start, *labels, outcome)
+
+    def samples(self) -> Iterable[str]:
+        for labels, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(self.sums[labels])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+http_request_duration = Histogram(
+    "bureaublad_http_request_duration_seconds",
+    "Duration of HTTP requests by route template",
+    ("method", "route", "status"),
+)
+upstream_request_duration = Histogram(
+    "bureaublad_upstream_request_duration_seconds", "Duration of calls to backend services", ("service",)
+)
+upstream_errors = Counter("bureaublad_upstream_errors_total", "Failed calls to backend services", ("service", "reason"))
+token_exchange_duration = Histogram(
+    "bureaublad_token_exchange_duration_seconds", "Duration of token exchanges", ("outcome",)
+)
+token_refresh_duration = Histogram(
+    "bureaublad_token_refresh_duration_seconds",
+    "Duration of access token refreshes, on the request path or in the background",
+    ("source", "outcome"),
+)
+redis_command_duration = Histogram(
+    "bureaublad_redis_command_duration_seconds", "Duration of Redis commands and pipelines", ("command",)
+)
+ai_streams_in_flight = Gauge("bureaublad_ai_streams_in_flight", "AI responses that are being streamed")
+ai_streams_in_flight.set(0)
+ai_queue_length = Gauge("bureaublad_ai_queue_length", "AI requests waiting for a streaming slot")
+ai_queue_length.set(0)
+ai_queue_wait = Histogram(
+    "bureaublad_ai_queue_wait_seconds",
+    "Time AI requests waited for a streaming slot",
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+ai_queue_rejected = Counter("bureaublad_ai_queue_rejected_total", "AI requests refused because the queue was full")
+ai_cache_requests = Counter("bureaublad_ai_cache_requests_total", "AI response cache lookups", ("result",))
+event_loop_lag = Histogram(
+    "bureaublad_event_loop_lag_seconds",
+    "How late the event loop runs a callback that is due",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+event_loop_blocked = Counter(
+    "bureaublad_event_loop_blocked_total", "Times the event loop was blocked for longer than the watchdog threshold"
+)
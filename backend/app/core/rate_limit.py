@@ -0,0 +1,17 @@
+"""Fixed-window rate limiting shared between replicas through Redis."""
+
+import time
+
+from app.core.redis import get_redis_client
+
+
+async def check_rate_limit(key: str, limit: int, window: int) -> bool:
+    """Count a request against `key`. Returns False when more than `limit` requests were made in the current window."""
+
+    window_key = f"ratelimit:{key}:{int(time.time()) // window}"
+    redis_client = get_redis_client()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.incr(window_key)
+        pipe.expire(window_key, window)
+        count, _ = await pipe.execute()
+    return int(count) <= limit
@@ -0,0 +1,157 @@
+"""Readiness of the dependencies this service cannot work without.
+
+A background task probes Redis, the identity provider and, optionally, the enabled backend
+services on an interval and keeps the latest results. The readiness probe only reads those
+results, so it answers without I/O however often the kubelet calls it.
+
+Backend services are reported but never make the service unready: one backend being down
+only affects its own routes, and taking every replica out of rotation would not help.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.http_clients import http_client_dependency
+from app.core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class CheckResult:
+    ok: bool
+    required: bool
+    duration_ms: float
+    error: str | None = None
+
+
+class ReadinessMonitor:
+    """Periodically runs the dependency checks and caches their results."""
+
+    def __init__(self, interval: int, timeout: float) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.checks: dict[str, tuple[Probe, bool]] = {}
+        self.results: dict[str, CheckResult] = {}
+        self.checked_at: float = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    def add_check(self, name: str, probe: Probe, required: bool = True) -> None:
+        self.checks[name] = (probe, required)
+
+    async def _run_check(self, probe: Probe, required: bool) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), self.timeout)
+        except TimeoutError:
+            error = f"timed out after {self.timeout}s"
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+        else:
+            error = None
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        return CheckResult(ok=error is None, required=required, duration_ms=duration_ms, error=error)
+
+    async def run_once(self) -> None:
+        """Run all checks concurrently and replace the cached results."""
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(*self.checks[name]) for name in names))
+        self.results = dict(zip(names, results, strict=True))
+        self.checked_at = time.monotonic()
+
+        for name, result in self.results.items():
+            if not result.ok:
+                logger.warning(f"Readiness check {name} failed: {result.error}")
+
+    @property
+    def ready(self) -> bool:
+        """Whether all required checks passed in a recent run.
+
+        Results older than three intervals mean the background task stopped, which is not ready either.
+        """
+        if not self.checked_at or time.monotonic() - self.checked_at > 3 * self.interval:
+            return False
+        return all(result.ok for result in self.results.values() if result.required)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Readiness checks failed to run")
+
+    async def start(self) -> bool:
+        """Run the checks once and start the background task. Returns False if it was already running."""
+        if self._task is not None:
+            return False
+
+        await self.run_once()
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    async def stop(self) -> None:
+        """Cancel the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+async def check_redis() -> None:
+    await get_redis_client().ping()  # type: ignore[reportUnknownMemberType]
+
+
+def http_check(url: str, accept_client_errors: bool = False) -> Probe:
+    """Probe that GETs a URL. Backends often answer 401/404 on their root, which still means they are up."""
+
+    async def probe() -> None:
+        http_client = await http_client_dependency()
+        response = await http_client.get(url)
+        if response.status_code >= 500 or (response.status_code >= 400 and not accept_client_errors):
+            raise RuntimeError(f"status {response.status_code}")
+
+    return probe
+
+
+def _backend_urls() -> dict[str, str]:
+    services = {
+        "ocs": settings.OCS_URL,
+        "docs": settings.DOCS_URL,
+        "drive": settings.DRIVE_URL,
+        "meet": settings.MEET_URL,
+        "grist": settings.GRIST_URL,
+        "conversation": settings.CONVERSATION_URL,
+        "calendar": settings.CALENDAR_URL,
+    }
+    return {name: url for name, url in services.items() if url}
+
+
+def create_readiness_monitor() -> ReadinessMonitor:
+    monitor = ReadinessMonitor(interval=settings.READINESS_CHECK_INTERVAL, timeout=settings.READINESS_CHECK_TIMEOUT)
+    monitor.add_check("redis", check_redis)
+
+    if settings.OIDC_JWKS_ENDPOINT:
+        monitor.add_check("oidc", http_check(settings.OIDC_JWKS_ENDPOINT))
+    elif settings.OIDC_ISSUER:
+        monitor.add_check("oidc", http_check(f"{settings.OIDC_ISSUER.rstrip('/')}/.well-known/openid-configuration"))
+
+    if settings.READINESS_CHECK_BACKENDS:
+        for name, url in _backend_urls().items():
+            monitor.add_check(name, http_check(url, accept_client_errors=True), required=False)
+    return monitor
+
+
+readiness_monitor = create_readiness_monitor()
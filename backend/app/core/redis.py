@@ -1,11 +1,44 @@
+import time
 from functools import lru_cache
+from typing import Any
 
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
 
 from app.core.config import settings
+from app.core.metrics import redis_command_duration
+from app.core.tracing import span
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline that observes the duration of each round-trip."""
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        start = time.perf_counter()
+        try:
+            with span("redis PIPELINE", **{"db.system": "redis"}):
+                return await super().execute(raise_on_error)
+        finally:
+            redis_command_duration.observe(time.perf_counter() - start, "PIPELINE")
+
+
+class InstrumentedRedis(Redis):
+    """Redis client that observes the duration of every command, labelled by command name."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:  # noqa: ANN401
+        command = str(args[0]).upper()
+        start = time.perf_counter()
+        try:
+            with span(f"redis {command}", **{"db.system": "redis"}):
+                return await super().execute_command(*args, **options)  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+        finally:
+            redis_command_duration.observe(time.perf_counter() - start, command)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
 
 
 @lru_cache
 def get_redis_client() -> Redis:
     """Create and cache a Redis client instance."""
-    return Redis.from_url(url=str(settings.REDIS_URL), decode_responses=True)  # pyright: ignore[reportUnknownMemberType]
+    return InstrumentedRedis.from_url(url=str(settings.REDIS_URL), decode_responses=True)  # pyright: ignore[reportUnknownMemberType]
@@ -0,0 +1,144 @@
+"""Fan-out search across services with a deadline and pluggable ranking.
+
+Every source is queried concurrently. Results are collected as they come in until all
+sources answered or the deadline passed. Once enough results are in, the other sources get
+a short grace period rather than being dropped, so the ranking is not just whoever answered
+first; the sources still running after it are cancelled. The merged results of every source
+that answered are ranked by a scorer.
+"""
+
+import asyncio
+import logging
+import math
+from collections.abc import Callable, Coroutine, Mapping
+from datetime import UTC
+from datetime import datetime as DateTime
+from typing import Any
+
+from app.exceptions import TooManyRequestsError
+from app.models.search import SearchHit, SearchResponse, SearchSourceStatus
+
+logger = logging.getLogger(__name__)
+
+SearchProvider = Callable[[str, int], Coroutine[Any, Any, list[SearchHit]]]
+Scorer = Callable[[SearchHit, str, DateTime], float]
+
+# Age at which the recency score of a result has halved
+RECENCY_HALF_LIFE_DAYS = 30
+
+
+def title_match(title: str, term: str) -> float:
+    """Score how well a title matches the search term, from 0 to 1."""
+    title = title.casefold()
+    term = term.casefold().strip()
+    if not term:
+        return 0.0
+    if title == term:
+        return 1.0
+    if title.startswith(term):
+        return 0.8
+    if any(word.startswith(term) for word in title.split()):
+        return 0.6
+    if term in title:
+        return 0.4
+    # Matched by the service on something other than the title (e.g. content)
+    return 0.1
+
+
+def recency(updated_at: DateTime | None, now: DateTime) -> float:
+    """Score how recently a result was updated, from 0 to 1."""
+    if updated_at is None:
+        return 0.0
+    age_days = max(0.0, (now - updated_at).total_seconds() / 86400)
+    return math.pow(0.5, age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def relevance_scorer(hit: SearchHit, term: str, now: DateTime) -> float:
+    """Rank by title match first, recency second."""
+    return 0.7 * title_match(hit.title, term) + 0.3 * recency(hit.updated_at, now)
+
+
+def recency_scorer(hit: SearchHit, term: str, now: DateTime) -> float:
+    """Rank by recency, using the title match to order results of similar age."""
+    return 0.9 * recency(hit.updated_at, now) + 0.1 * title_match(hit.title, term)
+
+
+SCORERS: dict[str, Scorer] = {
+    "relevance": relevance_scorer,
+    "recency": recency_scorer,
+}
+
+
+def parse_timestamp(value: str | None) -> DateTime | None:
+    """Parse an ISO 8601 timestamp from a service, assuming UTC when it has no offset."""
+    if not value:
+        return None
+    try:
+        timestamp = DateTime.fromisoformat(value)
+    except ValueError:
+        return None
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=UTC)
+
+
+async def fan_out_search(
+    providers: Mapping[str, SearchProvider],
+    term: str,
+    limit: int,
+    deadline: float,
+    scorer: Scorer = relevance_scorer,
+    grace: float = 0.25,
+) -> SearchResponse:
+    """Query all providers concurrently and merge their results into one ranked list.
+
+    Stops waiting after `deadline` seconds, or `grace` seconds after at least `limit` results are in.
+    """
+    tasks = {asyncio.create_task(provider(term, limit)): source for source, provider in providers.items()}
+    statuses: dict[str, SearchSourceStatus] = dict.fromkeys(providers, "timeout")
+    hits: list[SearchHit] = []
+
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    pending = set(tasks)
+    cut_short = False
+    try:
+        while pending:
+            if not cut_short and len(hits) >= limit and loop.time() + grace < end:
+                end = loop.time() + grace
+                cut_short = True
+            timeout = end - loop.time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source = tasks[task]
+                try:
+                    hits.extend(task.result())
+                    statuses[source] = "ok"
+                except TooManyRequestsError:
+                    statuses[source] = "throttled"
+                except Exception:
+                    logger.warning(f"Search in {source} failed", exc_info=True)
+                    statuses[source] = "error"
+
+        if pending and cut_short:
+            for task in pending:
+                statuses[tasks[task]] = "cancelled"
+    finally:
+        for task in pending:
+            task.cancel()
+        # Let the cancelled requests unwind before answering
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    for source, status in statuses.items():
+        if status in ("timeout", "cancelled"):
+            logger.info(f"Search in {source} did not answer in time ({status})")
+
+    return SearchResponse(results=rank(hits, term, limit, scorer), sources=statuses)
+
+
+def rank(hits: list[SearchHit], term: str, limit: int, scorer: Scorer = relevance_scorer) -> list[SearchHit]:
+    """Score hits for the term and return the best `limit` of them."""
+    now = DateTime.now(UTC)
+    for hit in hits:
+        hit.score = scorer(hit, term, now)
+    return sorted(hits, key=lambda hit: hit.score, reverse=True)[:limit]
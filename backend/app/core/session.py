@@ -5,35 +5,61 @@ Flow control (redirects, etc.) remains in routes.
 """
 
 import json
+import time
 import uuid
 
 from fastapi import Request
 
+from app.context import timed
+from app.core.config import settings
 from app.core.redis import get_redis_client
 from app.exceptions import CredentialError
-from app.models.user import AuthState
+from app.models.user import AuthState, ExchangedToken
 
+# Sorted set of session ids scored by the time they were last used, read by the background token refresher
+ACTIVE_SESSIONS_KEY = "auth:active"
+
+# Exchanged tokens this close to expiry are exchanged again instead of being served from the session
+EXCHANGED_TOKEN_MARGIN = 30
+
+# Lifetime of the per-session lock held while a request or the background refresher refreshes the tokens
+REFRESH_LOCK_TTL = 30
+
+
+def _auth_key(session_id: str) -> str:
+    return f"auth:{session_id}"
+
+
+def _refresh_lock_key(session_id: str) -> str:
+    return f"auth:refresh-lock:{session_id}"
 
-def _redis_key(request: Request) -> str | None:
-    """Build a Redis key for the current session."""
-    session_id = request.session.get("session_id")
-    return f"auth:{session_id}" if session_id else None
+
+def _tokens_key(session_id: str) -> str:
+    return f"auth:{session_id}:tokens"
 
 
 async def get_auth(request: Request) -> AuthState | None:
     """Get auth from session."""
 
-    key = _redis_key(request)
-    if not key:
+    session_id = request.session.get("session_id")
+    if not session_id:
         return None
 
     redis_client = get_redis_client()
-    data = await redis_client.get(key)
-    data_dict = json.loads(data) if data else None
-
-    if data_dict:
-        return AuthState.model_validate(data_dict)
-    return None
+    with timed("session"):
+        if settings.TOKEN_REFRESH_ENABLED:
+            # Mark the session as active in the same round-trip
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(_auth_key(session_id))
+                pipe.zadd(ACTIVE_SESSIONS_KEY, {session_id: time.time()})
+                data, _ = await pipe.execute()
+        else:
+            data = await redis_client.get(_auth_key(session_id))
+        data_dict = json.loads(data) if data else None
+
+        if data_dict:
+            return AuthState.model_validate(data_dict)
+        return None
 
 
 async def set_auth(request: Request, auth: AuthState) -> str:
@@ -41,10 +67,7 @@ async def set_auth(request: Request, auth: AuthState) -> str:
 
     key = request.session["session_id"] if "session_id" in request.session else str(uuid.uuid4())
 
-    payload = auth.model_dump()
-
-    redis_client = get_redis_client()
-    await redis_client.set(f"auth:{key}", json.dumps(payload))
+    await store_auth(key, auth)
     request.session["session_id"] = key
     return key
 
@@ -52,10 +75,11 @@ async def set_auth(request: Request, auth: AuthState) -> str:
 async def clear_auth(request: Request) -> None:
     """Clear auth from session."""
 
-    key = _redis_key(request)
-    if key:
+    session_id = request.session.get("session_id")
+    if session_id:
         redis_client = get_redis_client()
-        await redis_client.delete(key)
+        await redis_client.delete(_auth_key(session_id), _tokens_key(session_id))
+        await forget_session(session_id)
         request.session.pop("session_id", None)
 
 
@@ -81,3 +105,89 @@ async def update_tokens(
         auth.refresh_token = refresh_token
 
     await set_auth(request, auth)
+
+
+async def load_auth(session_id: str) -> AuthState | None:
+    """Get auth by session id, outside of a request."""
+
+    redis_client = get_redis_client()
+    data = await redis_client.get(_auth_key(session_id))
+    return AuthState.model_validate(json.loads(data)) if data else None
+
+
+async def store_auth(session_id: str, auth: AuthState) -> None:
+    """Set auth by session id, outside of a request."""
+
+    redis_client = get_redis_client()
+    with timed("session"):
+        await redis_client.set(_auth_key(session_id), json.dumps(auth.model_dump()))
+
+
+async def replace_auth(session_id: str, auth: AuthState) -> bool:
+    """Set auth by session id only if the session still exists. Returns False if it was cleared."""
+
+    redis_client = get_redis_client()
+    with timed("session"):
+        return bool(await redis_client.set(_auth_key(session_id), json.dumps(auth.model_dump()), xx=True))
+
+
+async def get_active_session_ids(active_since: float) -> list[str]:
+    """Get ids of sessions used since `active_since`, dropping the ones that went idle."""
+
+    redis_client = get_redis_client()
+    await redis_client.zremrangebyscore(ACTIVE_SESSIONS_KEY, "-inf", active_since)
+    session_ids = await redis_client.zrange(ACTIVE_SESSIONS_KEY, 0, -1)  # type: ignore[reportUnknownMemberType]
+    return [str(session_id) for session_id in session_ids]
+
+
+async def forget_session(session_id: str) -> None:
+    """Stop tracking a session as active."""
+
+    redis_client = get_redis_client()
+    await redis_client.zrem(ACTIVE_SESSIONS_KEY, session_id)
+
+
+async def acquire_refresh_lock(session_id: str, ttl: int = REFRESH_LOCK_TTL) -> bool:
+    """Claim the right to refresh a session's tokens, so that only one request or replica talks to the IdP."""
+
+    redis_client = get_redis_client()
+    return bool(await redis_client.set(_refresh_lock_key(session_id), "1", nx=True, ex=ttl))
+
+
+async def release_refresh_lock(session_id: str) -> None:
+    """Give up the right to refresh a session's tokens once the refresh is done."""
+
+    redis_client = get_redis_client()
+    await redis_client.delete(_refresh_lock_key(session_id))
+
+
+async def get_exchanged_token(session_id: str, audience: str) -> str | None:
+    """Get a cached exchanged token for an audience, if it is not about to expire."""
+
+    redis_client = get_redis_client()
+    with timed("session"):
+        data = await redis_client.hget(_tokens_key(session_id), audience)  # type: ignore[reportUnknownMemberType]
+    if not data:
+        return None
+
+    token = ExchangedToken.model_validate_json(str(data))
+    if token.expires_at - EXCHANGED_TOKEN_MARGIN <= time.time():
+        return None
+    return token.access_token
+
+
+async def store_exchanged_tokens(session_id: str, tokens: dict[str, ExchangedToken]) -> None:
+    """Cache exchanged tokens by audience."""
+
+    if not tokens:
+        return
+
+    redis_client = get_redis_client()
+    with timed("session"):
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                _tokens_key(session_id),
+                mapping={audience: token.model_dump_json() for audience, token in tokens.items()},
+            )
+            pipe.expire(_tokens_key(session_id), settings.SESSION_MAX_AGE)
+            await pipe.execute()
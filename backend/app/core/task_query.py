@@ -0,0 +1,97 @@
+"""Open CalDAV tasks, filtered by the server and paged by due date.
+
+The calendar-queries ask only for todos without a COMPLETED date whose STATUS is neither
+COMPLETED nor CANCELLED and, optionally, that are due before a given time, so the server does
+not send finished tasks. The remaining tasks are ordered
+by due date (tasks without one last) with a heap that keeps only one page, and paged with an
+opaque cursor holding the sort key of the last task given. The key ends in the task's
+href, so tasks with the same due date and UID still have a place in the order.
+"""
+
+import heapq
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+from app.core.translate import _
+from app.exceptions import BadRequestError
+from app.models.task import Task
+
+# (no due date, due date, uid, ref): tasks without a due date sort after all others, and the ref
+# makes the key unique so a page boundary never falls between tasks with the same key
+SortKey = tuple[bool, datetime, str, str]
+# Due dates in sort keys are naive UTC, so the placeholder for tasks without one is naive too
+NO_DUE_DATE = datetime.max  # noqa: DTZ901
+
+
+# A prop-filter with a text-match only matches components that have the property (RFC 4791,
+# 9.7.2), so todos without a STATUS are asked for separately from those with an open one
+WITHOUT_STATUS = '<C:prop-filter name="STATUS"><C:is-not-defined/></C:prop-filter>'
+OPEN_STATUS = "".join(
+    '<C:prop-filter name="STATUS">'
+    f'<C:text-match negate-condition="yes" collation="i;ascii-casemap">{status}</C:text-match>'
+    "</C:prop-filter>"
+    for status in ("COMPLETED", "CANCELLED")
+)
+
+
+def _todos_query(status_filter: str, due_before: datetime | None) -> str:
+    time_range = ""
+    if due_before is not None:
+        end = due_before.astimezone(UTC) if due_before.tzinfo else due_before
+        time_range = f'<C:time-range end="{end:%Y%m%dT%H%M%S}Z"/>'
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<C:calendar-query xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">'
+        "<D:prop><C:calendar-data/></D:prop>"
+        '<C:filter><C:comp-filter name="VCALENDAR"><C:comp-filter name="VTODO">'
+        f'{time_range}<C:prop-filter name="COMPLETED"><C:is-not-defined/></C:prop-filter>{status_filter}'
+        "</C:comp-filter></C:comp-filter></C:filter>"
+        "</C:calendar-query>"
+    )
+
+
+def open_todos_queries(due_before: datetime | None = None) -> tuple[str, str]:
+    """calendar-query REPORT bodies for the open todos, due before the given time.
+
+    The first matches todos without a STATUS, the second those with one other than COMPLETED or
+    CANCELLED; together they match every open todo once.
+    """
+    return _todos_query(WITHOUT_STATUS, due_before), _todos_query(OPEN_STATUS, due_before)
+
+
+def sort_key(task: Task) -> SortKey:
+    if task.end is None:
+        return (True, NO_DUE_DATE, task.uid or "", task.ref)
+    due = task.end.astimezone(UTC).replace(tzinfo=None) if task.end.tzinfo else task.end
+    return (False, due, task.uid or "", task.ref)
+
+
+def encode_cursor(key: SortKey) -> str:
+    no_due, due, uid, ref = key
+    payload = json.dumps([None if no_due else due.isoformat(), uid, ref])
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    try:
+        due, uid, ref = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if due is None:
+            return (True, NO_DUE_DATE, str(uid), str(ref))
+        return (False, datetime.fromisoformat(due).replace(tzinfo=None), str(uid), str(ref))
+    except (ValueError, TypeError) as e:
+        raise BadRequestError(_("Invalid cursor")) from e
+
+
+def top_tasks(tasks: Iterable[Task], limit: int, after: SortKey | None = None) -> tuple[list[Task], SortKey | None]:
+    """The first `limit` tasks by due date after the cursor, and the cursor of the next page.
+
+    heapq.nsmallest holds only limit + 1 tasks at a time, instead of sorting all of them.
+    """
+    if after is not None:
+        tasks = (task for task in tasks if sort_key(task) > after)
+    page = heapq.nsmallest(limit + 1, tasks, key=sort_key)
+    if len(page) <= limit:
+        return page, None
+    return page[:limit], sort_key(page[limit - 1])
@@ -0,0 +1,142 @@
+"""Background refresh of access tokens for active sessions.
+
+Sessions are marked active whenever their auth state is read (see app.core.session.get_auth).
+A periodic pass refreshes the tokens of active sessions that are about to expire, so that
+the refresh in get_current_user is only a fallback for sessions this task did not reach in time.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from typing import Any, cast
+
+from app.core import session
+from app.core.config import settings
+from app.core.metrics import token_refresh_duration
+from app.core.oauth import oauth
+from app.token_exchange import prefetch_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRefresher:
+    """Periodically refreshes tokens of active sessions ahead of expiry."""
+
+    def __init__(
+        self,
+        interval: int,
+        lead_time: int,
+        jitter: int,
+        active_window: int,
+        concurrency: int,
+    ) -> None:
+        self.interval = interval
+        self.lead_time = lead_time
+        self.jitter = jitter
+        self.active_window = active_window
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._task: asyncio.Task[None] | None = None
+
+    def _is_due(self, expires_at: int) -> bool:
+        """Check if a token expires within the lead time plus a random jitter."""
+        lead_time = self.lead_time + random.uniform(0, self.jitter)  # noqa: S311
+        return time.time() >= expires_at - lead_time
+
+    async def refresh_session(self, session_id: str) -> bool:
+        """Refresh the tokens of a single session if they are due. Returns True if refreshed."""
+        auth = await session.load_auth(session_id)
+        if not auth or not auth.refresh_token or not auth.expires_at:
+            await session.forget_session(session_id)
+            return False
+
+        if not self._is_due(auth.expires_at):
+            return False
+
+        if not await session.acquire_refresh_lock(session_id):
+            return False
+        try:
+            return await self._refresh_locked(session_id)
+        finally:
+            await session.release_refresh_lock(session_id)
+
+    async def _refresh_locked(self, session_id: str) -> bool:
+        # A request may have refreshed, and rotated the refresh token, before the lock was free
+        auth = await session.load_auth(session_id)
+        if not auth or not auth.refresh_token or not auth.expires_at or not self._is_due(auth.expires_at):
+            return False
+
+        # The token exchanges of the prefetch go to the IdP too, so they hold the slot as well
+        async with self._semaphore:
+            with token_refresh_duration.time_outcome("background"):
+                token = cast(
+                    dict[str, Any],
+                    await oauth.oidc.fetch_access_token(  # type: ignore[reportUnknownMemberType]
+                        grant_type="refresh_token",
+                        refresh_token=auth.refresh_token,
+                    ),
+                )
+
+            auth.access_token = str(token["access_token"])
+            auth.expires_at = int(token["expires_at"])
+            if token.get("refresh_token"):
+                auth.refresh_token = str(token["refresh_token"])
+
+            # A logout during the refresh cleared the session; writing it back would revive it
+            if not await session.replace_auth(session_id, auth):
+                await session.forget_session(session_id)
+                return False
+            await prefetch_tokens(session_id, auth.access_token)
+        return True
+
+    async def _refresh_session_safely(self, session_id: str) -> bool:
+        try:
+            return await self.refresh_session(session_id)
+        except Exception as e:
+            # Leave the session to the request-path refresh, which knows how to clear or retry it
+            logger.warning(f"Background token refresh failed: {e}")
+            await session.forget_session(session_id)
+            return False
+
+    async def run_once(self) -> int:
+        """Refresh all active sessions that are due. Returns the number of refreshed sessions."""
+        session_ids = await session.get_active_session_ids(active_since=time.time() - self.active_window)
+        results = await asyncio.gather(*(self._refresh_session_safely(session_id) for session_id in session_ids))
+
+        refreshed = sum(results)
+        if refreshed:
+            logger.info(f"Refreshed tokens for {refreshed} of {len(session_ids)} active sessions")
+        return refreshed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Background token refresh pass failed")
+
+    def start(self) -> bool:
+        """Start the background refresh task. Returns False if it was already running."""
+        if self._task is not None:
+            return False
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    async def stop(self) -> None:
+        """Cancel the background refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+token_refresher = TokenRefresher(
+    interval=settings.TOKEN_REFRESH_INTERVAL,
+    lead_time=settings.TOKEN_REFRESH_LEAD_TIME,
+    jitter=settings.TOKEN_REFRESH_JITTER,
+    active_window=settings.TOKEN_REFRESH_ACTIVE_WINDOW,
+    concurrency=settings.TOKEN_REFRESH_CONCURRENCY,
+)
@@ -0,0 +1,153 @@
+"""Optional OpenTelemetry tracing.
+
+Tracing is off unless TRACING_ENABLED is set and the OpenTelemetry SDK is installed
+(the `tracing` extra: `uv sync --extra tracing`). When it is off, span()
+is a no-op that costs one global lookup.
+
+Overhead is bounded by sampling and batching: a ParentBased(TraceIdRatioBased) sampler keeps
+TRACING_SAMPLE_RATIO of the traces that do not arrive with a sampling decision, unsampled
+spans are non-recording, and sampled spans are exported from a background thread in batches.
+The export queue holds TRACING_MAX_QUEUE_SIZE spans; beyond that spans are dropped, never
+waited for.
+
+The tracer provider is kept here rather than installed globally, so tests can set up tracing
+with an in-memory exporter and tear it down again.
+"""
+
+import logging
+from collections.abc import Generator, MutableMapping
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter
+    from opentelemetry.trace import Span, Tracer
+    from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "bureaublad-api"
+
+_provider: "TracerProvider | None" = None
+_tracer: "Tracer | None" = None
+_propagator: "TraceContextTextMapPropagator | None" = None
+
+
+def setup_tracing(
+    exporter: "SpanExporter | None" = None, sample_ratio: float | None = None, batch: bool = True
+) -> bool:
+    """Start tracing. Returns False when the OpenTelemetry SDK is not installed.
+
+    Spans go to the given exporter, or to OTLP over HTTP at TRACING_OTLP_ENDPOINT. Tests pass
+    an in-memory exporter with batch=False, so spans are available as soon as they end.
+    """
+    global _provider, _tracer, _propagator
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+        from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+    except ImportError:
+        logger.warning("Tracing is enabled but the OpenTelemetry SDK is not installed")
+        return False
+
+    shutdown_tracing()
+
+    ratio = settings.TRACING_SAMPLE_RATIO if sample_ratio is None else sample_ratio
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(ratio)),
+    )
+
+    if exporter is None:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+    processor: SpanProcessor
+    if batch:
+        processor = BatchSpanProcessor(exporter, max_queue_size=settings.TRACING_MAX_QUEUE_SIZE)
+    else:
+        processor = SimpleSpanProcessor(exporter)
+    provider.add_span_processor(processor)
+
+    _provider = provider
+    _tracer = provider.get_tracer(__name__)
+    _propagator = TraceContextTextMapPropagator()
+    logger.info(f"Tracing enabled, sampling {ratio:.0%} of traces")
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Export the spans that are still queued and stop tracing."""
+    global _provider, _tracer, _propagator
+
+    if _provider is not None:
+        _provider.shutdown()
+    _provider = _tracer = _propagator = None
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+@contextmanager
+def span(name: str, **attributes: str | int | float | bool) -> Generator[None]:
+    """Run the block in a span that is a child of the current one, if tracing is enabled."""
+    if _tracer is None:
+        yield
+        return
+
+    with _tracer.start_as_current_span(name, attributes=attributes):
+        yield
+
+
+@contextmanager
+def server_span(
+    name: str, headers: MutableMapping[str, str], **attributes: str | int | float | bool
+) -> Generator["Span | None"]:
+    """Run the block in a server span that continues the trace of an incoming traceparent header.
+
+    Yields the span, so attributes known only at the end (like the status code) can be added.
+    """
+    if _tracer is None or _propagator is None:
+        yield None
+        return
+
+    from opentelemetry.trace import SpanKind
+
+    parent = _propagator.extract(headers)
+    with _tracer.start_as_current_span(name, context=parent, kind=SpanKind.SERVER, attributes=attributes) as current:
+        yield current
+
+
+def start_span(name: str, **attributes: str | int | float | bool) -> "Span | None":
+    """Start a span that is not made current, for work that outlives a single context (like a stream).
+
+    Returns None when tracing is disabled; the caller ends the span with end_span().
+    """
+    if _tracer is None:
+        return None
+    return _tracer.start_span(name, attributes=attributes)
+
+
+def end_span(started: "Span | None", error: BaseException | None = None) -> None:
+    if started is None:
+        return
+    if error is not None:
+        from opentelemetry.trace import Status, StatusCode
+
+        started.record_exception(error)
+        started.set_status(Status(StatusCode.ERROR))
+    started.end()
+
+
+def inject_traceparent(headers: MutableMapping[str, str]) -> None:
+    """Add the W3C traceparent header of the current span to outgoing request headers."""
+    if _propagator is not None:
+        _propagator.inject(headers)
@@ -1,6 +1,7 @@
 import gettext
 import logging
 from contextvars import ContextVar
+from functools import lru_cache
 from pathlib import Path
 
 from fastapi import Request
@@ -8,15 +9,94 @@ from fastapi import Request
 logger = logging.getLogger(__name__)
 _translation_context: ContextVar[gettext.NullTranslations] = ContextVar("translation")
 
+LOCALES_DIR = Path(__file__).parent.parent / "locales"
+# Messages are written in English, so the default locale is available without a catalog
+DEFAULT_LOCALE = "en_US"
+
+_catalogs: dict[str, gettext.NullTranslations] = {}
+_available_locales: frozenset[str] = frozenset({DEFAULT_LOCALE})
+_fallback = gettext.NullTranslations()
+
+
+def normalize_locale(locale: str) -> str:
+    """Normalize a language tag to the gettext form, e.g. "nl-nl" -> "nl_NL"."""
+    language, _sep, region = locale.strip().replace("-", "_").partition("_")
+    return f"{language.lower()}_{region.upper()}" if region else language.lower()
+
+
+def load_catalogs(locales_dir: Path = LOCALES_DIR) -> frozenset[str]:
+    """Load the compiled catalogs of all shipped locales. Returns the locales that were found."""
+    global _available_locales
+
+    _catalogs.clear()
+    locales: set[str] = set()
+    for mo_file in sorted(locales_dir.glob("*/LC_MESSAGES/messages.mo")):
+        locale = normalize_locale(mo_file.parent.parent.name)
+        with mo_file.open("rb") as fp:
+            _catalogs[locale] = gettext.GNUTranslations(fp)
+        locales.add(locale)
+
+    _available_locales = frozenset(locales | {DEFAULT_LOCALE})
+    negotiate_locale.cache_clear()
+    logger.info(f"Loaded translation catalogs: {', '.join(sorted(locales)) or 'none'}")
+    return _available_locales
+
+
+def get_catalog(locale: str | None) -> gettext.NullTranslations:
+    """Get the catalog of a negotiated locale; the default locale and no match leave messages untranslated."""
+    return _catalogs.get(locale, _fallback) if locale else _fallback
+
+
+@lru_cache(maxsize=256)
+def parse_accept_language(header: str) -> tuple[str, ...]:
+    """Parse an Accept-Language header into normalized locales, most preferred first.
+
+    Entries with q=0 or an invalid q-value are dropped; equal q-values keep their order.
+    """
+    weighted: list[tuple[float, str]] = []
+    for entry in header.split(","):
+        tag, *params = entry.split(";")
+        tag = tag.strip()
+        if not tag or tag == "*":
+            continue
+
+        quality = 1.0
+        for param in params:
+            key, _sep, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            weighted.append((quality, normalize_locale(tag)))
+
+    weighted.sort(key=lambda item: item[0], reverse=True)
+    return tuple(locale for _quality, locale in weighted)
+
+
+@lru_cache(maxsize=256)
+def negotiate_locale(header: str) -> str | None:
+    """Pick the shipped or source locale that best matches an Accept-Language header.
+
+    A language without region matches any available region of it (e.g. "nl" -> "nl_NL", "en" -> "en_US").
+    """
+    for locale in parse_accept_language(header):
+        if locale in _available_locales:
+            return locale
+        language = locale.split("_")[0]
+        for available in sorted(_available_locales):
+            if available.split("_")[0] == language:
+                return available
+    return None
+
 
 async def set_locale(request: Request) -> None:
-    lang = request.headers.get("Accept-Language", "en-US")
-    lang = lang.split(",")[0].replace("-", "_")
-    logger.debug(f"Setting locale to: {lang}")
-    locales_dir = Path(__file__).parent / "../locales"
+    header = request.headers.get("Accept-Language", DEFAULT_LOCALE)
+    locale = negotiate_locale(header)
+    logger.debug(f"Setting locale to: {locale or DEFAULT_LOCALE}")
 
-    translations = gettext.translation("messages", localedir=locales_dir, languages=[lang], fallback=True)
-    _translation_context.set(translations)
+    _translation_context.set(get_catalog(locale))
 
 
 def _(message: str) -> str:
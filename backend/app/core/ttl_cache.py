@@ -0,0 +1,56 @@
+"""Bounded in-process cache whose entries expire.
+
+For state that is cheap to load again: each replica keeps its own entries, and one without
+an entry simply loads it. Past `max_entries`, the least recently used entries are dropped first.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class CacheEntry[V]:
+    value: V
+    loaded_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.monotonic() - self.loaded_at < ttl
+
+
+class TTLCache[K: Hashable, V]:
+    """Values kept for `ttl` seconds, at most `max_entries` of them, least recently used dropped first."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[K, CacheEntry[V]] = OrderedDict()
+
+    def entry(self, key: K) -> CacheEntry[V] | None:
+        """Get the entry, fresh or not, for callers that refresh it from its previous value."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: K) -> V | None:
+        """Get the value, if it is cached and fresh. A stale entry is dropped."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.is_fresh(self.ttl):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def put(self, key: K, value: V, age: float = 0) -> None:
+        """Cache a value; `age` is how many seconds ago it was loaded, if not just now."""
+        self._entries[key] = CacheEntry(value=value, loaded_at=time.monotonic() - age)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
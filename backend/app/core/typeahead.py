@@ -0,0 +1,101 @@
+"""Search-as-you-type support for the unified search.
+
+Two things keep keystrokes from turning into backend load:
+
+- A new search of a session cancels the one it still has in flight, so only the latest
+  term reaches the backends. This works per process; replicas behind sticky sessions
+  get it for free, others only lose the cancellation.
+- Complete result sets (every source answered and nothing was cut off) are cached per
+  user and term. Every backend filters on "contains", so the results for "rappo" are
+  exactly the results for "rapp" whose title contains "rappo", and are answered locally.
+"""
+
+import asyncio
+import logging
+from collections.abc import Coroutine
+from typing import Any
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+from app.models.search import SearchResponse
+
+logger = logging.getLogger(__name__)
+
+
+class InFlightSearches:
+    """Runs searches so that a newer search with the same key cancels the older one."""
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task[Any]] = {}
+
+    async def run[T](self, key: str, coro: Coroutine[Any, Any, T]) -> T | None:
+        """Run the search, cancelling the previous one for `key`. Returns None if it was superseded."""
+        previous = self._tasks.get(key)
+        if previous is not None and not previous.done():
+            previous.cancel()
+
+        task = asyncio.create_task(coro)
+        self._tasks[key] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                # The request itself is being cancelled (e.g. client disconnect)
+                task.cancel()
+                raise
+            return None
+        finally:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+
+in_flight_searches = InFlightSearches()
+
+
+def _prefix_key(user_key: str, term: str) -> str:
+    return f"search:typeahead:{user_key}:{term}"
+
+
+def _normalize(term: str) -> str:
+    return term.strip().casefold()
+
+
+def is_complete(response: SearchResponse, limit: int) -> bool:
+    """Check if a response holds every result there is for its term.
+
+    Every source is asked for `limit` results, so fewer in total means that each source returned
+    fewer than it was asked for (all it has), and that ranking cut nothing off.
+    """
+    return all(status == "ok" for status in response.sources.values()) and len(response.results) < limit
+
+
+async def load_prefix_results(user_key: str, term: str) -> SearchResponse | None:
+    """Get the cached complete results of the longest cached prefix of term, filtered to term."""
+
+    term = _normalize(term)
+    prefixes = [term[:length] for length in range(len(term), settings.SEARCH_TYPEAHEAD_MIN_PREFIX - 1, -1)]
+    if not prefixes:
+        return None
+
+    redis_client = get_redis_client()
+    cached = await redis_client.mget([_prefix_key(user_key, prefix) for prefix in prefixes])
+    data = next((value for value in cached if value), None)
+    if data is None:
+        return None
+
+    response = SearchResponse.model_validate_json(data)
+    response.results = [hit for hit in response.results if term in hit.title.casefold()]
+    return response
+
+
+async def save_prefix_results(user_key: str, term: str, response: SearchResponse) -> None:
+    """Cache a complete response for term."""
+
+    if len(_normalize(term)) < settings.SEARCH_TYPEAHEAD_MIN_PREFIX:
+        return
+
+    redis_client = get_redis_client()
+    await redis_client.set(
+        _prefix_key(user_key, _normalize(term)), response.model_dump_json(), ex=settings.SEARCH_TYPEAHEAD_CACHE_TTL
+    )
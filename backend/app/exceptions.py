@@ -56,6 +56,17 @@ class BadRequestError(HTTPException):
         super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
 
 
+class TooManyRequestsError(HTTPException):
+    """Raised when a user exceeds the rate limit toward an external service."""
+
+    def __init__(self, service: str, retry_after: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=_(f"Too many requests to {service}, please retry later"),
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 class TokenRefreshConflictError(HTTPException):
     """Raised when a refresh token has already been used by a concurrent request.
 
@@ -6,6 +6,7 @@ from fastapi import Depends, FastAPI
 from fastapi.exceptions import HTTPException, RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from starlette.middleware import Middleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.types import ExceptionHandler
 
@@ -20,14 +21,17 @@ from app.core.exception_handlers import (
 )
 from app.core.lifespan import lifespan
 from app.core.logging import configure_logging
+from app.core.tracing import setup_tracing
 from app.middleware.logging import RequestLoggingMiddleware
 from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.tracing import TracedMiddleware, TracingMiddleware
 from app.middleware.translate import LanguageMiddleware
 from app.routes.authentication import router as auth_router
 from app.routes.health import router as health_router
 from app.routes.main import api_router
+from app.routes.metrics import router as metrics_router
 
-configure_logging(settings.LOGGING_LEVEL, settings.LOGGING_CONFIG)
+configure_logging(settings.LOGGING_LEVEL, settings.LOGGING_CONFIG, settings.LOGGING_FORMAT, settings.LOGGING_QUEUE_SIZE)
 
 logger = logging.getLogger(__name__)
 logger.info(f"Bureaublad API starting - Log level: {settings.LOGGING_LEVEL}, Environment: {settings.ENVIRONMENT}")
@@ -68,6 +72,8 @@ app.add_exception_handler(Exception, generic_exception_handler)
 app.include_router(auth_router, prefix="/api/v1")  # No auth required for auth endpoints
 app.include_router(api_router, dependencies=[Depends(get_current_user)], prefix="/api/v1")
 app.include_router(health_router, tags=["health"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router, tags=["metrics"])
 
 # Middleware execution order (reverse of add order):
 app.add_middleware(RequestLoggingMiddleware)
@@ -91,3 +97,10 @@ app.add_middleware(
 app.add_middleware(RequestIDMiddleware)
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.TRUSTED_HOSTS)
 app.add_middleware(LanguageMiddleware)
+
+if settings.TRACING_ENABLED and setup_tracing():
+    # Run every middleware in its own span, below a request span that is added last so it runs first
+    app.user_middleware = [
+        Middleware(TracedMiddleware, middleware=entry.cls, **entry.kwargs) for entry in app.user_middleware
+    ]
+    app.add_middleware(TracingMiddleware)
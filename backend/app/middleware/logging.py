@@ -1,13 +1,15 @@
-import json
 import logging
 import typing
-from time import time
+from time import perf_counter
 
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 from starlette.types import ASGIApp
 
+from app.context import start_request_timings
+from app.core.config import settings
+from app.core.metrics import http_request_duration
 from app.utils.mask import Mask
 
 RequestResponseEndpoint = typing.Callable[[Request], typing.Awaitable[Response]]
@@ -22,6 +24,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
     Responsibilities:
     - Logs request method, path, and query parameters
     - Logs response status code and request duration
+    - Collects span timings (session, token exchange, upstream calls) into the log line
+      and the Server-Timing response header
     - Masks sensitive data in headers (passwords, secrets, cookies, authorization)
 
     Note: Request ID must be set by RequestIDMiddleware before this middleware runs.
@@ -33,20 +37,41 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         self.masker = Mask(mask_keywords=default_keywords + (mask_keywords or []))
 
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        request_time = time()
+        timings = start_request_timings()
+        request_time = perf_counter()
 
         response = await call_next(request)
-        response_time = time()
+        duration = perf_counter() - request_time
 
-        logging_body = {
+        # Label by route template rather than path, so ids in paths do not create new series
+        route_path = getattr(request.scope.get("route"), "path", None)
+        if not isinstance(route_path, str):
+            route_path = "unmatched"
+        http_request_duration.observe(duration, request.method, route_path, str(response.status_code))
+
+        logging_body: dict[str, str | int | float | dict[str, float]] = {
             "method": request.method,
             "path": request.url.path,
             "status_code": response.status_code,
-            "duration_ms": round((response_time - request_time) * 1000, 2),
+            "duration_ms": round(duration * 1000, 2),
         }
 
         if request.query_params:
             logging_body["query_params"] = str(request.query_params)
 
-        logger.info(json.dumps(logging_body))
+        # Spans of streamed responses only cover the work done before the body is sent
+        if timings.durations:
+            logging_body["timings_ms"] = timings.as_milliseconds()
+        if settings.SERVER_TIMING_ENABLED:
+            response.headers["Server-Timing"] = timings.server_timing(total_seconds=duration)
+
+        # Structured fields go through `extra`; the JSON formatter emits them as fields of the log line
+        logger.info(
+            "%s %s %s %.2fms",
+            request.method,
+            request.url.path,
+            response.status_code,
+            logging_body["duration_ms"],
+            extra=logging_body,
+        )
         return response
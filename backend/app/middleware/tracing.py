@@ -0,0 +1,66 @@
+from collections.abc import Callable
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import server_span, span
+
+
+class TracingMiddleware:
+    """
+    Middleware that wraps each HTTP request in an OpenTelemetry server span.
+
+    Responsibilities:
+    - Continues the trace of an incoming W3C traceparent header, or starts a new one
+    - Names the span after the route template once routing has happened
+    - Records the response status code
+
+    Added last, so it runs first and the spans of all other middlewares are its children.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        method: str = scope["method"]
+        with server_span(method, headers, **{"http.request.method": method, "url.path": scope["path"]}) as current:
+            status_code = 500
+
+            async def send_with_status(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if current is not None:
+                    route_path = getattr(scope.get("route"), "path", None)
+                    if isinstance(route_path, str):
+                        current.update_name(f"{method} {route_path}")
+                        current.set_attribute("http.route", route_path)
+                    current.set_attribute("http.response.status_code", status_code)
+
+
+class TracedMiddleware:
+    """
+    Runs another middleware inside a span named after it, so its share of the request shows up in traces.
+    """
+
+    def __init__(self, app: ASGIApp, middleware: Callable[..., ASGIApp], **options: Any) -> None:  # noqa: ANN401
+        self.app = middleware(app, **options)
+        self.name = getattr(middleware, "__name__", "middleware")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with span(self.name):
+            await self.app(scope, receive, send)
@@ -2,6 +2,7 @@ from datetime import datetime as DateTime
 from typing import Any, cast
 
 from pydantic import BaseModel, computed_field
+from pydantic.dataclasses import dataclass
 
 from app.core.config import settings
 
@@ -15,6 +16,63 @@ class FileInfo(BaseModel):
     link: str | None = None  # Direct link from Nextcloud, may be absent
 
 
+def _extract_files(
+    object_id: int,
+    object_name: str,
+    objects: dict[str, str] | None,
+    subject_rich: list[Any] | None,
+) -> list[FileInfo]:
+    files: list[FileInfo] = []
+
+    # Try subject_rich first (has file metadata including link)
+    if subject_rich and len(subject_rich) >= 2:
+        placeholders = subject_rich[1]
+        if isinstance(placeholders, dict):
+            typed_placeholders = cast(dict[str, Any], placeholders)
+            for value in typed_placeholders.values():
+                if isinstance(value, dict):
+                    file_data = cast(dict[str, str], value)
+                    if file_data.get("type") != "file":
+                        continue
+                    file_id = file_data["id"]
+                    file_name = file_data["name"]
+                    file_path = file_data.get("path", file_name)
+                    file_link: str | None = file_data.get("link")
+                    files.append(
+                        FileInfo(
+                            id=int(file_id),
+                            name=file_name,
+                            path=file_path,
+                            link=file_link,
+                        )
+                    )
+
+    # Fallback to objects dict (no links available)
+    if not files and objects:
+        for file_id_str, file_path in objects.items():
+            files.append(
+                FileInfo(
+                    id=int(file_id_str),
+                    name=file_path.lstrip("/").split("/")[-1],
+                    path=file_path.lstrip("/"),
+                    link=None,  # objects dict doesn't have links
+                )
+            )
+
+    # Ultimate fallback: single object
+    if not files:
+        files.append(
+            FileInfo(
+                id=object_id,
+                name=object_name.lstrip("/").split("/")[-1],
+                path=object_name.lstrip("/"),
+                link=None,  # No link available
+            )
+        )
+
+    return files
+
+
 class Activity(BaseModel):
     """Raw Nextcloud activity - for parsing API response."""
 
@@ -58,55 +116,28 @@ class Activity(BaseModel):
         Priority: subject_rich (has metadata) -> objects dict -> single object
         Uses link directly from Nextcloud when available, null otherwise.
         """
-        files: list[FileInfo] = []
-
-        # Try subject_rich first (has file metadata including link)
-        if self.subject_rich and len(self.subject_rich) >= 2:
-            placeholders = self.subject_rich[1]
-            if isinstance(placeholders, dict):
-                typed_placeholders = cast(dict[str, Any], placeholders)
-                for value in typed_placeholders.values():
-                    if isinstance(value, dict):
-                        file_data = cast(dict[str, str], value)
-                        if file_data.get("type") != "file":
-                            continue
-                        file_id = file_data["id"]
-                        file_name = file_data["name"]
-                        file_path = file_data.get("path", file_name)
-                        file_link: str | None = file_data.get("link")
-                        files.append(
-                            FileInfo(
-                                id=int(file_id),
-                                name=file_name,
-                                path=file_path,
-                                link=file_link,
-                            )
-                        )
+        return _extract_files(self.object_id, self.object_name, self.objects, self.subject_rich)
 
-        # Fallback to objects dict (no links available)
-        if not files and self.objects:
-            for file_id_str, file_path in self.objects.items():
-                files.append(
-                    FileInfo(
-                        id=int(file_id_str),
-                        name=file_path.lstrip("/").split("/")[-1],
-                        path=file_path.lstrip("/"),
-                        link=None,  # objects dict doesn't have links
-                    )
-                )
 
-        # Ultimate fallback: single object
-        if not files:
-            files.append(
-                FileInfo(
-                    id=self.object_id,
-                    name=self.object_name.lstrip("/").split("/")[-1],
-                    path=self.object_name.lstrip("/"),
-                    link=None,  # No link available
-                )
-            )
+@dataclass(frozen=True, slots=True)
+class ActivityEntry:
+    """Lean activity for parsing the feed: only the fields needed to build a FileActivity.
 
-        return files
+    A slotted, frozen dataclass; the remaining fields of the Nextcloud activity are ignored.
+    """
+
+    activity_id: int
+    type: str
+    object_type: str
+    object_id: int
+    object_name: str
+    datetime: DateTime
+    objects: dict[str, str] | None = None
+    subject_rich: list[Any] | None = None
+
+    def extract_files(self) -> list[FileInfo]:
+        """Extract all files from this activity, see Activity.extract_files."""
+        return _extract_files(self.object_id, self.object_name, self.objects, self.subject_rich)
 
 
 class FileActivity(BaseModel):
@@ -127,3 +158,58 @@ class FileActivityResponse(BaseModel):
 
     results: list[FileActivity]
     last_given: int | None = None
+
+
+class ActivityBuffer(BaseModel):
+    """Cached window of a user's activity feed, newest first.
+
+    Holds every file activity with an id between `oldest` and `newest` (inclusive).
+    `complete` is set when the feed has no activities older than `oldest`.
+    """
+
+    entries: list[FileActivity] = []
+    newest: int
+    oldest: int
+    complete: bool = False
+
+    def merge(self, activities: list[FileActivity], newest: int, oldest: int) -> None:
+        """Merge activities covering the id range [oldest, newest] that borders or overlaps this buffer."""
+        by_id = {entry.activity_id: entry for entry in self.entries}
+        by_id.update((activity.activity_id, activity) for activity in activities)
+        self.entries = sorted(by_id.values(), key=lambda entry: entry.activity_id or 0, reverse=True)
+        self.newest = max(self.newest, newest)
+        self.oldest = min(self.oldest, oldest)
+
+    def trim(self, size: int) -> None:
+        """Drop the oldest entries beyond size."""
+        if len(self.entries) > size:
+            self.entries = self.entries[:size]
+            self.oldest = self.entries[-1].activity_id or 0
+            self.complete = False
+
+    def page(self, since: int, limit: int) -> list[FileActivity]:
+        """Activities older than `since` (all when 0), newest first."""
+        entries = [entry for entry in self.entries if (entry.activity_id or 0) < since] if since else self.entries
+        return entries[:limit]
+
+    def covers(self, since: int, limit: int) -> bool:
+        """Check if a page can be answered from the buffer without missing activities."""
+        if since > self.newest + 1:
+            return False
+        if since and since <= self.oldest:
+            return self.complete
+        return self.complete or len(self.page(since, limit)) >= limit
+
+    def to_response(self, since: int, limit: int) -> FileActivityResponse:
+        results = self.page(since, limit)
+        return FileActivityResponse(results=results, last_given=results[-1].activity_id if results else None)
+
+
+class FavoritesSnapshot(BaseModel):
+    """Cached favourite files of a user, sorted by file id descending.
+
+    Valid as long as the ETag of the user's root folder is unchanged.
+    """
+
+    etag: str
+    results: list[FileActivity] = []
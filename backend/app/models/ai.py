@@ -1,11 +1,25 @@
 from pydantic import BaseModel
 
+from app.types import AICacheScope
+
 
 class ChatCompletionRequest(BaseModel):
     prompt: str
+    # Whether the answer may come from, and go into, the response cache; None uses AI_CACHE_SCOPE
+    cache: AICacheScope | None = None
 
 
 class StreamChunk(BaseModel):
     id: str
     content: str | None = None
     finish_reason: str | None = None
+    # Place in the queue while the request waits for a streaming slot
+    queue_position: int | None = None
+
+
+class CachedCompletion(BaseModel):
+    """A complete streamed answer, as the content of its chunks."""
+
+    chunks: list[str]
+    finish_reason: str | None = None
+    created_at: float  # Unix time, so every replica expires the answer at the same moment
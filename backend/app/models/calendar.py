@@ -7,3 +7,6 @@ class Calendar(BaseModel):
     title: str
     start: datetime
     end: datetime
+    uid: str | None = None
+    # Start of the occurrence a recurring event instance stands for
+    recurrence_id: datetime | None = None
@@ -1,6 +1,42 @@
+from datetime import datetime as DateTime
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+SearchSourceStatus = Literal["ok", "error", "timeout", "cancelled", "throttled"]
+
 
 class FileSearchResult(BaseModel):
     name: str = Field(alias="title")
     url: str = Field(alias="resourceUrl")
+
+
+class FileSearchPage(BaseModel):
+    """A page of Nextcloud unified search results; `cursor` continues it when it is paginated."""
+
+    entries: list[FileSearchResult] = []
+    cursor: int | None = None
+    is_paginated: bool = Field(default=False, alias="isPaginated")
+
+
+class SearchHit(BaseModel):
+    """Single result of the unified search."""
+
+    source: str
+    title: str
+    url: str | None = None
+    updated_at: DateTime | None = None
+    score: float = 0.0
+
+
+class SearchResponse(BaseModel):
+    """Ranked results of the unified search, with the outcome per source.
+
+    A source is `timeout` when it missed the deadline and `cancelled` when it did not answer within the grace
+    period after enough results were in.
+    In typeahead mode, `superseded` is set on the response of a search that was cancelled by a newer one.
+    """
+
+    results: list[SearchHit]
+    sources: dict[str, SearchSourceStatus] = {}
+    superseded: bool = False
@@ -1,9 +1,20 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Task(BaseModel):
     title: str
     start: datetime | None
     end: datetime | None
+    uid: str | None = None
+    # Unique among the user's tasks, unlike the UID: the object's href and RECURRENCE-ID.
+    # Breaks ties in the page order and is not part of the response.
+    ref: str = Field(default="", exclude=True)
+
+
+class TaskPage(BaseModel):
+    """Open tasks sorted by due date, with the cursor of the next page if there is one."""
+
+    results: list[Task]
+    next_cursor: str | None = None
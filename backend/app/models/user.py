@@ -15,6 +15,24 @@ class User(BaseModel):
     email: str
     roles: list[str] = []
 
+    @classmethod
+    def from_claims(cls, claims: dict[str, Any], name_claim: str, email_claim: str) -> "User":
+        """Construct User from ID token or access token claims."""
+        realm_roles: list[str] = claims.get("realm_access", {}).get("roles", [])
+
+        return cls(
+            name=claims.get(name_claim, "Unknown"),
+            email=claims.get(email_claim, "no-email@unknown.local"),
+            roles=realm_roles,
+        )
+
+
+class ExchangedToken(BaseModel):
+    """Access token for a backend service audience, obtained via token exchange."""
+
+    access_token: str
+    expires_at: int
+
 
 class AuthState(BaseModel):
     """Authentication state from OAuth."""
@@ -39,15 +57,9 @@ class AuthState(BaseModel):
         if userinfo.get("azp") != settings.OIDC_AUDIENCE:
             raise CredentialError("Invalid token azp")
 
-        realm_roles: list[str] = userinfo.get("realm_access", {}).get("roles", [])
-
         return cls(
             sub=cls._require_string(userinfo, "sub"),
-            user=User(
-                name=userinfo.get(name_claim, "Unknown"),
-                email=userinfo.get(email_claim, "no-email@unknown.local"),
-                roles=realm_roles,
-            ),
+            user=User.from_claims(userinfo, name_claim=name_claim, email_claim=email_claim),
             access_token=cls._require_string(token, "access_token"),
             refresh_token=token.get("refresh_token"),
             expires_at=token.get("expires_at"),
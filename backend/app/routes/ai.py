@@ -1,9 +1,13 @@
 import logging
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from app.clients.ai import AIClient
+from app.core import session
+from app.core.ai_admission import ai_admission
+from app.core.ai_cache import ai_response_cache
 from app.core.config import settings
 from app.exceptions import ServiceUnavailableError
 from app.models.ai import ChatCompletionRequest
@@ -14,11 +18,24 @@ router = APIRouter(prefix="/ai", tags=["ai"])
 
 
 @router.post("/chat/completions")
-async def ai_post_chat_completions(chat_request: ChatCompletionRequest) -> StreamingResponse:
+async def ai_post_chat_completions(chat_request: ChatCompletionRequest, request: Request) -> StreamingResponse:
     # Redundant checks needed to satisfy the type system.
     if not settings.ai_enabled or not settings.AI_MODEL:
         raise ServiceUnavailableError("AI")
 
-    client = AIClient(model=settings.AI_MODEL, base_url=settings.AI_URL, api_key=settings.AI_API_KEY)
-
-    return StreamingResponse(client.stream_response(chat_request=chat_request), media_type="text/event-stream")
+    # User-scoped cache entries and per-user limits need the session's user
+    auth = await session.get_auth(request)
+    client = AIClient(
+        model=settings.AI_MODEL,
+        base_url=settings.AI_URL,
+        api_key=settings.AI_API_KEY,
+        cache=ai_response_cache if settings.AI_CACHE_ENABLED else None,
+        user_key=auth.sub if auth else None,
+        admission=ai_admission,
+    )
+
+    # Queued before the response starts, so a full queue is still answered with 429
+    stream, ticket = await client.start_stream(chat_request=chat_request)
+    # Frees the ticket if the client leaves before the stream starts; after the stream it is a no-op
+    background = BackgroundTask(ai_admission.release, ticket) if ticket else None
+    return StreamingResponse(stream, media_type="text/event-stream", background=background)
@@ -12,6 +12,7 @@ from app.core.oauth import oauth
 from app.core.translate import _
 from app.exceptions import CredentialError
 from app.models.user import AuthState, User
+from app.token_exchange import prefetch_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +56,8 @@ async def callback(request: Request) -> RedirectResponse:
     try:
         token: dict[str, Any] = await oauth.oidc.authorize_access_token(request)  # type: ignore[reportUnknownMemberType]
         auth = AuthState.from_token(token, name_claim=settings.OIDC_NAME_CLAIM, email_claim=settings.OIDC_EMAIL_CLAIM)  # type: ignore[reportUnknownArgumentType]
-        await session.set_auth(request, auth)  # type: ignore[reportUnknownArgumentType]
+        session_id = await session.set_auth(request, auth)  # type: ignore[reportUnknownArgumentType]
+        await prefetch_tokens(session_id, auth.access_token)
 
         redirect_to = request.session.pop("redirect_to", "/")
         logger.info(f"User {auth.sub} authenticated successfully")  # type: ignore[reportUnknownMemberType]
@@ -4,10 +4,12 @@ from datetime import date, datetime
 from fastapi import APIRouter, Request
 
 from app.clients.caldav import CaldavClient
+from app.core import session
 from app.core.config import settings
-from app.exceptions import ServiceUnavailableError
+from app.core.translate import _
+from app.exceptions import BadRequestError, ServiceUnavailableError
 from app.models.calendar import Calendar
-from app.models.task import Task
+from app.models.task import TaskPage
 from app.token_exchange import get_token
 
 logger = logging.getLogger(__name__)
@@ -22,26 +24,47 @@ async def get_caldav_client(request: Request) -> CaldavClient:
     # Get auth from session (already refreshed by get_current_user dependency)
     new_token = await get_token(request, settings.TASK_AUDIENCE)
 
-    return CaldavClient(base_url=settings.TASK_URL, token=new_token)
+    # Expanded events are cached per user; bearer clients without a session are served uncached
+    auth = await session.get_auth(request)
+    cache_key = auth.sub if auth else None
+
+    return CaldavClient(base_url=settings.TASK_URL, token=new_token, cache_key=cache_key)
 
 
 @router.get("/calendars/{calendar_date}")
 async def caldav_calendar(
     calendar_date: date,
     request: Request,
-) -> list[Calendar | None]:
+) -> list[Calendar]:
     """Get calendar events for a specific date."""
     client = await get_caldav_client(request)
+    return await client.get_calendars(check_date=calendar_date)
 
-    calendar_items: list[Calendar | None] = client.get_calendars(
-        check_date=datetime.combine(calendar_date, datetime.min.time())
-    )
 
-    return calendar_items
+@router.get("/calendars", response_model=list[Calendar])
+async def caldav_calendar_range(start: date, end: date, request: Request) -> list[Calendar]:
+    """Get calendar events for the days from start through end, for week and month views."""
+    if end < start:
+        raise BadRequestError(_("End date must not be before start date"))
+    if (end - start).days >= settings.CALDAV_MAX_RANGE_DAYS:
+        raise BadRequestError(_(f"Date range can span at most {settings.CALDAV_MAX_RANGE_DAYS} days"))
+
+    client = await get_caldav_client(request)
+    return await client.get_events(start, end)
 
 
-@router.get("/tasks", response_model=list[Task])
-async def caldav_tasks(request: Request) -> list[Task]:
-    """Get tasks from CalDAV service."""
+@router.get("/tasks", response_model=TaskPage)
+async def caldav_tasks(
+    request: Request,
+    limit: int = 50,
+    cursor: str | None = None,
+    due_before: datetime | None = None,
+) -> TaskPage:
+    """Get open tasks from CalDAV service, sorted by due date, with cursor-based pagination."""
+    if limit < 1:
+        raise BadRequestError(_("Limit must be at least 1"))
+
     client = await get_caldav_client(request)
-    return client.get_tasks()
+    return await client.get_tasks(
+        limit=min(limit, settings.CALDAV_TASKS_MAX_LIMIT), cursor=cursor, due_before=due_before
+    )
@@ -5,6 +5,7 @@ import logging
 from fastapi import APIRouter, Request
 
 from app.clients.grist import GristClient
+from app.core import session
 from app.core.config import settings
 from app.core.http_clients import HTTPClient
 from app.exceptions import ServiceUnavailableError
@@ -24,8 +25,11 @@ async def get_grist_client(request: Request, http_client: HTTPClient) -> GristCl
     # Get auth from session (already refreshed by get_current_user dependency)
     token = await get_token(request, settings.GRIST_AUDIENCE)
 
-    # Create client and fetch organizations
-    return GristClient(http_client, settings.GRIST_URL, token)
+    # Document listings are indexed per user; bearer clients without a session are served uncached
+    auth = await session.get_auth(request)
+    cache_key = auth.sub if auth else None
+
+    return GristClient(http_client, settings.GRIST_URL, token, cache_key=cache_key)
 
 
 @router.get("/orgs", response_model=list[GristOrganization])
@@ -58,3 +62,18 @@ async def get_documents(
 
     client = await get_grist_client(request, http_client)
     return await client.get_documents(organization_id, page, page_size)
+
+
+@router.get("/docs/recent", response_model=list[GristDocument])
+async def get_recent_documents(
+    request: Request,
+    http_client: HTTPClient,
+    limit: int = 5,
+) -> list[GristDocument]:
+    """Get the most recently updated documents across all organizations the user has access to.
+
+    Note: Auth is already validated by get_current_user() at router level.
+    """
+
+    client = await get_grist_client(request, http_client)
+    return await client.get_recent_documents(limit=limit, concurrency=settings.GRIST_ORG_CONCURRENCY)
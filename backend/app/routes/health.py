@@ -1,4 +1,9 @@
+from dataclasses import asdict
+
 from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.core.readiness import readiness_monitor
 
 router = APIRouter()
 
@@ -10,11 +15,15 @@ async def root_get_startup() -> None:
     pass
 
 
-@router.get("/readiness", status_code=status.HTTP_204_NO_CONTENT)
-async def root_get_readyness() -> None:
+@router.get("/readiness", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
+async def root_get_readyness() -> JSONResponse | None:
     # Readiness probe - indicates application is ready to accept traffic
-    # TODO: check identity provider connection before returning success
-    pass
+    # Answered from the cached results of the background dependency checks, so it does no I/O itself
+    if not readiness_monitor.running or readiness_monitor.ready:
+        return None
+
+    checks = {name: asdict(result) for name, result in readiness_monitor.results.items()}
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"checks": checks})
 
 
 @router.get("/liveness", status_code=status.HTTP_204_NO_CONTENT)
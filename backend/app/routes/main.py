@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.routes import ai, caldav, config, conversations, docs, drive, grist, meet, ocs
+from app.routes import ai, caldav, config, conversations, docs, drive, grist, meet, ocs, search
 
 api_router = APIRouter()
 api_router.include_router(docs.router)
@@ -12,3 +12,4 @@ api_router.include_router(drive.router)
 api_router.include_router(meet.router)
 api_router.include_router(conversations.router)
 api_router.include_router(grist.router)
+api_router.include_router(search.router)
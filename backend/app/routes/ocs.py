@@ -3,6 +3,7 @@ import logging
 from fastapi import APIRouter, Request
 
 from app.clients.ocs import OCSClient
+from app.core import session
 from app.core.config import settings
 from app.core.http_clients import HTTPClient
 from app.exceptions import ServiceUnavailableError
@@ -20,7 +21,11 @@ async def get_ocs_client(request: Request, http_client: HTTPClient) -> OCSClient
 
     token = await get_token(request, settings.OCS_AUDIENCE)
 
-    return OCSClient(http_client, settings.OCS_URL, token, timeout=10.0)
+    # Activity feed and favorites are cached per user; bearer clients without a session are served uncached
+    auth = await session.get_auth(request)
+    cache_key = auth.sub if auth else None
+
+    return OCSClient(http_client, settings.OCS_URL, token, timeout=10.0, cache_key=cache_key)
 
 
 @router.get("/activities", response_model=FileActivityResponse)
@@ -0,0 +1,114 @@
+import logging
+from functools import partial
+from typing import Literal
+
+from fastapi import APIRouter, Request
+
+from app.core import session
+from app.core.config import settings
+from app.core.http_clients import HTTPClient
+from app.core.search import SCORERS, SearchProvider, fan_out_search, parse_timestamp, rank
+from app.core.typeahead import in_flight_searches, is_complete, load_prefix_results, save_prefix_results
+from app.models.search import SearchHit, SearchResponse
+from app.routes.conversations import get_conversations_client
+from app.routes.docs import get_docs_client
+from app.routes.drive import get_drive_client
+from app.routes.ocs import get_ocs_client
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+async def _search_ocs(request: Request, http_client: HTTPClient, term: str, limit: int) -> list[SearchHit]:
+    client = await get_ocs_client(request, http_client)
+    response = await client.search_files(term=term, limit=limit)
+    files = [file for activity in response.results for file in activity.files]
+    return [SearchHit(source="ocs", title=file.name, url=file.link) for file in files[:limit]]
+
+
+async def _search_docs(request: Request, http_client: HTTPClient, term: str, limit: int) -> list[SearchHit]:
+    client = await get_docs_client(request, http_client)
+    response = await client.get_documents(page_size=limit, title=term)
+    return [
+        SearchHit(source="docs", title=note.title or "", url=note.url, updated_at=parse_timestamp(note.updated_at))
+        for note in response.results
+    ]
+
+
+async def _search_drive(request: Request, http_client: HTTPClient, term: str, limit: int) -> list[SearchHit]:
+    client = await get_drive_client(request, http_client)
+    response = await client.get_documents(page_size=limit, title=term)
+    return [
+        SearchHit(source="drive", title=item.title, url=item.url, updated_at=parse_timestamp(item.updated_at))
+        for item in response.results
+    ]
+
+
+async def _search_conversations(request: Request, http_client: HTTPClient, term: str, limit: int) -> list[SearchHit]:
+    client = await get_conversations_client(request, http_client)
+    response = await client.get_chats(page_size=limit, title=term)
+    return [
+        SearchHit(source="conversation", title=chat.title, url=chat.url, updated_at=parse_timestamp(chat.updated_at))
+        for chat in response.results
+    ]
+
+
+def get_search_providers(request: Request, http_client: HTTPClient) -> dict[str, SearchProvider]:
+    """Search providers of the enabled services, by source name."""
+    providers: dict[str, SearchProvider] = {}
+    if settings.ocs_enabled:
+        providers["ocs"] = partial(_search_ocs, request, http_client)
+    if settings.docs_enabled:
+        providers["docs"] = partial(_search_docs, request, http_client)
+    if settings.drive_enabled:
+        providers["drive"] = partial(_search_drive, request, http_client)
+    if settings.conversation_enabled:
+        providers["conversation"] = partial(_search_conversations, request, http_client)
+    return providers
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    request: Request,
+    http_client: HTTPClient,
+    term: str,
+    limit: int = 20,
+    order: Literal["relevance", "recency"] = "relevance",
+    typeahead: bool = False,
+) -> SearchResponse:
+    """Search all enabled services at once and return a single ranked list.
+
+    With typeahead=true, a newer search of the same session cancels this one, and terms that extend
+    a recently searched term are answered from that term's results when they were complete.
+    """
+    if not term.strip():
+        return SearchResponse(results=[])
+
+    limit = min(max(1, limit), settings.SEARCH_MAX_LIMIT)
+    scorer = SCORERS[order]
+    providers = get_search_providers(request, http_client)
+
+    auth = await session.get_auth(request)
+    if not typeahead or auth is None:
+        return await fan_out_search(
+            providers, term, limit, deadline=settings.SEARCH_DEADLINE, scorer=scorer, grace=settings.SEARCH_GRACE
+        )
+
+    cached = await load_prefix_results(auth.sub, term)
+    if cached is not None:
+        cached.results = rank(cached.results, term, limit, scorer)
+        return cached
+
+    response = await in_flight_searches.run(
+        request.session["session_id"],
+        fan_out_search(
+            providers, term, limit, deadline=settings.SEARCH_DEADLINE, scorer=scorer, grace=settings.SEARCH_GRACE
+        ),
+    )
+    if response is None:
+        return SearchResponse(results=[], superseded=True)
+
+    if is_complete(response, limit):
+        await save_prefix_results(auth.sub, term, response)
+    return response
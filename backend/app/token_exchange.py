@@ -1,12 +1,19 @@
+import asyncio
 import logging
+import time
 
 import httpx
 from fastapi import Request
 
+from app.context import timed
 from app.core import session
 from app.core.config import settings
+from app.core.http_clients import http_client_dependency
+from app.core.metrics import token_exchange_duration
+from app.core.tracing import span
 from app.core.translate import _
 from app.exceptions import CredentialError, TokenExchangeError
+from app.models.user import ExchangedToken
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +24,7 @@ async def exchange_token(
     subject_token_type: str = "urn:ietf:params:oauth:token-type:access_token",  # noqa: S107
     requested_token_type: str = "urn:ietf:params:oauth:token-type:access_token",  # noqa: S107
     scope: str = "openid",
-) -> str | None:
+) -> ExchangedToken:
     logger.info(f"Exchanging token for audience={audience}")
 
     data = {
@@ -29,11 +36,20 @@ async def exchange_token(
         "audience": audience,
     }
 
-    response = httpx.post(  # todo reuse http_client
-        settings.OIDC_TOKEN_ENDPOINT,
-        data=data,
-        auth=(settings.OIDC_CLIENT_ID, settings.OIDC_CLIENT_SECRET or ""),
-    )
+    http_client = await http_client_dependency()
+    start = time.perf_counter()
+    try:
+        with timed("exchange_token"), span("exchange_token", audience=audience):
+            response = await http_client.post(
+                settings.OIDC_TOKEN_ENDPOINT,
+                data=data,
+                auth=(settings.OIDC_CLIENT_ID, settings.OIDC_CLIENT_SECRET or ""),
+            )
+    except httpx.HTTPError:
+        token_exchange_duration.observe(time.perf_counter() - start, "error")
+        raise
+    outcome = "success" if response.status_code == 200 else "error"
+    token_exchange_duration.observe(time.perf_counter() - start, outcome)
 
     if response.status_code == 400:
         logger.error(f"Token exchange failed with 400 for audience={audience}")
@@ -65,13 +81,67 @@ async def exchange_token(
 
     logger.info(f"Successfully exchanged token for audience={audience}")
 
-    return exchanged_token
+    expires_in = token_data.get("expires_in")
+    expires_at = int(time.time()) + expires_in if isinstance(expires_in, int) else 0
+
+    return ExchangedToken(access_token=exchanged_token, expires_at=expires_at)
+
+
+def _enabled_audiences() -> set[str]:
+    """Audiences of all configured backend services."""
+    services = [
+        (settings.ocs_enabled, settings.OCS_AUDIENCE),
+        (settings.docs_enabled, settings.DOCS_AUDIENCE),
+        (settings.drive_enabled, settings.DRIVE_AUDIENCE),
+        (settings.meet_enabled, settings.MEET_AUDIENCE),
+        (settings.grist_enabled, settings.GRIST_AUDIENCE),
+        (settings.conversation_enabled, settings.CONVERSATION_AUDIENCE),
+        (settings.task_enabled, settings.TASK_AUDIENCE),
+    ]
+    return {audience for enabled, audience in services if enabled}
+
+
+async def prefetch_tokens(session_id: str, access_token: str) -> None:
+    """Exchange tokens for all enabled audiences concurrently and store them in the session.
+
+    Called after login and token refresh, so requests to the backend services find their token cached.
+    Failures are logged and left to get_token, which exchanges on demand.
+    """
+    audiences = sorted(_enabled_audiences())
+    if not audiences:
+        return
+
+    results = await asyncio.gather(
+        *(exchange_token(token=access_token, audience=audience) for audience in audiences),
+        return_exceptions=True,
+    )
+
+    tokens: dict[str, ExchangedToken] = {}
+    for audience, result in zip(audiences, results, strict=True):
+        if isinstance(result, ExchangedToken):
+            tokens[audience] = result
+        else:
+            logger.warning(f"Token prefetch failed for audience={audience}: {result}")
+
+    await session.store_exchanged_tokens(session_id, tokens)
+    logger.info(f"Prefetched tokens for {len(tokens)} of {len(audiences)} audiences")
 
 
 async def get_token(request: Request, audience: str) -> str:
     # Get auth from session (already refreshed by get_current_user dependency)
     auth = await session.get_auth(request)
     if not auth:
-        raise CredentialError(_("Not authenticated"))
-
-    return await exchange_token(token=auth.access_token, audience=audience) or ""
+        # Bearer token of a non-browser client, verified by get_current_user
+        bearer_token = getattr(request.state, "bearer_token", None)
+        if not isinstance(bearer_token, str):
+            raise CredentialError(_("Not authenticated"))
+        return (await exchange_token(token=bearer_token, audience=audience)).access_token
+
+    session_id: str = request.session["session_id"]
+    cached_token = await session.get_exchanged_token(session_id, audience)
+    if cached_token:
+        return cached_token
+
+    exchanged = await exchange_token(token=auth.access_token, audience=audience)
+    await session.store_exchanged_tokens(session_id, {audience: exchanged})
+    return exchanged.access_token
@@ -1,3 +1,5 @@
 from typing import Literal
 
 LoggingLevelType = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+LoggingFormatType = Literal["json", "generic"]
+AICacheScope = Literal["shared", "user", "off"]
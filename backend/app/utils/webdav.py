@@ -0,0 +1,72 @@
+"""Streaming reader for WebDAV multistatus responses.
+
+Parses the body while it is downloaded instead of building a string and a full DOM first.
+Each `d:response` element is discarded once it has been turned into a FileInfo, so memory
+stays flat regardless of the number of entries. The parser is defusedxml's, with DTDs
+forbidden altogether, so entity expansion and external entity attacks are rejected.
+"""
+
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from typing import cast
+from xml.etree.ElementTree import Element, TreeBuilder, XMLPullParser
+
+from defusedxml.ElementTree import DefusedXMLParser
+
+from app.models.activity import FileInfo
+
+DAV = "{DAV:}"
+OC = "{http://owncloud.org/ns}"
+
+
+def _to_file_info(response: Element, base_url: str, base_path: str) -> FileInfo | None:
+    href = response.findtext(f"{DAV}href") or ""
+    propstat = response.find(f"{DAV}propstat")
+    if propstat is None:
+        return None
+    if "200" not in (propstat.findtext(f"{DAV}status") or ""):
+        return None
+    prop = propstat.find(f"{DAV}prop")
+    if prop is None:
+        return None
+
+    display_name = prop.findtext(f"{DAV}displayname") or href.rstrip("/").split("/")[-1]
+    file_id_str = prop.findtext(f"{OC}fileid")
+    file_id = int(file_id_str) if file_id_str else None
+    path = href[len(base_path) :] if href.startswith(base_path) else href
+    link = f"{base_url}/f/{file_id}" if file_id else None
+
+    return FileInfo(id=file_id, name=display_name, path=path, link=link)
+
+
+async def iter_multistatus_files(
+    chunks: AsyncIterable[bytes],
+    base_url: str,
+    base_path: str,
+) -> AsyncIterator[FileInfo]:
+    """Yield a FileInfo for every successful `d:response` in a multistatus body, as it streams in.
+
+    Raises xml.etree.ElementTree.ParseError for malformed XML and a defusedxml
+    DefusedXmlException for documents with a DTD.
+    """
+    parser = XMLPullParser(events=("start", "end"), _parser=DefusedXMLParser(target=TreeBuilder(), forbid_dtd=True))
+    root: Element | None = None
+
+    async for chunk in chunks:
+        parser.feed(chunk)
+        # Only start and end events are requested, which always carry an element
+        for event, element in cast(Iterator[tuple[str, Element]], parser.read_events()):
+            if root is None and event == "start":
+                root = element
+            if event != "end" or element.tag != f"{DAV}response":
+                continue
+
+            file_info = _to_file_info(element, base_url, base_path)
+            # Drop the processed response so the tree never holds more than one entry
+            if root is not None:
+                root.clear()
+            if file_info is None:
+                continue
+
+            yield file_info
+
+    parser.close()
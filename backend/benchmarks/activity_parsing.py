@@ -0,0 +1,120 @@
+"""Benchmark parsing an activity feed page with Activity versus the lean ActivityEntry.
+
+Both runs validate the same raw page and build the FileActivity list the OCS client returns,
+so the numbers cover the full path from decoded JSON to response model.
+
+Usage: uv run python -m benchmarks.activity_parsing [--activities 500] [--rounds 50]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from app.models.activity import Activity, ActivityEntry, FileActivity
+from pydantic import TypeAdapter
+
+
+def build_page(activities: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "activity_id": 10_000 + i,
+            "app": "files",
+            "type": "file_changed",
+            "affecteduser": "testuser",
+            "user": "testuser",
+            "timestamp": 1768914950,
+            "subject": f"You changed report-{i}.docx",
+            "subject_rich": [
+                "You changed {file}",
+                {
+                    "file": {
+                        "type": "file",
+                        "id": str(30_000 + i),
+                        "name": f"report-{i}.docx",
+                        "path": f"Documents/report-{i}.docx",
+                        "link": f"https://nextcloud.example.com/f/{30_000 + i}",
+                    }
+                },
+            ],
+            "message": "",
+            "message_rich": ["", []],
+            "object_type": "files",
+            "object_id": 30_000 + i,
+            "object_name": f"/Documents/report-{i}.docx",
+            "objects": {str(30_000 + i): f"/Documents/report-{i}.docx"},
+            "link": f"https://nextcloud.example.com/apps/files/?dir=/Documents&fileid={30_000 + i}",
+            "icon": "https://nextcloud.example.com/apps/files/img/change.svg",
+            "datetime": "2026-01-20T13:15:50+00:00",
+        }
+        for i in range(activities)
+    ]
+
+
+def parse_with_activity(page: list[dict[str, Any]]) -> list[FileActivity]:
+    activities = TypeAdapter(list[Activity]).validate_python(page)
+    return [
+        FileActivity(
+            activity_id=activity.activity_id,
+            datetime=activity.datetime,
+            action=activity.type,
+            files=activity.extract_files(),
+        )
+        for activity in activities
+    ]
+
+
+def parse_with_activity_entry(page: list[dict[str, Any]]) -> list[FileActivity]:
+    activities = TypeAdapter(list[ActivityEntry]).validate_python(page)
+    return [
+        FileActivity(
+            activity_id=activity.activity_id,
+            datetime=activity.datetime,
+            action=activity.type,
+            files=activity.extract_files(),
+        )
+        for activity in activities
+    ]
+
+
+def measure(
+    parse: Callable[[list[dict[str, Any]]], list[FileActivity]], page: list[dict[str, Any]], rounds: int
+) -> dict[str, float]:
+    parse(page)  # warm up the validator caches
+    timings: list[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        parse(page)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "best_ms": round(min(timings) * 1000, 2),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activities", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    page = build_page(args.activities)
+    report = {
+        "activities": args.activities,
+        "activity": measure(parse_with_activity, page, args.rounds),
+        "activity_entry": measure(parse_with_activity_entry, page, args.rounds),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark selecting the translation catalog for a request, per request versus preloaded.
+
+The per-request path is the previous set_locale: parse the first Accept-Language entry and
+call gettext.translation for it. The preloaded path is the current set_locale, which
+negotiates against catalogs loaded at startup. Both run against the same compiled catalog.
+
+Usage: uv run python -m benchmarks.language_middleware [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import gettext
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from app.core import translate
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import write_mo
+from fastapi import Request
+
+HEADERS = ["nl-NL,nl;q=0.9,en;q=0.8", "en-US,en;q=0.9", "nl", "de-DE,de;q=0.9,nl;q=0.5"]
+
+
+def build_locales(locales_dir: Path) -> None:
+    catalog = Catalog(locale="nl_NL")
+    for i in range(200):
+        catalog.add(f"Message {i}", f"Bericht {i}")
+    mo_file = locales_dir / "nl_NL" / "LC_MESSAGES" / "messages.mo"
+    mo_file.parent.mkdir(parents=True)
+    with mo_file.open("wb") as fp:
+        write_mo(fp, catalog)
+
+
+def per_request(request: Request, locales_dir: Path) -> None:
+    language = request.headers.get("Accept-Language", "en_US").split(",")[0].replace("-", "_")
+    translate._translation_context.set(
+        gettext.translation("messages", localedir=locales_dir, languages=[language], fallback=True)
+    )
+
+
+async def measure_per_request(requests: list[Request], locales_dir: Path) -> float:
+    start = time.perf_counter()
+    for request in requests:
+        per_request(request, locales_dir)
+    return time.perf_counter() - start
+
+
+async def measure_preloaded(requests: list[Request]) -> float:
+    start = time.perf_counter()
+    for request in requests:
+        await translate.set_locale(request)
+    return time.perf_counter() - start
+
+
+def summarize(elapsed: float, requests: int) -> dict[str, float]:
+    return {
+        "total_ms": round(elapsed * 1000, 2),
+        "per_request_us": round(elapsed / requests * 1_000_000, 2),
+    }
+
+
+async def run(requests: int) -> dict[str, object]:
+    with tempfile.TemporaryDirectory() as tmp:
+        locales_dir = Path(tmp)
+        build_locales(locales_dir)
+        translate.load_catalogs(locales_dir)
+
+        mocks: list[Request] = []
+        for i in range(requests):
+            request = MagicMock(spec=Request)
+            request.headers = {"Accept-Language": HEADERS[i % len(HEADERS)]}
+            mocks.append(request)
+
+        per_request_elapsed = await measure_per_request(mocks, locales_dir)
+        preloaded_elapsed = await measure_preloaded(mocks)
+
+    return {
+        "requests": requests,
+        "per_request": summarize(per_request_elapsed, requests),
+        "preloaded": summarize(preloaded_elapsed, requests),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Load test the API in-process against stand-ins for the backend services, the IdP and Redis.
+
+Simulated users with a logged-in session each run a weighted mix of the requests the
+dashboard makes. The backend services answer from the mockserver expectations in `mocks/`,
+so a run needs no containers and measures only the API: requests per second, latency
+percentiles per endpoint and the event loop lag while under load.
+
+The report is JSON. Save it with --output and pass it as --compare to a later run (for
+example on another commit) to add the relative differences to the report.
+
+The AI chat endpoint is left out: it streams from the OpenAI client, which has no stand-in.
+
+Usage: uv run python -m benchmarks.load_test [--requests 5000] [--concurrency 50] [--output report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from base64 import b64encode
+from pathlib import Path
+from typing import Any
+
+# Settings are read when the app is imported, so the environment is set up first
+MOCK_HOSTS = {
+    "docs.mock": "docs",
+    "drive.mock": "drive",
+    "meet.mock": "meet",
+    "grist.mock": "grist",
+    "conversations.mock": "conversations",
+    "nextcloud.mock": "nextcloud",
+}
+IDP_HOST = "idp.mock"
+SECRET_KEY = "load-test-secret-key"  # noqa: S105
+
+os.environ.update(
+    {
+        "ENVIRONMENT": "test",
+        "LOGGING_LEVEL": "WARNING",
+        "SECRET_KEY": SECRET_KEY,
+        "TOKEN_REFRESH_ENABLED": "false",
+        "READINESS_CHECKS_ENABLED": "false",
+        "OCS_SEARCH_RATE_LIMIT": str(sys.maxsize),
+        "OIDC_TOKEN_ENDPOINT": f"http://{IDP_HOST}/protocol/openid-connect/token",
+        "DOCS_URL": "http://docs.mock",
+        "DRIVE_URL": "http://drive.mock",
+        "MEET_URL": "http://meet.mock",
+        "GRIST_URL": "http://grist.mock",
+        "CONVERSATION_URL": "http://conversations.mock",
+        "OCS_URL": "http://nextcloud.mock",
+    }
+)
+
+import httpx  # noqa: E402
+from app.core.http_clients import StatelessTransport, add_request_id_header, http_client_dependency  # noqa: E402
+from app.main import app as api  # noqa: E402
+from app.models.user import AuthState, User  # noqa: E402
+from itsdangerous import TimestampSigner  # noqa: E402
+
+from benchmarks.stand_ins import FakeRedis, MockServerTransport  # noqa: E402
+
+# Path and relative weight, roughly what a dashboard load and its refreshes request
+MIX = [
+    ("/api/v1/config", 2),
+    ("/api/v1/docs/documents", 3),
+    ("/api/v1/drive/documents", 3),
+    ("/api/v1/meet/rooms", 2),
+    ("/api/v1/grist/docs?organization_id=2", 2),
+    ("/api/v1/ocs/activities", 3),
+    ("/api/v1/conversations/chats", 2),
+    ("/api/v1/search?term=cat", 1),
+]
+LAG_INTERVAL = 0.01
+
+# Keep library debug logging (like a line per outgoing request) out of the report on stdout
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def install_stand_ins(latency: float) -> FakeRedis:
+    """Point the shared HTTP client at the mock transport and every Redis user at a FakeRedis."""
+    transport = MockServerTransport(MOCK_HOSTS, token_host=IDP_HOST, latency=latency)
+    http_client_dependency.http_client = httpx.AsyncClient(
+        transport=StatelessTransport(transport), event_hooks={"request": [add_request_id_header]}
+    )
+
+    redis = FakeRedis()
+    for name, module in list(sys.modules.items()):
+        if name.startswith("app.") and hasattr(module, "get_redis_client"):
+            module.get_redis_client = lambda: redis
+    return redis
+
+
+async def create_sessions(redis: FakeRedis, users: int) -> list[str]:
+    """Store a logged-in AuthState per user and return their signed session cookies."""
+    signer = TimestampSigner(SECRET_KEY)
+    cookies: list[str] = []
+    for i in range(users):
+        session_id = str(uuid.uuid4())
+        auth = AuthState(
+            sub=f"user-{i}",
+            user=User(name=f"User {i}", email=f"user-{i}@example.com"),
+            access_token=f"access-token-{i}",
+            expires_at=int(time.time()) + 24 * 60 * 60,
+        )
+        await redis.set(f"auth:{session_id}", auth.model_dump_json())
+        session = b64encode(json.dumps({"session_id": session_id}).encode())
+        cookies.append(f"bureaublad_session={signer.sign(session).decode()}")
+    return cookies
+
+
+async def sample_loop_lag(samples: list[float]) -> None:
+    """Record how late the loop wakes up from a short sleep: the time callbacks wait for a blocked loop."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(time.perf_counter() - start - LAG_INTERVAL)
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        value = round(values[0] * 1000, 3) if values else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value, "max_ms": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+async def run(requests: int, concurrency: int, users: int, latency: float, seed: int) -> dict[str, Any]:
+    redis = install_stand_ins(latency)
+    cookies = await create_sessions(redis, users)
+
+    rng = random.Random(seed)  # noqa: S311
+    paths, weights = zip(*MIX, strict=True)
+    plan = [(path, rng.choice(cookies)) for path in rng.choices(paths, weights, k=requests)]
+    latencies: dict[str, list[float]] = {path: [] for path in paths}
+    errors: dict[str, int] = dict.fromkeys(paths, 0)
+    lag: list[float] = []
+
+    transport = httpx.ASGITransport(app=api)
+    async with (
+        api.router.lifespan_context(api),
+        httpx.AsyncClient(transport=transport, base_url="http://testserver") as client,
+    ):
+
+        async def worker() -> None:
+            while plan:
+                path, cookie = plan.pop()
+                start = time.perf_counter()
+                response = await client.get(path, headers={"Cookie": cookie})
+                latencies[path].append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors[path] += 1
+
+        lag_task = asyncio.create_task(sample_loop_lag(lag))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        lag_task.cancel()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "commit": git_commit(),
+        "parameters": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "users": users,
+            "upstream_latency_ms": latency * 1000,
+            "seed": seed,
+        },
+        "overall": {
+            "rps": round(requests / elapsed, 1),
+            "elapsed_s": round(elapsed, 3),
+            "errors": sum(errors.values()),
+            **percentiles(all_latencies),
+        },
+        "endpoints": {
+            path: {"requests": len(values), "errors": errors[path], **percentiles(values)}
+            for path, values in latencies.items()
+        },
+        "loop_lag": {"samples": len(lag), **percentiles(lag)},
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any]) -> dict[str, Any]:
+    """Relative change of each number in the report versus the baseline, e.g. -0.25 for 25% less."""
+
+    def change(current: float, previous: float) -> float | None:
+        return round((current - previous) / previous, 3) if previous else None
+
+    sections = {"overall": report["overall"], "loop_lag": report["loop_lag"]}
+    previous_sections = {"overall": baseline["overall"], "loop_lag": baseline["loop_lag"]}
+    sections |= {f"endpoints {path}": values for path, values in report["endpoints"].items()}
+    previous_sections |= {f"endpoints {path}": values for path, values in baseline["endpoints"].items()}
+
+    return {
+        "baseline_commit": baseline.get("commit"),
+        **{
+            name: {key: change(value, previous_sections[name][key]) for key, value in values.items()}
+            for name, values in sections.items()
+            if name in previous_sections
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--upstream-latency-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the report to this file")
+    parser.add_argument("--compare", type=Path, help="report of an earlier run to compare with")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.requests, args.concurrency, args.users, args.upstream_latency_ms / 1000, args.seed))
+    if args.compare:
+        report["compared"] = compare(report, json.loads(args.compare.read_text()))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
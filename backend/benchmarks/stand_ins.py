@@ -0,0 +1,183 @@
+"""In-process stand-ins for the services the API talks to, used by the load test.
+
+MockServerTransport serves the mockserver expectations from the repository's `mocks/` folder
+(the same files compose.yaml loads into mockserver), plus a token endpoint for the token
+exchange. FakeRedis implements the handful of Redis commands the app uses in memory.
+Neither does any network I/O, so the load test measures the API itself.
+"""
+
+import asyncio
+import json
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any, Self
+from urllib.parse import parse_qs
+
+import httpx
+
+MOCKS_DIR = Path(__file__).resolve().parents[2] / "mocks"
+TOKEN_PATH = "/protocol/openid-connect/token"  # noqa: S105
+
+
+class Expectation:
+    def __init__(self, raw: dict[str, Any]) -> None:
+        request = raw["httpRequest"]
+        response = raw["httpResponse"]
+        self.priority: int = raw.get("priority", 0)
+        self.method: str = request.get("method", "GET")
+        self.path: str = request["path"]
+        self.query: dict[str, list[str]] = request.get("queryStringParameters", {})
+        self.status_code: int = response.get("statusCode", 200)
+        self.headers = {name: values[0] for name, values in response.get("headers", {}).items()}
+        body = response.get("body", "")
+        self.content = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+
+    def matches(self, request: httpx.Request) -> bool:
+        if request.method != self.method or request.url.path != self.path:
+            return False
+        query = parse_qs(request.url.query.decode())
+        return all(set(values) <= set(query.get(name, [])) for name, values in self.query.items())
+
+
+class MockServerTransport(httpx.AsyncBaseTransport):
+    """Answers requests from mockserver expectation files, routed by host name.
+
+    Like mockserver, the matching expectation with the highest priority wins; unmatched
+    requests get a 404. `latency` adds a fixed delay per request to mimic a network hop.
+    """
+
+    def __init__(self, hosts: Mapping[str, str], token_host: str, latency: float = 0.0) -> None:
+        self.expectations = {host: self._load(MOCKS_DIR / f"{name}.json") for host, name in hosts.items()}
+        self.token_host = token_host
+        self.latency = latency
+        self.requests = 0
+
+    @staticmethod
+    def _load(path: Path) -> list[Expectation]:
+        expectations = [Expectation(raw) for raw in json.loads(path.read_text())]
+        # More specific query matches first among equal priorities, like mockserver's ordering
+        return sorted(expectations, key=lambda e: (e.priority, len(e.query)), reverse=True)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if request.url.host == self.token_host and request.url.path == TOKEN_PATH:
+            token = {"access_token": f"exchanged-{time.monotonic_ns()}", "expires_in": 300, "token_type": "Bearer"}
+            return httpx.Response(200, json=token)
+
+        for expectation in self.expectations.get(request.url.host, []):
+            if expectation.matches(request):
+                return httpx.Response(expectation.status_code, headers=expectation.headers, content=expectation.content)
+        return httpx.Response(404)
+
+
+class FakeRedis:
+    """In-memory replacement for the redis.asyncio client, covering the commands the app uses."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+        self.expires: dict[str, float] = {}
+
+    def _live(self, key: str) -> Any:  # noqa: ANN401
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def _expire_in(self, key: str, seconds: float | None) -> None:
+        if seconds is None:
+            self.expires.pop(key, None)
+        else:
+            self.expires[key] = time.monotonic() + seconds
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self._live(key)
+
+    async def mget(self, keys: Iterable[str]) -> list[str | None]:
+        return [self._live(key) for key in keys]
+
+    async def set(self, key: str, value: str, ex: float | None = None, nx: bool = False) -> bool | None:
+        if nx and self._live(key) is not None:
+            return None
+        self.data[key] = str(value)
+        self._expire_in(key, ex)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def expire(self, key: str, seconds: float) -> bool:
+        self._expire_in(key, seconds)
+        return key in self.data
+
+    async def incr(self, key: str) -> int:
+        value = int(self._live(key) or 0) + 1
+        self.data[key] = str(value)
+        return value
+
+    async def hget(self, key: str, field: str) -> str | None:
+        return (self._live(key) or {}).get(field)
+
+    async def hset(self, key: str, mapping: Mapping[str, str]) -> int:
+        hash_ = self.data.setdefault(key, {})
+        hash_.update(mapping)
+        return len(mapping)
+
+    async def zadd(self, key: str, mapping: Mapping[str, float]) -> int:
+        zset = self.data.setdefault(key, {})
+        zset.update(mapping)
+        return len(mapping)
+
+    async def zrem(self, key: str, *members: str) -> int:
+        zset = self.data.get(key, {})
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    async def zrange(self, key: str, start: int, end: int) -> list[str]:
+        members = sorted(self.data.get(key, {}).items(), key=lambda item: item[1])
+        return [member for member, _ in members[start : None if end == -1 else end + 1]]
+
+    async def zremrangebyscore(self, key: str, low: str | float, high: str | float) -> int:
+        zset = self.data.get(key, {})
+        low_score = float("-inf") if low == "-inf" else float(low)
+        high_score = float("inf") if high == "+inf" else float(high)
+        removed = [member for member, score in zset.items() if low_score <= score <= high_score]
+        for member in removed:
+            del zset[member]
+        return len(removed)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.commands.clear()
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        if name.startswith("_") or not hasattr(self.redis, name):
+            raise AttributeError(name)
+
+        def queue(*args: Any, **kwargs: Any) -> Self:  # noqa: ANN401
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list[Any]:
+        results = [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.commands.clear()
+        return results
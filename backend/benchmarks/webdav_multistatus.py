@@ -0,0 +1,124 @@
+"""Benchmark the favourites multistatus parsing on a synthetic document.
+
+Compares parsing the whole body with defusedxml.ElementTree.fromstring (the previous approach)
+against the streaming reader in app.utils.webdav, fed in 64 KiB chunks like httpx would.
+
+Usage: uv run python -m benchmarks.webdav_multistatus [--entries 50000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable, Coroutine
+from typing import Any
+
+import defusedxml.ElementTree as ET
+from app.models.activity import FileInfo
+from app.utils.webdav import iter_multistatus_files
+
+BASE_URL = "https://nextcloud.example.com"
+BASE_PATH = "/remote.php/dav/files/testuser/"
+CHUNK_SIZE = 64 * 1024
+
+
+def build_document(entries: int) -> bytes:
+    responses = "".join(
+        "<d:response>"
+        f"<d:href>{BASE_PATH}Projects/folder-{i % 100}/document-{i}.odt</d:href>"
+        "<d:propstat><d:prop>"
+        "<d:getlastmodified>Tue, 20 Jan 2026 13:15:50 GMT</d:getlastmodified>"
+        "<d:getcontenttype>application/vnd.oasis.opendocument.text</d:getcontenttype>"
+        f"<d:displayname>document-{i}.odt</d:displayname>"
+        f"<oc:fileid>{1000 + i}</oc:fileid><oc:favorite>1</oc:favorite>"
+        "</d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat>"
+        "</d:response>"
+        for i in range(entries)
+    )
+    return (
+        '<?xml version="1.0"?>'
+        '<d:multistatus xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">' + responses + "</d:multistatus>"
+    ).encode()
+
+
+async def parse_with_fromstring(body: bytes, limit: int | None) -> list[FileInfo]:
+    dav = "{DAV:}"
+    oc = "{http://owncloud.org/ns}"
+    root = ET.fromstring(body.decode())
+    files: list[FileInfo] = []
+    for resp in root.findall(f"{dav}response"):
+        href = resp.findtext(f"{dav}href") or ""
+        propstat = resp.find(f"{dav}propstat")
+        if propstat is None or "200" not in (propstat.findtext(f"{dav}status") or ""):
+            continue
+        prop = propstat.find(f"{dav}prop")
+        if prop is None:
+            continue
+        file_id_str = prop.findtext(f"{oc}fileid")
+        file_id = int(file_id_str) if file_id_str else None
+        files.append(
+            FileInfo(
+                id=file_id,
+                name=prop.findtext(f"{dav}displayname") or href.rstrip("/").split("/")[-1],
+                path=href[len(BASE_PATH) :] if href.startswith(BASE_PATH) else href,
+                link=f"{BASE_URL}/f/{file_id}" if file_id else None,
+            )
+        )
+    return files[:limit] if limit else files
+
+
+async def parse_streaming(body: bytes, limit: int | None) -> list[FileInfo]:
+    async def chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(body), CHUNK_SIZE):
+            yield body[start : start + CHUNK_SIZE]
+
+    return [file async for file in iter_multistatus_files(chunks(), BASE_URL, BASE_PATH, limit=limit)]
+
+
+def measure(
+    parse: Callable[[bytes, int | None], Coroutine[Any, Any, list[FileInfo]]],
+    body: bytes,
+    limit: int | None,
+    rounds: int,
+) -> dict[str, float | int]:
+    timings: list[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        files = asyncio.run(parse(body, limit))
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    asyncio.run(parse(body, limit))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "results": len(files),
+        "best_ms": round(min(timings) * 1000, 1),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 1),
+        "peak_mib": round(peak / 1024 / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=1000, help="cap applied to the capped runs")
+    args = parser.parse_args()
+
+    body = build_document(args.entries)
+    report = {
+        "entries": args.entries,
+        "document_mib": round(len(body) / 1024 / 1024, 1),
+        "fromstring": measure(parse_with_fromstring, body, None, args.rounds),
+        "streaming": measure(parse_streaming, body, None, args.rounds),
+        "fromstring_capped": measure(parse_with_fromstring, body, args.limit, args.rounds),
+        "streaming_capped": measure(parse_streaming, body, args.limit, args.rounds),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
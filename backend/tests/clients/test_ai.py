@@ -1,11 +1,15 @@
 """Tests for the AI client."""
 
-from unittest.mock import MagicMock, patch
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from app.clients.ai import AIClient
-from app.exceptions import ExternalServiceError
-from app.models.ai import ChatCompletionRequest
+from app.core.ai_admission import AIAdmission
+from app.core.ai_cache import AIResponseCache, cache_key
+from app.exceptions import ExternalServiceError, TooManyRequestsError
+from app.models.ai import CachedCompletion, ChatCompletionRequest
 from openai import AuthenticationError
 
 
@@ -32,7 +36,7 @@ class TestAIClient:
 
     def test_init(self) -> None:
         """Test AIClient initialization."""
-        with patch("app.clients.ai.OpenAI") as mock_openai:
+        with patch("app.clients.ai.AsyncOpenAI") as mock_openai:
             mock_client = MagicMock()
             mock_openai.return_value = mock_client
 
@@ -48,7 +52,7 @@ class TestAIClient:
 
     def test_init_with_none_values(self) -> None:
         """Test AIClient initialization with None values."""
-        with patch("app.clients.ai.OpenAI") as mock_openai:
+        with patch("app.clients.ai.AsyncOpenAI") as mock_openai:
             mock_client = MagicMock()
             mock_openai.return_value = mock_client
 
@@ -70,9 +74,9 @@ class TestAIClient:
 
         # Mock OpenAI completion
         mock_completion = MagicMock()
-        mock_completion.__iter__ = lambda self: iter(mock_chunks)
+        mock_completion.__aiter__.return_value = mock_chunks
 
-        ai_client.client.chat.completions.create = MagicMock(return_value=mock_completion)
+        ai_client.client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
         # Test the streaming
         chat_request = ChatCompletionRequest(prompt="Test prompt")
@@ -119,9 +123,9 @@ class TestAIClient:
         ]
 
         mock_completion = MagicMock()
-        mock_completion.__iter__ = lambda self: iter(mock_chunks)
+        mock_completion.__aiter__.return_value = mock_chunks
 
-        ai_client.client.chat.completions.create = MagicMock(return_value=mock_completion)
+        ai_client.client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
         chat_request = ChatCompletionRequest(prompt="Test prompt")
         responses = []
@@ -149,9 +153,9 @@ class TestAIClient:
         mock_chunk.choices = []
 
         mock_completion = MagicMock()
-        mock_completion.__iter__ = lambda self: iter([mock_chunk])
+        mock_completion.__aiter__.return_value = [mock_chunk]
 
-        ai_client.client.chat.completions.create = MagicMock(return_value=mock_completion)
+        ai_client.client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
         chat_request = ChatCompletionRequest(prompt="Test prompt")
         responses = []
@@ -166,7 +170,7 @@ class TestAIClient:
     @pytest.mark.asyncio
     async def test_stream_response_authentication_error(self, ai_client: AIClient) -> None:
         """Test streaming response with authentication error."""
-        ai_client.client.chat.completions.create = MagicMock(
+        ai_client.client.chat.completions.create = AsyncMock(
             side_effect=AuthenticationError("Invalid API key", response=MagicMock(), body=None)
         )
 
@@ -182,7 +186,7 @@ class TestAIClient:
     @pytest.mark.asyncio
     async def test_stream_response_generic_error(self, ai_client: AIClient) -> None:
         """Test streaming response with generic error."""
-        ai_client.client.chat.completions.create = MagicMock(side_effect=ValueError("Something went wrong"))
+        ai_client.client.chat.completions.create = AsyncMock(side_effect=ValueError("Something went wrong"))
 
         chat_request = ChatCompletionRequest(prompt="Test prompt")
 
@@ -199,14 +203,14 @@ class TestAIClient:
         # Mock completion chunks for first request
         mock_chunks_1 = [MockOpenAIChunk("chunk-1", "Response 1")]
         mock_completion_1 = MagicMock()
-        mock_completion_1.__iter__ = lambda self: iter(mock_chunks_1)
+        mock_completion_1.__aiter__.return_value = mock_chunks_1
 
         # Mock completion chunks for second request
         mock_chunks_2 = [MockOpenAIChunk("chunk-2", "Response 2")]
         mock_completion_2 = MagicMock()
-        mock_completion_2.__iter__ = lambda self: iter(mock_chunks_2)
+        mock_completion_2.__aiter__.return_value = mock_chunks_2
 
-        ai_client.client.chat.completions.create = MagicMock(side_effect=[mock_completion_1, mock_completion_2])
+        ai_client.client.chat.completions.create = AsyncMock(side_effect=[mock_completion_1, mock_completion_2])
 
         # First request
         chat_request_1 = ChatCompletionRequest(prompt="First prompt")
@@ -240,9 +244,9 @@ class TestAIClient:
         """Test that system prompt is always included in requests."""
         mock_chunks = [MockOpenAIChunk("chunk-1", "Test response")]
         mock_completion = MagicMock()
-        mock_completion.__iter__ = lambda self: iter(mock_chunks)
+        mock_completion.__aiter__.return_value = mock_chunks
 
-        ai_client.client.chat.completions.create = MagicMock(return_value=mock_completion)
+        ai_client.client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
         chat_request = ChatCompletionRequest(prompt="User question")
 
@@ -265,9 +269,9 @@ class TestAIClient:
         """Test that the correct model is used in API calls."""
         mock_chunks = [MockOpenAIChunk("chunk-1", "Test")]
         mock_completion = MagicMock()
-        mock_completion.__iter__ = lambda self: iter(mock_chunks)
+        mock_completion.__aiter__.return_value = mock_chunks
 
-        ai_client.client.chat.completions.create = MagicMock(return_value=mock_completion)
+        ai_client.client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
         chat_request = ChatCompletionRequest(prompt="Test")
 
@@ -285,9 +289,9 @@ class TestAIClient:
         mock_chunks = [MockOpenAIChunk("test-id", "Hello", "stop")]
 
         mock_completion = MagicMock()
-        mock_completion.__iter__ = lambda self: iter(mock_chunks)
+        mock_completion.__aiter__.return_value = mock_chunks
 
-        ai_client.client.chat.completions.create = MagicMock(return_value=mock_completion)
+        ai_client.client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
         chat_request = ChatCompletionRequest(prompt="Test")
 
@@ -342,9 +346,9 @@ class TestAIClient:
         ]
 
         mock_completion = MagicMock()
-        mock_completion.__iter__ = lambda self: iter(mock_chunks)
+        mock_completion.__aiter__.return_value = mock_chunks
 
-        ai_client.client.chat.completions.create = MagicMock(return_value=mock_completion)
+        ai_client.client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
         chat_request = ChatCompletionRequest(prompt="Geef een lange reactie")
 
@@ -365,7 +369,7 @@ class TestAIClient:
     @pytest.mark.parametrize("model_name", ["gpt-3.5-turbo", "gpt-4", "gpt-4-turbo", "custom-model"])
     def test_different_models(self, model_name: str) -> None:
         """Test AIClient with different model names."""
-        with patch("app.clients.ai.OpenAI") as mock_openai:
+        with patch("app.clients.ai.AsyncOpenAI") as mock_openai:
             client = AIClient(model=model_name, base_url="https://api.openai.com/v1", api_key="test-key")
 
             assert client.model == model_name
@@ -382,8 +386,134 @@ class TestAIClient:
     )
     def test_different_configurations(self, base_url: str | None, api_key: str | None) -> None:
         """Test AIClient with different base URLs and API keys."""
-        with patch("app.clients.ai.OpenAI") as mock_openai:
+        with patch("app.clients.ai.AsyncOpenAI") as mock_openai:
             client = AIClient(model="gpt-3.5-turbo", base_url=base_url, api_key=api_key)
 
             mock_openai.assert_called_once_with(base_url=base_url, api_key=api_key)
             assert client.model == "gpt-3.5-turbo"
+
+
+class TestAIClientCache:
+    """Test cases for answers from the response cache."""
+
+    @pytest.fixture
+    def cache(self) -> AsyncMock:
+        cache = AsyncMock(spec=AIResponseCache)
+        cache.get.return_value = None
+        return cache
+
+    def client_with(self, cache: AsyncMock, user_key: str | None = "user-1") -> AIClient:
+        client = AIClient(
+            model="gpt-4o", base_url="https://api.openai.com/v1", api_key="test-key", cache=cache, user_key=user_key
+        )
+        completion = MagicMock()
+        completion.__aiter__.return_value = [
+            MockOpenAIChunk("chunk-1", "Hallo"),
+            MockOpenAIChunk("chunk-2", " daar", finish_reason="stop"),
+        ]
+        client.client.chat.completions.create = AsyncMock(return_value=completion)
+        return client
+
+    async def collect(self, client: AIClient, request: ChatCompletionRequest) -> list[dict[str, Any]]:
+        return [json.loads(response) async for response in client.stream_response(request)]
+
+    async def test_complete_answer_is_stored(self, cache: AsyncMock) -> None:
+        client = self.client_with(cache)
+
+        await self.collect(client, ChatCompletionRequest(prompt="Vraag"))
+
+        key, stored = cache.put.call_args.args
+        assert key == cache_key("gpt-4o", client.system_prompt, "Vraag", "user-1")
+        assert stored.chunks == ["Hallo", " daar"]
+        assert stored.finish_reason == "stop"
+
+    async def test_hit_is_replayed_without_asking_the_model(self, cache: AsyncMock) -> None:
+        cache.get.return_value = CachedCompletion(chunks=["Hallo", " daar"], finish_reason="stop", created_at=0)
+        client = self.client_with(cache)
+
+        responses = await self.collect(client, ChatCompletionRequest(prompt="Vraag"))
+
+        client.client.chat.completions.create.assert_not_called()
+        assert [response["content"] for response in responses] == ["Hallo", " daar", None]
+        assert responses[-1]["finish_reason"] == "stop"
+        cache.put.assert_not_called()
+
+    async def test_incomplete_answer_is_not_stored(self, cache: AsyncMock) -> None:
+        client = self.client_with(cache)
+        completion = MagicMock()
+        completion.__aiter__.return_value = [MockOpenAIChunk("chunk-1", "Hallo", finish_reason="length")]
+        client.client.chat.completions.create = AsyncMock(return_value=completion)
+
+        await self.collect(client, ChatCompletionRequest(prompt="Vraag"))
+
+        cache.put.assert_not_called()
+
+    async def test_off_scope_skips_the_cache(self, cache: AsyncMock) -> None:
+        client = self.client_with(cache)
+
+        await self.collect(client, ChatCompletionRequest(prompt="Vraag", cache="off"))
+
+        cache.get.assert_not_called()
+        cache.put.assert_not_called()
+
+    async def test_user_scope_needs_a_user(self, cache: AsyncMock) -> None:
+        client = self.client_with(cache, user_key=None)
+
+        await self.collect(client, ChatCompletionRequest(prompt="Vraag", cache="user"))
+
+        cache.get.assert_not_called()
+
+    async def test_shared_scope_leaves_out_the_user(self, cache: AsyncMock) -> None:
+        client = self.client_with(cache)
+
+        await self.collect(client, ChatCompletionRequest(prompt="Vraag", cache="shared"))
+
+        cache.get.assert_awaited_once_with(cache_key("gpt-4o", client.system_prompt, "Vraag"))
+
+
+class TestAIClientAdmission:
+    """Test cases for streams that wait for a slot."""
+
+    async def test_waiting_stream_reports_its_position(self) -> None:
+        admission = AIAdmission(max_streams=1, max_streams_per_user=1, queue_size=10)
+        holder = admission.enqueue("other-user", 10)
+        client = AIClient(
+            model="gpt-4o",
+            base_url="https://api.openai.com/v1",
+            api_key="test-key",
+            user_key="user-1",
+            admission=admission,
+        )
+        completion = MagicMock()
+        completion.__aiter__.return_value = [MockOpenAIChunk("chunk-1", "Hallo", finish_reason="stop")]
+        client.client.chat.completions.create = AsyncMock(return_value=completion)
+
+        stream = client.stream_response(ChatCompletionRequest(prompt="Vraag"))
+        queued = json.loads(await anext(stream))
+
+        assert queued["queue_position"] == 1
+        client.client.chat.completions.create.assert_not_called()
+
+        admission.release(holder)
+        answer = json.loads(await anext(stream))
+
+        assert answer["content"] == "Hallo"
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+        assert admission.active == 0
+
+    async def test_full_queue_is_refused_before_the_stream_starts(self) -> None:
+        admission = AIAdmission(max_streams=1, max_streams_per_user=1, queue_size=0)
+        admission.enqueue("other-user", 10)
+        client = AIClient(
+            model="gpt-4o",
+            base_url="https://api.openai.com/v1",
+            api_key="test-key",
+            user_key="user-1",
+            admission=admission,
+        )
+
+        with pytest.raises(TooManyRequestsError):
+            await client.start_stream(ChatCompletionRequest(prompt="Vraag"))
+
+        assert admission.queued == 0
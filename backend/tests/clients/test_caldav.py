@@ -0,0 +1,239 @@
+"""Tests for CalDAV client."""
+
+from collections.abc import Iterator
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.clients.caldav import CaldavClient, ParsePool, events_by_day, parse_events, parse_todos
+from app.core.calendar_cache import calendar_cache
+from app.models.calendar import Calendar
+
+
+def vcalendar(*components: str) -> str:
+    return "\r\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//test//EN", *components, "END:VCALENDAR"])
+
+
+SINGLE_EVENT = vcalendar(
+    "BEGIN:VEVENT",
+    "UID:single",
+    "SUMMARY:Team Meeting",
+    "DTSTART:20241101T100000",
+    "DTEND:20241101T110000",
+    "END:VEVENT",
+)
+ALL_DAY_EVENT = vcalendar(
+    "BEGIN:VEVENT",
+    "UID:all-day",
+    "SUMMARY:Conference",
+    "DTSTART;VALUE=DATE:20241101",
+    "DTEND;VALUE=DATE:20241102",
+    "END:VEVENT",
+)
+DAILY_EVENT = vcalendar(
+    "BEGIN:VEVENT",
+    "UID:daily",
+    "SUMMARY:Standup",
+    "DTSTART:20241001T090000",
+    "DURATION:PT15M",
+    "RRULE:FREQ=DAILY",
+    "END:VEVENT",
+)
+TODO = vcalendar(
+    "BEGIN:VTODO",
+    "UID:todo",
+    "SUMMARY:Review pull requests",
+    "DUE;VALUE=DATE:20241102",
+    "END:VTODO",
+)
+
+WEEK_START = datetime(2024, 11, 1)
+WEEK_END = datetime(2024, 11, 7, 23, 59, 59)
+
+
+class TestParseEvents:
+    def test_single_events_are_read_without_expansion(self) -> None:
+        with patch("app.clients.caldav.recurring_ical_events.of") as expand:
+            events = parse_events([SINGLE_EVENT, ALL_DAY_EVENT], WEEK_START, WEEK_END, max_instances=10)
+
+        expand.assert_not_called()
+        assert [event.title for event in events] == ["Team Meeting", "Conference"]
+        assert events[0].start == datetime(2024, 11, 1, 10)
+        assert events[0].end == datetime(2024, 11, 1, 11)
+        assert events[1].start == datetime(2024, 11, 1)
+        assert events[1].end == datetime(2024, 11, 2)
+
+    def test_recurring_event_is_expanded_within_the_window(self) -> None:
+        events = parse_events([DAILY_EVENT], WEEK_START, WEEK_END, max_instances=100)
+
+        assert [event.start for event in events] == [datetime(2024, 11, day, 9) for day in range(1, 8)]
+        assert events[0].end == datetime(2024, 11, 1, 9, 15)
+
+    def test_expansion_is_capped(self) -> None:
+        events = parse_events([DAILY_EVENT], WEEK_START, WEEK_END, max_instances=3)
+
+        assert len(events) == 3
+
+
+OPEN_TODOS = [
+    vcalendar("BEGIN:VTODO", f"UID:todo-{day}", f"SUMMARY:Task {day}", f"DUE:202411{day:02d}T120000", "END:VTODO")
+    for day in (5, 1, 3)
+]
+
+
+def test_parse_todos() -> None:
+    tasks = parse_todos([("/calendars/user/tasks/todo.ics", TODO)])
+
+    assert len(tasks) == 1
+    assert tasks[0].title == "Review pull requests"
+    assert tasks[0].start is None
+    assert tasks[0].end == datetime(2024, 11, 2)
+    assert tasks[0].uid == "todo"
+    assert tasks[0].ref == "/calendars/user/tasks/todo.ics"
+
+
+async def test_get_tasks_pages_open_todos_by_due_date() -> None:
+    client = CaldavClient(base_url="https://caldav.example.com", token="test-token")
+    calendar = MagicMock()
+    # Todos with a STATUS come from the second query
+    without_status, with_status = OPEN_TODOS[:2], OPEN_TODOS[2:]
+    calendar.search.side_effect = lambda xml, todo: [
+        MagicMock(data=data, url=f"/tasks/{OPEN_TODOS.index(data)}.ics")
+        for data in (with_status if "text-match" in xml else without_status)
+    ]
+    client.client = MagicMock()
+    client.client.principal.return_value.calendars.return_value = [calendar]
+
+    first = await client.get_tasks(limit=2, due_before=datetime(2024, 12, 1))
+    second = await client.get_tasks(limit=2, cursor=first.next_cursor)
+
+    queries = [call.kwargs["xml"] for call in calendar.search.call_args_list[:2]]
+    assert all('<C:time-range end="20241201T000000Z"/>' in query for query in queries)
+    assert all("COMPLETED" in query for query in queries)
+    assert [task.title for task in first.results] == ["Task 1", "Task 3"]
+    assert [task.title for task in second.results] == ["Task 5"]
+    assert second.next_cursor is None
+
+
+async def test_parse_pool_runs_jobs_off_the_loop() -> None:
+    pool = ParsePool(workers=2)
+    try:
+        events = await pool.run(parse_events, [SINGLE_EVENT], WEEK_START, WEEK_END, 10)
+    finally:
+        pool.shutdown()
+
+    assert events[0].title == "Team Meeting"
+
+
+async def test_get_calendars_fetches_unexpanded_objects() -> None:
+    client = CaldavClient(base_url="https://caldav.example.com", token="test-token")
+    calendar = MagicMock()
+    calendar.search.return_value = [MagicMock(data=SINGLE_EVENT), MagicMock(data=DAILY_EVENT)]
+    client.client = MagicMock()
+    client.client.principal.return_value.calendars.return_value = [calendar]
+
+    events = await client.get_calendars(date(2024, 11, 1))
+
+    calendar.search.assert_called_once_with(
+        start=datetime(2024, 11, 1), end=datetime(2024, 11, 1, 23, 59, 59, 999999), event=True
+    )
+    assert [(event.title, event.start) for event in events] == [
+        ("Standup", datetime(2024, 11, 1, 9)),
+        ("Team Meeting", datetime(2024, 11, 1, 10)),
+    ]
+
+
+def test_events_by_day_puts_multi_day_events_in_each_day() -> None:
+    conference = Calendar(title="Conference", start=datetime(2024, 11, 1), end=datetime(2024, 11, 3))
+    evening = Calendar(title="Release", start=datetime(2024, 11, 3, 22), end=datetime(2024, 11, 4, 1))
+
+    grouped = events_by_day([conference, evening], [date(2024, 11, day) for day in range(1, 5)])
+
+    assert grouped[date(2024, 11, 1)] == [conference]
+    assert grouped[date(2024, 11, 2)] == [conference]
+    assert grouped[date(2024, 11, 3)] == [evening]
+    assert grouped[date(2024, 11, 4)] == [evening]
+
+
+class TestGetEvents:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> Iterator[None]:
+        calendar_cache.clear()
+        yield
+        calendar_cache.clear()
+
+    @pytest.fixture
+    def calendar(self) -> MagicMock:
+        calendar = MagicMock()
+        calendar.search.return_value = [MagicMock(data=DAILY_EVENT)]
+        return calendar
+
+    @pytest.fixture
+    def client(self, calendar: MagicMock) -> CaldavClient:
+        client = CaldavClient(base_url="https://caldav.example.com", token="test-token", cache_key="user-1")
+        client.client = MagicMock()
+        client.client.principal.return_value.calendars.return_value = [calendar]
+        return client
+
+    async def test_expands_the_range_in_one_query_per_calendar(self, client: CaldavClient, calendar: MagicMock) -> None:
+        events = await client.get_events(date(2024, 11, 4), date(2024, 11, 10))
+
+        calendar.search.assert_called_once()
+        assert [event.start for event in events] == [datetime(2024, 11, day, 9) for day in range(4, 11)]
+
+    async def test_adjacent_range_fetches_only_missing_days(self, client: CaldavClient, calendar: MagicMock) -> None:
+        await client.get_events(date(2024, 11, 4), date(2024, 11, 10))
+        calendar.search.reset_mock()
+
+        events = await client.get_events(date(2024, 11, 8), date(2024, 11, 14))
+
+        calendar.search.assert_called_once_with(
+            start=datetime(2024, 11, 11), end=datetime(2024, 11, 14, 23, 59, 59, 999999), event=True
+        )
+        assert [event.start for event in events] == [datetime(2024, 11, day, 9) for day in range(8, 15)]
+
+    async def test_cached_range_makes_no_requests(self, client: CaldavClient, calendar: MagicMock) -> None:
+        await client.get_events(date(2024, 11, 4), date(2024, 11, 10))
+        calendar.search.reset_mock()
+        client.client.principal.reset_mock()
+
+        events = await client.get_events(date(2024, 11, 6), date(2024, 11, 6))
+
+        client.client.principal.assert_not_called()
+        assert [event.start for event in events] == [datetime(2024, 11, 6, 9)]
+
+    async def test_single_day_is_always_fetched(self, client: CaldavClient, calendar: MagicMock) -> None:
+        await client.get_events(date(2024, 11, 4), date(2024, 11, 10))
+        calendar.search.reset_mock()
+
+        events = await client.get_calendars(date(2024, 11, 6))
+
+        calendar.search.assert_called_once()
+        assert [event.title for event in events] == ["Standup"]
+
+        # The fetched day replaces the cached one for the range views
+        calendar.search.return_value = []
+        cached = await client.get_events(date(2024, 11, 6), date(2024, 11, 6))
+        assert cached == events
+        calendar.search.assert_called_once()
+
+    async def test_same_slot_events_from_different_calendars_are_kept(self, client: CaldavClient) -> None:
+        shared = MagicMock()
+        shared.search.return_value = [MagicMock(data=SINGLE_EVENT.replace("UID:single", "UID:shared"))]
+        own = MagicMock()
+        own.search.return_value = [MagicMock(data=SINGLE_EVENT)]
+        client.client.principal.return_value.calendars.return_value = [shared, own]
+
+        events = await client.get_calendars(date(2024, 11, 1))
+
+        assert sorted((event.uid, event.title) for event in events) == [
+            ("shared", "Team Meeting"),
+            ("single", "Team Meeting"),
+        ]
+
+    async def test_multi_day_events_are_returned_once(self, client: CaldavClient, calendar: MagicMock) -> None:
+        calendar.search.return_value = [MagicMock(data=ALL_DAY_EVENT.replace("20241102", "20241104"))]
+
+        events = await client.get_events(date(2024, 11, 1), date(2024, 11, 3))
+
+        assert [(event.uid, event.start) for event in events] == [("all-day", datetime(2024, 11, 1))]
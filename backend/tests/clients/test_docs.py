@@ -5,6 +5,7 @@ from unittest.mock import AsyncMock, Mock
 import httpx
 import pytest
 from app.clients.docs import DocsClient
+from app.context import start_request_timings
 from app.exceptions import ExternalServiceError
 from app.models.note import Note
 
@@ -79,6 +80,19 @@ class TestDocsClient:
         assert call_args[0][0] == "https://docs.example.com/api/v1.0/documents/all/"
         assert call_args[1]["headers"] == {"Authorization": "Bearer test-token"}
 
+    async def test_get_documents_records_spans(self, client: DocsClient, mock_http_client: AsyncMock) -> None:
+        """Test that the upstream call and validation are recorded as request spans."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.json.return_value = {"count": 0, "results": []}
+        mock_http_client.get.return_value = mock_response
+        timings = start_request_timings()
+
+        await client.get_documents()
+
+        assert set(timings.durations) == {"docs", "docs-validate"}
+
     async def test_get_documents_with_custom_params(self, client: DocsClient, mock_http_client: AsyncMock) -> None:
         """Test document retrieval with custom parameters."""
         mock_response = Mock()
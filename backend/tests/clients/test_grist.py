@@ -1,10 +1,13 @@
 """Tests for the Grist client."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from collections.abc import Generator
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 from app.clients.grist import GristClient
+from app.core.grist_index import grist_document_index
 from app.exceptions import ExternalServiceError
 from app.models.grist import GristDocument, GristOrganization, GristWorkspace
 
@@ -469,3 +472,135 @@ class TestGristClient:
 
         assert result.count == 5
         assert len(result.results) == expected_count
+
+
+class TestGristDocumentIndexing:
+    """Tests for serving document pages from the per-user index."""
+
+    @pytest.fixture(autouse=True)
+    def clear_index(self) -> Generator[None]:
+        grist_document_index.clear()
+        yield
+        grist_document_index.clear()
+
+    @pytest.fixture
+    def mock_http_client(self) -> AsyncMock:
+        return AsyncMock(spec=httpx.AsyncClient)
+
+    @pytest.fixture
+    def grist_client(self, mock_http_client: AsyncMock) -> GristClient:
+        return GristClient(
+            http_client=mock_http_client, base_url="https://grist.example.com", token="test-token", cache_key="user-1"
+        )
+
+    @staticmethod
+    def _workspaces_response(*docs: tuple[str, str]) -> MagicMock:
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [
+            {
+                "id": 1,
+                "name": "Workspace 1",
+                "access": "owners",
+                "orgDomain": "org1.grist.com",
+                "docs": [
+                    {
+                        "id": doc_id,
+                        "name": doc_id,
+                        "access": "owners",
+                        "isPinned": False,
+                        "urlId": doc_id,
+                        "createdAt": "2024-01-01T10:00:00Z",
+                        "updatedAt": updated_at,
+                    }
+                    for doc_id, updated_at in docs
+                ],
+            }
+        ]
+        return mock_response
+
+    async def test_later_pages_are_served_from_index(
+        self, grist_client: GristClient, mock_http_client: AsyncMock
+    ) -> None:
+        mock_http_client.get.return_value = self._workspaces_response(
+            ("doc1", "2024-01-10T10:00:00Z"), ("doc2", "2024-01-30T10:00:00Z"), ("doc3", "2024-01-20T10:00:00Z")
+        )
+
+        first = await grist_client.get_documents(organization_id=123, page=1, page_size=2)
+        second = await grist_client.get_documents(organization_id=123, page=2, page_size=2)
+
+        assert [doc.id for doc in first.results] == ["doc2", "doc3"]
+        assert [doc.id for doc in second.results] == ["doc1"]
+        assert second.count == 3
+        mock_http_client.get.assert_called_once()
+
+    async def test_stale_index_is_refreshed(self, grist_client: GristClient, mock_http_client: AsyncMock) -> None:
+        mock_http_client.get.side_effect = [
+            self._workspaces_response(("doc1", "2024-01-10T10:00:00Z"), ("doc2", "2024-01-30T10:00:00Z")),
+            self._workspaces_response(("doc1", "2024-02-10T10:00:00Z"), ("doc2", "2024-01-30T10:00:00Z")),
+        ]
+
+        await grist_client.get_documents(organization_id=123)
+        with patch.object(grist_document_index, "ttl", 0):
+            result = await grist_client.get_documents(organization_id=123)
+
+        assert [doc.id for doc in result.results] == ["doc1", "doc2"]
+        assert mock_http_client.get.call_count == 2
+
+
+class TestGristRecentDocuments:
+    """Tests for the overview of recent documents across organizations."""
+
+    @staticmethod
+    def _document(doc_id: str, updated_at: str) -> GristDocument:
+        return GristDocument(
+            id=doc_id,
+            name=doc_id,
+            access="owners",
+            is_pinned=False,
+            url_id=doc_id,
+            created_at="2024-01-01T10:00:00Z",
+            updated_at=updated_at,
+        )
+
+    @staticmethod
+    def _organization(organization_id: int) -> GristOrganization:
+        return GristOrganization(
+            id=organization_id,
+            name=f"Org {organization_id}",
+            domain=None,
+            access="owners",
+            created_at="2024-01-01T10:00:00Z",
+            updated_at="2024-01-01T10:00:00Z",
+        )
+
+    async def test_merges_organizations_into_top_n(self) -> None:
+        client = GristClient(http_client=AsyncMock(), base_url="https://grist.example.com", token="test-token")
+        listings = {
+            1: [self._document("a1", "2024-03-01"), self._document("a2", "2024-01-01")],
+            2: [self._document("b1", "2024-02-01"), self._document("b2", "2023-12-01")],
+            3: [self._document("c1", "2024-02-15")],
+        }
+        running = 0
+        max_running = 0
+
+        async def get_sorted_documents(organization_id: int) -> list[GristDocument]:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if organization_id == 4:
+                raise ExternalServiceError("Grist", "Failed to fetch")
+            return listings[organization_id]
+
+        with (
+            patch.object(
+                client, "get_organizations", AsyncMock(return_value=[self._organization(i) for i in range(1, 5)])
+            ),
+            patch.object(client, "get_sorted_documents", side_effect=get_sorted_documents),
+        ):
+            result = await client.get_recent_documents(limit=3, concurrency=2)
+
+        assert [doc.id for doc in result] == ["a1", "c1", "b1"]
+        assert max_running == 2
@@ -1,14 +1,26 @@
 """Tests for OCS client."""
 
-from datetime import datetime
+from collections.abc import AsyncIterator, Generator
+from contextlib import asynccontextmanager
+from dataclasses import FrozenInstanceError
+from datetime import UTC, datetime
 from typing import Any
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import httpx
 import pytest
 from app.clients.ocs import OCSClient
-from app.exceptions import ExternalServiceError
-from app.models.activity import Activity, FileActivityResponse
+from app.exceptions import ExternalServiceError, TooManyRequestsError
+from app.models.activity import (
+    Activity,
+    ActivityBuffer,
+    ActivityEntry,
+    FavoritesSnapshot,
+    FileActivity,
+    FileActivityResponse,
+    FileInfo,
+)
+from pydantic import TypeAdapter
 
 
 def create_mock_response(
@@ -118,6 +130,22 @@ class TestOCSClient:
         assert call_args[1]["headers"] == expected_headers
         assert call_args[1]["params"] == {"format": "json", "term": "test"}
 
+    async def test_search_files_rate_limited(self, mock_http_client: AsyncMock) -> None:
+        """Test that unified search is rate limited per user."""
+        client = OCSClient(
+            http_client=mock_http_client, base_url="https://nextcloud.example.com", token="test-token", cache_key="u1"
+        )
+
+        with (
+            patch("app.clients.ocs.check_rate_limit", new_callable=AsyncMock, return_value=False) as mock_check,
+            pytest.raises(TooManyRequestsError) as exc_info,
+        ):
+            await client.search_files(term="test")
+
+        assert exc_info.value.status_code == 429
+        assert mock_check.call_args[0][0] == "ocs-search:u1"
+        mock_http_client.get.assert_not_called()
+
     async def test_search_files_with_custom_path(self, client: OCSClient, mock_http_client: AsyncMock) -> None:
         """Test file search with custom path."""
         mock_response = create_mock_response(status_code=200, json_data={"ocs": {"data": {"entries": []}}})
@@ -190,6 +218,21 @@ class TestOCSClient:
         assert result.results[1].files[0].name == "file2.txt"
         assert result.results[1].files[0].link == "https://nextcloud.example.com/f/67890"
 
+    async def test_search_files_passes_limit_and_cursor(self, client: OCSClient, mock_http_client: AsyncMock) -> None:
+        """Test that the page size and cursor reach Nextcloud, and the next cursor comes back."""
+        entry = {"title": "report.odt", "resourceUrl": "https://nextcloud.example.com/f/1"}
+        mock_response = create_mock_response(
+            status_code=200,
+            json_data={"ocs": {"data": {"entries": [entry], "isPaginated": True, "cursor": 20}}},
+        )
+        mock_http_client.get.return_value = mock_response
+
+        result = await client.search_files(term="report", limit=10, cursor=10)
+
+        params = mock_http_client.get.call_args[1]["params"]
+        assert params == {"format": "json", "term": "report", "limit": 10, "cursor": 10}
+        assert result.last_given == 20
+
     async def test_search_files_no_results(self, client: OCSClient, mock_http_client: AsyncMock) -> None:
         """Test file search when no results found."""
         mock_response = create_mock_response(status_code=200, json_data={"ocs": {"data": {"entries": []}}})
@@ -612,3 +655,421 @@ class TestActivityExtractFiles:
         assert len(files) == 1
         assert files[0].id == 33485
         assert files[0].name == "Drive.png"
+
+
+class TestActivityEntry:
+    """Tests for the lean ActivityEntry parse model."""
+
+    def test_parses_feed_ignoring_unused_fields(self) -> None:
+        raw = _raw_activity(2282) | {"objects": {"2282": "/Documents/file2282.docx"}, "icon": "https://example.com"}
+
+        entries = TypeAdapter(list[ActivityEntry]).validate_python([raw])
+
+        assert entries[0].activity_id == 2282
+        assert entries[0].datetime == datetime(2026, 1, 20, 13, 15, 50, tzinfo=UTC)
+        assert not hasattr(entries[0], "__dict__")
+        assert not hasattr(entries[0], "subject")
+
+    def test_is_frozen(self) -> None:
+        entry = TypeAdapter(ActivityEntry).validate_python(_raw_activity(1))
+
+        with pytest.raises(FrozenInstanceError):
+            entry.activity_id = 2  # type: ignore[misc]
+
+    def test_extract_files_matches_activity(self) -> None:
+        raw = _raw_activity(2282) | {"objects": {"2282": "/Documents/file2282.docx", "7": "/other.txt"}}
+
+        entry = TypeAdapter(ActivityEntry).validate_python(raw)
+
+        assert entry.extract_files() == Activity.model_validate(raw).extract_files()
+
+
+def _raw_activity(activity_id: int) -> dict[str, Any]:
+    return {
+        "activity_id": activity_id,
+        "app": "files",
+        "type": "file_changed",
+        "user": "testuser",
+        "subject": f"You changed file{activity_id}.docx",
+        "message": None,
+        "link": f"https://nextcloud.example.com/f/{activity_id}",
+        "object_type": "files",
+        "object_id": activity_id,
+        "object_name": f"/file{activity_id}.docx",
+        "datetime": "2026-01-20T13:15:50+00:00",
+    }
+
+
+def _file_activity(activity_id: int) -> FileActivity:
+    return FileActivity(activity_id=activity_id, files=[FileInfo(id=activity_id, name=f"file{activity_id}.docx")])
+
+
+def _activity_buffer(ids: list[int], complete: bool = False) -> ActivityBuffer:
+    return ActivityBuffer(entries=[_file_activity(i) for i in ids], newest=ids[0], oldest=ids[-1], complete=complete)
+
+
+class TestActivityBuffer:
+    """Tests for the cached activity feed window."""
+
+    def test_merge_keeps_newest_first_without_duplicates(self) -> None:
+        buffer = _activity_buffer([10, 9, 8])
+
+        buffer.merge([_file_activity(12), _file_activity(10)], newest=12, oldest=10)
+
+        assert [entry.activity_id for entry in buffer.entries] == [12, 10, 9, 8]
+        assert buffer.newest == 12
+        assert buffer.oldest == 8
+
+    def test_trim_drops_oldest(self) -> None:
+        buffer = _activity_buffer([10, 9, 8, 7], complete=True)
+
+        buffer.trim(2)
+
+        assert [entry.activity_id for entry in buffer.entries] == [10, 9]
+        assert buffer.oldest == 9
+        assert buffer.complete is False
+
+    def test_covers(self) -> None:
+        buffer = _activity_buffer([10, 9, 8, 7])
+
+        assert buffer.covers(since=0, limit=3) is True
+        assert buffer.covers(since=0, limit=5) is False
+        assert buffer.covers(since=10, limit=2) is True
+        assert buffer.covers(since=9, limit=3) is False
+        assert buffer.covers(since=7, limit=1) is False
+        assert buffer.covers(since=50, limit=1) is False
+
+    def test_covers_complete_feed(self) -> None:
+        buffer = _activity_buffer([10, 9], complete=True)
+
+        assert buffer.covers(since=0, limit=5) is True
+        assert buffer.covers(since=9, limit=5) is True
+        assert buffer.to_response(since=9, limit=5).results == []
+
+
+class TestOCSActivityCache:
+    """Tests for serving the activity feed from the per-user cache."""
+
+    @pytest.fixture
+    def mock_http_client(self) -> AsyncMock:
+        return AsyncMock(spec=httpx.AsyncClient)
+
+    @pytest.fixture
+    def client(self, mock_http_client: AsyncMock) -> OCSClient:
+        return OCSClient(
+            http_client=mock_http_client,
+            base_url="https://nextcloud.example.com",
+            token="test-token",
+            cache_key="user-1",
+        )
+
+    @pytest.fixture
+    def mock_cache(self) -> Generator[tuple[AsyncMock, AsyncMock]]:
+        with (
+            patch("app.clients.ocs.load_activity_buffer", new_callable=AsyncMock) as mock_load,
+            patch("app.clients.ocs.save_activity_buffer", new_callable=AsyncMock) as mock_save,
+        ):
+            yield mock_load, mock_save
+
+    async def test_poll_without_buffer_builds_it(
+        self, client: OCSClient, mock_http_client: AsyncMock, mock_cache: tuple[AsyncMock, AsyncMock]
+    ) -> None:
+        mock_load, mock_save = mock_cache
+        mock_load.return_value = None
+        mock_http_client.get.return_value = create_mock_response(
+            json_data={"ocs": {"data": [_raw_activity(12), _raw_activity(11)]}},
+            headers={"x-activity-last-given": "11"},
+        )
+
+        result = await client.get_file_activities(limit=5)
+
+        assert [activity.activity_id for activity in result.results] == [12, 11]
+        assert result.last_given == 11
+        saved: ActivityBuffer = mock_save.call_args[0][1]
+        assert (saved.newest, saved.oldest, saved.complete) == (12, 11, True)
+
+    async def test_poll_fetches_only_newer_activities(
+        self, client: OCSClient, mock_http_client: AsyncMock, mock_cache: tuple[AsyncMock, AsyncMock]
+    ) -> None:
+        mock_load, mock_save = mock_cache
+        mock_load.return_value = _activity_buffer([10, 9, 8])
+        mock_http_client.get.return_value = create_mock_response(
+            json_data={"ocs": {"data": [_raw_activity(11), _raw_activity(12)]}}
+        )
+
+        result = await client.get_file_activities(limit=3)
+
+        assert [activity.activity_id for activity in result.results] == [12, 11, 10]
+        assert result.last_given == 10
+        params = mock_http_client.get.call_args[1]["params"]
+        assert params["since"] == "10"
+        assert params["sort"] == "asc"
+        assert mock_save.call_args[0][1].newest == 12
+
+    async def test_poll_not_modified_serves_buffer(
+        self, client: OCSClient, mock_http_client: AsyncMock, mock_cache: tuple[AsyncMock, AsyncMock]
+    ) -> None:
+        mock_load, _ = mock_cache
+        mock_load.return_value = _activity_buffer([10, 9, 8])
+        mock_http_client.get.return_value = create_mock_response(status_code=304)
+
+        result = await client.get_file_activities(limit=2)
+
+        assert [activity.activity_id for activity in result.results] == [10, 9]
+        mock_http_client.get.assert_called_once()
+
+    async def test_poll_with_gap_rebuilds_buffer(
+        self, client: OCSClient, mock_http_client: AsyncMock, mock_cache: tuple[AsyncMock, AsyncMock]
+    ) -> None:
+        mock_load, _ = mock_cache
+        mock_load.return_value = _activity_buffer([10, 9, 8])
+        mock_http_client.get.side_effect = [
+            create_mock_response(status_code=404),
+            create_mock_response(json_data={"ocs": {"data": [_raw_activity(500)]}}),
+        ]
+
+        result = await client.get_file_activities(limit=5)
+
+        assert [activity.activity_id for activity in result.results] == [500]
+        assert mock_http_client.get.call_count == 2
+
+    async def test_pagination_served_from_buffer(
+        self, client: OCSClient, mock_http_client: AsyncMock, mock_cache: tuple[AsyncMock, AsyncMock]
+    ) -> None:
+        mock_load, mock_save = mock_cache
+        mock_load.return_value = _activity_buffer([10, 9, 8, 7])
+
+        result = await client.get_file_activities(limit=2, since=9)
+
+        assert [activity.activity_id for activity in result.results] == [8, 7]
+        mock_http_client.get.assert_not_called()
+        mock_save.assert_not_called()
+
+    async def test_pagination_beyond_buffer_extends_it(
+        self, client: OCSClient, mock_http_client: AsyncMock, mock_cache: tuple[AsyncMock, AsyncMock]
+    ) -> None:
+        mock_load, mock_save = mock_cache
+        mock_load.return_value = _activity_buffer([10, 9])
+        mock_http_client.get.return_value = create_mock_response(
+            json_data={"ocs": {"data": [_raw_activity(8), _raw_activity(7)]}},
+            headers={"x-activity-last-given": "7"},
+        )
+
+        result = await client.get_file_activities(limit=2, since=9)
+
+        assert [activity.activity_id for activity in result.results] == [8, 7]
+        saved: ActivityBuffer = mock_save.call_args[0][1]
+        assert [entry.activity_id for entry in saved.entries] == [10, 9, 8, 7]
+        assert saved.oldest == 7
+
+
+FAVORITES_MULTISTATUS = """<?xml version="1.0"?>
+<d:multistatus xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">
+  <d:response>
+    <d:href>/remote.php/dav/files/testuser/Documents/report.docx</d:href>
+    <d:propstat>
+      <d:prop><d:displayname>report.docx</d:displayname><oc:fileid>42</oc:fileid></d:prop>
+      <d:status>HTTP/1.1 200 OK</d:status>
+    </d:propstat>
+  </d:response>
+</d:multistatus>"""
+
+ROOT_ETAG_MULTISTATUS = """<?xml version="1.0"?>
+<d:multistatus xmlns:d="DAV:">
+  <d:response>
+    <d:href>/remote.php/dav/files/testuser/</d:href>
+    <d:propstat>
+      <d:prop><d:getetag>"{etag}"</d:getetag></d:prop>
+      <d:status>HTTP/1.1 200 OK</d:status>
+    </d:propstat>
+  </d:response>
+</d:multistatus>"""
+
+
+def _dav_response(text: str, status_code: int = 207) -> Mock:
+    response = create_mock_response(status_code=status_code)
+    response.text = text
+    return response
+
+
+def _dav_stream(text: str, status_code: int = 207) -> MagicMock:
+    """Mock AsyncClient.stream, delivering the body in small chunks."""
+    response = _dav_response(text, status_code)
+
+    async def aiter_bytes() -> AsyncIterator[bytes]:
+        body = text.encode()
+        for start in range(0, len(body), 64):
+            yield body[start : start + 64]
+
+    response.aiter_bytes = aiter_bytes
+
+    @asynccontextmanager
+    async def stream(*args: object, **kwargs: object) -> AsyncIterator[Mock]:
+        yield response
+
+    return MagicMock(side_effect=stream)
+
+
+class TestOCSFavorites:
+    """Tests for favorite files and their per-user cache."""
+
+    @pytest.fixture
+    def mock_http_client(self) -> AsyncMock:
+        return AsyncMock(spec=httpx.AsyncClient)
+
+    @pytest.fixture
+    def mock_cache(self) -> Generator[dict[str, AsyncMock]]:
+        with (
+            patch("app.clients.ocs.load_favorites", new_callable=AsyncMock) as mock_load_favorites,
+            patch("app.clients.ocs.save_favorites", new_callable=AsyncMock) as mock_save_favorites,
+            patch("app.clients.ocs.load_nextcloud_user_id", new_callable=AsyncMock) as mock_load_user_id,
+            patch("app.clients.ocs.save_nextcloud_user_id", new_callable=AsyncMock) as mock_save_user_id,
+        ):
+            yield {
+                "load_favorites": mock_load_favorites,
+                "save_favorites": mock_save_favorites,
+                "load_user_id": mock_load_user_id,
+                "save_user_id": mock_save_user_id,
+            }
+
+    def _client(self, mock_http_client: AsyncMock, cache_key: str | None = None) -> OCSClient:
+        return OCSClient(
+            http_client=mock_http_client,
+            base_url="https://nextcloud.example.com",
+            token="test-token",
+            cache_key=cache_key,
+        )
+
+    async def test_favorites_without_cache(self, mock_http_client: AsyncMock) -> None:
+        mock_http_client.get.return_value = create_mock_response(json_data={"ocs": {"data": {"id": "testuser"}}})
+        mock_http_client.stream = _dav_stream(FAVORITES_MULTISTATUS)
+
+        result = await self._client(mock_http_client).get_file_activities(is_favorite=True)
+
+        assert len(result.results) == 1
+        file = result.results[0].files[0]
+        assert (file.id, file.name, file.path) == (42, "report.docx", "Documents/report.docx")
+        assert file.link == "https://nextcloud.example.com/f/42"
+        assert mock_http_client.stream.call_args[0][0] == "REPORT"
+        assert mock_http_client.stream.call_args[1]["headers"]["Depth"] == "infinity"
+
+    async def test_favorites_cap_keeps_the_newest(self, mock_http_client: AsyncMock) -> None:
+        mock_http_client.get.return_value = create_mock_response(json_data={"ocs": {"data": {"id": "testuser"}}})
+        entry = FAVORITES_MULTISTATUS[
+            FAVORITES_MULTISTATUS.index("<d:response>") : FAVORITES_MULTISTATUS.index("</d:multistatus>")
+        ]
+        entries = entry.replace("42", "99") + entry.replace("42", "7") + entry
+        mock_http_client.stream = _dav_stream(FAVORITES_MULTISTATUS.replace(entry, entries))
+
+        with patch("app.clients.ocs.settings.OCS_FAVORITES_MAX_RESULTS", 2):
+            result = await self._client(mock_http_client).get_file_activities(is_favorite=True)
+
+        assert [favorite.files[0].id for favorite in result.results] == [99, 42]
+
+    async def test_favorites_malformed_response(self, mock_http_client: AsyncMock) -> None:
+        mock_http_client.get.return_value = create_mock_response(json_data={"ocs": {"data": {"id": "testuser"}}})
+        mock_http_client.stream = _dav_stream("<d:multistatus xmlns:d='DAV:'><d:response>")
+
+        result = await self._client(mock_http_client).get_file_activities(is_favorite=True)
+
+        assert result.results == []
+
+    async def test_favorites_report_failure(self, mock_http_client: AsyncMock) -> None:
+        mock_http_client.get.return_value = create_mock_response(json_data={"ocs": {"data": {"id": "testuser"}}})
+        mock_http_client.stream = _dav_stream("", status_code=403)
+
+        result = await self._client(mock_http_client).get_file_activities(is_favorite=True)
+
+        assert result.results == []
+
+    async def test_favorites_are_paginated_by_file_id(
+        self, mock_http_client: AsyncMock, mock_cache: dict[str, AsyncMock]
+    ) -> None:
+        mock_cache["load_user_id"].return_value = "testuser"
+        mock_cache["load_favorites"].return_value = FavoritesSnapshot(
+            etag='"abc"',
+            results=[FileActivity(files=[FileInfo(id=file_id, name=f"file{file_id}")]) for file_id in (30, 20, 10)],
+        )
+        mock_http_client.request.return_value = _dav_response(ROOT_ETAG_MULTISTATUS.format(etag="abc"))
+        client = self._client(mock_http_client, cache_key="user-1")
+
+        first = await client.get_file_activities(limit=2, is_favorite=True)
+        second = await client.get_file_activities(limit=2, since=first.last_given or 0, is_favorite=True)
+
+        assert [favorite.files[0].id for favorite in first.results] == [30, 20]
+        assert first.last_given == 20
+        assert [favorite.files[0].id for favorite in second.results] == [10]
+        assert second.last_given is None
+
+    async def test_report_results_are_sorted_for_the_index(self, mock_http_client: AsyncMock) -> None:
+        mock_http_client.get.return_value = create_mock_response(json_data={"ocs": {"data": {"id": "testuser"}}})
+        entry = FAVORITES_MULTISTATUS[
+            FAVORITES_MULTISTATUS.index("<d:response>") : FAVORITES_MULTISTATUS.index("</d:multistatus>")
+        ]
+        entries = entry.replace("42", "7") + entry + entry.replace("42", "99")
+        mock_http_client.stream = _dav_stream(FAVORITES_MULTISTATUS.replace(entry, entries))
+
+        result = await self._client(mock_http_client).get_file_activities(limit=2, is_favorite=True)
+
+        assert [favorite.files[0].id for favorite in result.results] == [99, 42]
+        assert result.last_given == 42
+
+    async def test_favorites_user_resolution_failure(self, mock_http_client: AsyncMock) -> None:
+        mock_http_client.get.return_value = create_mock_response(status_code=401)
+
+        result = await self._client(mock_http_client).get_file_activities(is_favorite=True)
+
+        assert result.results == []
+        mock_http_client.request.assert_not_called()
+        mock_http_client.stream.assert_not_called()
+
+    async def test_cached_favorites_with_unchanged_etag(
+        self, mock_http_client: AsyncMock, mock_cache: dict[str, AsyncMock]
+    ) -> None:
+        mock_cache["load_user_id"].return_value = "testuser"
+        mock_cache["load_favorites"].return_value = FavoritesSnapshot(
+            etag='"abc"', results=[FileActivity(files=[FileInfo(id=42, name="report.docx")])]
+        )
+        mock_http_client.request.return_value = _dav_response(ROOT_ETAG_MULTISTATUS.format(etag="abc"))
+
+        result = await self._client(mock_http_client, cache_key="user-1").get_file_activities(is_favorite=True)
+
+        assert result.results[0].files[0].id == 42
+        mock_http_client.get.assert_not_called()
+        mock_http_client.request.assert_called_once()
+        method, url = mock_http_client.request.call_args[0]
+        assert method == "PROPFIND"
+        assert url == "https://nextcloud.example.com/remote.php/dav/files/testuser/"
+        assert mock_http_client.request.call_args[1]["headers"]["Depth"] == "0"
+        mock_http_client.stream.assert_not_called()
+        mock_cache["save_favorites"].assert_not_called()
+
+    async def test_changed_etag_runs_report_and_caches(
+        self, mock_http_client: AsyncMock, mock_cache: dict[str, AsyncMock]
+    ) -> None:
+        mock_cache["load_user_id"].return_value = None
+        mock_cache["load_favorites"].return_value = FavoritesSnapshot(etag='"old"', results=[])
+        mock_http_client.get.return_value = create_mock_response(json_data={"ocs": {"data": {"id": "testuser"}}})
+        mock_http_client.request.return_value = _dav_response(ROOT_ETAG_MULTISTATUS.format(etag="new"))
+        mock_http_client.stream = _dav_stream(FAVORITES_MULTISTATUS)
+
+        result = await self._client(mock_http_client, cache_key="user-1").get_file_activities(is_favorite=True)
+
+        assert result.results[0].files[0].id == 42
+        mock_cache["save_user_id"].assert_called_once_with("user-1", "testuser")
+        saved: FavoritesSnapshot = mock_cache["save_favorites"].call_args[0][1]
+        assert saved.etag == '"new"'
+        assert saved.results == result.results
+
+    async def test_failed_etag_check_does_not_cache(
+        self, mock_http_client: AsyncMock, mock_cache: dict[str, AsyncMock]
+    ) -> None:
+        mock_cache["load_user_id"].return_value = "testuser"
+        mock_cache["load_favorites"].return_value = None
+        mock_http_client.request.return_value = _dav_response("", status_code=500)
+        mock_http_client.stream = _dav_stream(FAVORITES_MULTISTATUS)
+
+        result = await self._client(mock_http_client, cache_key="user-1").get_file_activities(is_favorite=True)
+
+        assert len(result.results) == 1
+        mock_cache["save_favorites"].assert_not_called()
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, patch
 
 # Set test environment before importing anything from the app
 os.environ["ENVIRONMENT"] = "test"
+os.environ["METRICS_ENABLED"] = "true"
 
 import pytest
 from app.core import session
@@ -24,11 +25,14 @@ def setup_test_environment() -> None:
 
 @pytest.fixture(scope="session", autouse=True)
 def mock_redis_connection() -> Generator[None]:
-    """Mock Redis ping during app startup."""
+    """Mock Redis ping during app startup and in the readiness checks."""
     redis_client = AsyncMock()
     redis_client.ping = AsyncMock(return_value=True)
 
-    with patch("app.core.lifespan.get_redis_client", return_value=redis_client):
+    with (
+        patch("app.core.lifespan.get_redis_client", return_value=redis_client),
+        patch("app.core.readiness.get_redis_client", return_value=redis_client),
+    ):
         yield
 
 
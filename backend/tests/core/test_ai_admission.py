@@ -0,0 +1,131 @@
+"""Tests for the admission of AI completions."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from app.core.ai_admission import ANONYMOUS, AIAdmission, Ticket, estimate_tokens
+from app.exceptions import TooManyRequestsError
+
+
+def admitted(tickets: list[Ticket]) -> list[bool]:
+    return [ticket.admitted for ticket in tickets]
+
+
+async def collect(positions: AsyncGenerator[int]) -> list[int]:
+    return [position async for position in positions]
+
+
+def test_estimate_tokens_rounds_up() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+
+
+async def test_streams_over_the_caps_wait() -> None:
+    admission = AIAdmission(max_streams=2, max_streams_per_user=1, queue_size=10)
+
+    tickets = [admission.enqueue("a", 10), admission.enqueue("a", 10), admission.enqueue("b", 10)]
+
+    assert admitted(tickets) == [True, False, True]
+    assert admission.active == 2
+    assert admission.queued == 1
+
+    admission.release(tickets[0])
+
+    assert tickets[1].admitted
+
+
+async def test_users_are_served_round_robin() -> None:
+    admission = AIAdmission(max_streams=1, max_streams_per_user=1, queue_size=10)
+    first = admission.enqueue("a", 10)
+    a2, a3, b1 = admission.enqueue("a", 10), admission.enqueue("a", 10), admission.enqueue("b", 10)
+
+    assert [admission.position(ticket) for ticket in (a2, b1, a3)] == [1, 2, 3]
+
+    admission.release(first)
+    admission.release(a2)
+
+    assert admitted([a3, b1]) == [False, True]
+
+
+async def test_requests_without_a_user_share_one_allowance() -> None:
+    admission = AIAdmission(max_streams=10, max_streams_per_user=1, queue_size=10)
+
+    first, second = admission.enqueue(None, 10), admission.enqueue(None, 10)
+
+    assert first.user_key == ANONYMOUS
+    assert admitted([first, second]) == [True, False]
+
+
+async def test_full_queue_is_refused() -> None:
+    admission = AIAdmission(max_streams=1, max_streams_per_user=1, queue_size=1)
+    admission.enqueue("a", 10)
+    admission.enqueue("b", 10)
+
+    with pytest.raises(TooManyRequestsError) as exc_info:
+        admission.enqueue("c", 10)
+
+    assert exc_info.value.headers == {"Retry-After": "5"}
+    assert admission.queued == 1
+
+
+async def test_wait_reports_positions_until_admitted() -> None:
+    admission = AIAdmission(max_streams=1, max_streams_per_user=1, queue_size=10)
+    first = admission.enqueue("a", 10)
+    second = admission.enqueue("b", 10)
+    third = admission.enqueue("c", 10)
+
+    waiting = asyncio.create_task(collect(admission.wait(third)))
+    await asyncio.sleep(0)
+    admission.release(first)
+    await asyncio.sleep(0)
+    admission.release(second)
+
+    assert await waiting == [2, 1]
+    assert third.admitted
+
+
+async def test_leaving_the_queue_frees_its_place() -> None:
+    admission = AIAdmission(max_streams=1, max_streams_per_user=1, queue_size=10)
+    first = admission.enqueue("a", 10)
+    second, third = admission.enqueue("b", 10), admission.enqueue("c", 10)
+
+    admission.release(second)
+    admission.release(second)
+
+    assert admission.position(third) == 1
+    admission.release(first)
+    assert third.admitted
+
+
+async def test_token_budget_holds_requests_until_refilled() -> None:
+    admission = AIAdmission(max_streams=10, max_streams_per_user=10, queue_size=10, tokens_per_minute=6000)
+    first = admission.enqueue("a", 5990)
+    second = admission.enqueue("b", 100)
+
+    assert admitted([first, second]) == [True, False]
+
+    # 6000 tokens a minute refill the missing 90 in under a second
+    positions = await asyncio.wait_for(collect(admission.wait(second)), timeout=2)
+    assert positions == [1]
+    assert second.admitted
+
+
+async def test_unused_estimate_is_returned_to_the_budget() -> None:
+    admission = AIAdmission(max_streams=10, max_streams_per_user=10, queue_size=10, tokens_per_minute=1000)
+    first = admission.enqueue("a", 900)
+    second = admission.enqueue("b", 900)
+
+    admission.release(first, used_tokens=100)
+
+    assert second.admitted
+
+
+async def test_user_budget_only_holds_back_that_user() -> None:
+    admission = AIAdmission(max_streams=10, max_streams_per_user=10, queue_size=10, user_tokens_per_minute=100)
+    first = admission.enqueue("a", 100)
+
+    tickets = [admission.enqueue("a", 50), admission.enqueue("b", 50)]
+
+    assert first.admitted
+    assert admitted(tickets) == [False, True]
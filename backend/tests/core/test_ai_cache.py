@@ -0,0 +1,83 @@
+"""Tests for the AI response cache."""
+
+import time
+from unittest.mock import AsyncMock, patch
+
+from app.core.ai_cache import AIResponseCache, cache_key, normalize_prompt
+from app.models.ai import CachedCompletion
+from redis.exceptions import RedisError
+
+
+def answer(*chunks: str, created_at: float | None = None) -> CachedCompletion:
+    return CachedCompletion(chunks=list(chunks), finish_reason="stop", created_at=created_at or time.time())
+
+
+def test_normalize_prompt_folds_case_and_whitespace() -> None:
+    assert normalize_prompt("  Wat is de  AVG?\n") == normalize_prompt("wat is de avg?")
+    assert normalize_prompt("ﬁle") == "file"
+
+
+def test_cache_key_depends_on_model_system_prompt_and_user() -> None:
+    key = cache_key("gpt-4o", "system", "Wat is de AVG?")
+
+    assert key.startswith("ai:cache:")
+    assert key == cache_key("gpt-4o", "system", "wat is de  avg?")
+    assert key != cache_key("gpt-4", "system", "Wat is de AVG?")
+    assert key != cache_key("gpt-4o", "other system", "Wat is de AVG?")
+    assert key != cache_key("gpt-4o", "system", "Wat is de AVG?", user_key="user-1")
+
+
+async def test_local_hit_does_not_read_redis() -> None:
+    cache = AIResponseCache(ttl=60, max_entries=10)
+    redis = AsyncMock()
+
+    with patch("app.core.ai_cache.get_redis_client", return_value=redis):
+        await cache.put("key", answer("Hallo"))
+        cached = await cache.get("key")
+
+    assert cached is not None
+    assert cached.chunks == ["Hallo"]
+    redis.set.assert_awaited_once()
+    assert redis.set.call_args.kwargs["ex"] == 60
+    redis.get.assert_not_called()
+
+
+async def test_least_recently_used_entry_is_dropped() -> None:
+    cache = AIResponseCache(ttl=60, max_entries=2)
+    redis = AsyncMock()
+    redis.get.return_value = None
+
+    with patch("app.core.ai_cache.get_redis_client", return_value=redis):
+        await cache.put("a", answer("a"))
+        await cache.put("b", answer("b"))
+        await cache.get("a")
+        await cache.put("c", answer("c"))
+
+        assert await cache.get("a") is not None
+        assert await cache.get("b") is None
+
+
+async def test_expired_entry_falls_back_to_redis() -> None:
+    cache = AIResponseCache(ttl=60, max_entries=10)
+    redis = AsyncMock()
+    redis.get.return_value = answer("Nieuw").model_dump_json()
+
+    with patch("app.core.ai_cache.get_redis_client", return_value=redis):
+        await cache.put("key", answer("Oud", created_at=time.time() - 120))
+        cached = await cache.get("key")
+
+    assert cached is not None
+    assert cached.chunks == ["Nieuw"]
+    redis.get.assert_awaited_once_with("key")
+
+
+async def test_redis_errors_are_a_miss() -> None:
+    cache = AIResponseCache(ttl=60, max_entries=10)
+    redis = AsyncMock()
+    redis.get.side_effect = RedisError("down")
+    redis.set.side_effect = RedisError("down")
+
+    with patch("app.core.ai_cache.get_redis_client", return_value=redis), patch("app.core.ai_cache.logger"):
+        assert await cache.get("key") is None
+        await cache.put("key", answer("Hallo"))
+        assert await cache.get("key") is not None
@@ -205,6 +205,12 @@ class TestRefreshToken:
         assert "Session expired" in str(exc_info.value.detail)
 
 
+def _refresh_lock(mock_session: MagicMock, *acquired: bool) -> None:
+    """Give the mocked session a refresh lock, acquired or not in turn as given (always if none)."""
+    mock_session.acquire_refresh_lock = AsyncMock(side_effect=list(acquired) or None, return_value=True)
+    mock_session.release_refresh_lock = AsyncMock()
+
+
 class TestGetCurrentUser:
     """Test cases for the get_current_user function."""
 
@@ -280,6 +286,7 @@ class TestGetCurrentUser:
         valid_auth_state: AuthState,
     ) -> None:
         """Test get_current_user when token refresh is needed."""
+        _refresh_lock(mock_session)
         # Configure the flow: initial auth, re-check after lock, auth after refresh
         mock_session.get_auth = AsyncMock(
             side_effect=[
@@ -291,12 +298,34 @@ class TestGetCurrentUser:
 
         result = await get_current_user(mock_request, None)
 
-        # Verify refresh was called
+        # Verify refresh was called, holding the session's refresh lock
         mock_refresh.assert_called_once_with(mock_request, expired_auth_state.refresh_token)
+        mock_session.release_refresh_lock.assert_called_once()
 
         # Verify result
         assert result == valid_auth_state.user
 
+    @pytest.mark.asyncio
+    @patch("app.core.authentication.session")
+    @patch("app.core.authentication._refresh_token")
+    async def test_get_current_user_skips_refresh_done_before_the_lock(
+        self,
+        mock_refresh: AsyncMock,
+        mock_session: MagicMock,
+        mock_request: Request,
+        expired_auth_state: AuthState,
+        valid_auth_state: AuthState,
+    ) -> None:
+        """Test that tokens refreshed by the previous lock holder are not refreshed again."""
+        _refresh_lock(mock_session)
+        mock_session.get_auth = AsyncMock(side_effect=[expired_auth_state, valid_auth_state])
+
+        result = await get_current_user(mock_request, None)
+
+        assert result == valid_auth_state.user
+        mock_refresh.assert_not_called()
+        mock_session.release_refresh_lock.assert_called_once()
+
     @pytest.mark.asyncio
     @patch("app.core.authentication.session")
     @patch("app.core.authentication._refresh_token")
@@ -308,6 +337,7 @@ class TestGetCurrentUser:
         expired_auth_state: AuthState,
     ) -> None:
         """Test get_current_user when session is lost after refresh."""
+        _refresh_lock(mock_session)
         # Configure flow: initial auth, session lost after refresh
         mock_session.get_auth = AsyncMock(
             side_effect=[
@@ -334,19 +364,16 @@ class TestGetCurrentUser:
         valid_auth_state: AuthState,
     ) -> None:
         """Test that concurrent refresh requests result in 409 for conflicting requests."""
-        from app.exceptions import TokenRefreshConflictError
         from fastapi import HTTPException
 
-        # First request succeeds, second gets conflict
-        mock_refresh.side_effect = [
-            None,  # First refresh succeeds
-            TokenRefreshConflictError(),  # Second gets conflict (uses default detail message)
-        ]
+        # First request takes the refresh lock, second finds it taken and gets a conflict
+        _refresh_lock(mock_session, True, False)
 
         # Both requests see expired token initially
         mock_session.get_auth = AsyncMock(
             side_effect=[
                 expired_auth_state,  # Request 1: initial check
+                expired_auth_state,  # Request 1: re-check after lock
                 valid_auth_state,  # Request 1: after refresh
                 expired_auth_state,  # Request 2: initial check
             ]
@@ -361,10 +388,11 @@ class TestGetCurrentUser:
         # First should succeed
         assert results[0] == valid_auth_state.user
 
-        # Second should get 409 conflict
+        # Second should get 409 conflict without going to the IdP
         assert isinstance(results[1], HTTPException)
         assert results[1].status_code == 409
         assert "conflict" in results[1].detail.lower()
+        mock_refresh.assert_called_once()
 
     @pytest.mark.asyncio
     @patch("app.core.authentication.session")
@@ -380,6 +408,7 @@ class TestGetCurrentUser:
         # Create request without session ID
         request = MagicMock(spec=Request)
         request.session = {}  # No _session_id
+        _refresh_lock(mock_session)
 
         mock_session.get_auth.side_effect = [
             expired_auth_state,  # Initial check
@@ -449,6 +478,7 @@ class TestGetCurrentUser:
                 refresh_token="new_refresh_token",
                 expires_at=int(time.time()) + 3600,
             )
+            _refresh_lock(mock_session)
             mock_session.get_auth = AsyncMock(
                 side_effect=[
                     auth_state,  # Initial check
@@ -481,28 +511,19 @@ class TestGetCurrentUser:
     ) -> None:
         """Test that concurrent refresh requests return 409 for conflicting refreshes.
 
-        With the 409 pattern, we accept that concurrent refreshes may happen.
-        The first succeeds, others get TokenRefreshConflictError which becomes 409.
-        Frontend is expected to retry 409 responses.
+        The first request takes the session's refresh lock; the others find it taken and get
+        TokenRefreshConflictError, which becomes 409. Frontend is expected to retry 409 responses.
         """
-        from app.exceptions import TokenRefreshConflictError
         from fastapi import HTTPException
 
-        # First refresh succeeds, others get conflict
-        refresh_effects = [
-            None,  # First succeeds
-            TokenRefreshConflictError("Token already used"),  # Conflict
-            TokenRefreshConflictError("Token already used"),  # Conflict
-            TokenRefreshConflictError("Token already used"),  # Conflict
-            TokenRefreshConflictError("Token already used"),  # Conflict
-        ]
-        mock_refresh.side_effect = refresh_effects
+        _refresh_lock(mock_session, True, False, False, False, False)
 
         # All requests see expired token initially
         get_auth_effects = []
         for i in range(5):
             get_auth_effects.append(expired_auth_state)  # Initial check
             if i == 0:
+                get_auth_effects.append(expired_auth_state)  # Re-check after lock
                 get_auth_effects.append(valid_auth_state)  # After successful refresh
 
         mock_session.get_auth = AsyncMock(side_effect=get_auth_effects)
@@ -515,7 +536,84 @@ class TestGetCurrentUser:
         # First should succeed
         assert isinstance(results[0], User)
 
-        # Others should get 409 (which frontend will retry)
+        # Others should get 409 (which frontend will retry), and only one refresh reaches the IdP
         for i in range(1, 5):
             assert isinstance(results[i], HTTPException)
             assert results[i].status_code == 409
+        mock_refresh.assert_called_once()
+
+
+class TestLocalTokenVerification:
+    """Test cases for local JWKS verification in get_current_user."""
+
+    @pytest.fixture
+    def mock_request(self) -> Request:
+        request = MagicMock(spec=Request)
+        request.session = {}
+        request.state = MagicMock()
+        return request
+
+    @pytest.fixture
+    def valid_auth_state(self) -> AuthState:
+        return AuthState(
+            sub="user123",
+            user=User(name="Test User", email="test@example.com"),
+            access_token="valid_token",
+            refresh_token="valid_refresh_token",
+            expires_at=int(time.time()) + 3600,
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.core.authentication.settings")
+    @patch("app.core.authentication.verify_access_token")
+    @patch("app.core.authentication.session")
+    async def test_bearer_token_without_session(
+        self, mock_session: MagicMock, mock_verify: AsyncMock, mock_settings: MagicMock, mock_request: Request
+    ) -> None:
+        """Test that a verified bearer token authenticates a client without a session."""
+        mock_settings.jwks_verification_enabled = True
+        mock_settings.OIDC_NAME_CLAIM = "name"
+        mock_settings.OIDC_EMAIL_CLAIM = "email"
+        mock_session.get_auth = AsyncMock(return_value=None)
+        mock_verify.return_value = {"name": "API Client", "email": "api@example.com", "realm_access": {"roles": []}}
+
+        result = await get_current_user(mock_request, "bearer-token")
+
+        mock_verify.assert_called_once_with("bearer-token")
+        assert result == User(name="API Client", email="api@example.com")
+        assert mock_request.state.bearer_token == "bearer-token"
+
+    @pytest.mark.asyncio
+    @patch("app.core.authentication.session")
+    async def test_bearer_token_ignored_when_verification_disabled(
+        self, mock_session: MagicMock, mock_request: Request
+    ) -> None:
+        """Test that bearer tokens are not accepted unless local verification is enabled."""
+        mock_session.get_auth = AsyncMock(return_value=None)
+
+        with pytest.raises(CredentialError):
+            await get_current_user(mock_request, "bearer-token")
+
+    @pytest.mark.asyncio
+    @patch("app.core.authentication.settings")
+    @patch("app.core.authentication.verify_access_token")
+    @patch("app.core.authentication.session")
+    async def test_invalid_session_token_clears_session(
+        self,
+        mock_session: MagicMock,
+        mock_verify: AsyncMock,
+        mock_settings: MagicMock,
+        mock_request: Request,
+        valid_auth_state: AuthState,
+    ) -> None:
+        """Test that a session whose access token fails verification is cleared."""
+        mock_settings.jwks_verification_enabled = True
+        mock_session.get_auth = AsyncMock(return_value=valid_auth_state)
+        mock_session.clear_auth = AsyncMock()
+        mock_verify.side_effect = CredentialError("Invalid access token")
+
+        with pytest.raises(CredentialError) as exc_info:
+            await get_current_user(mock_request, None)
+
+        mock_session.clear_auth.assert_called_once_with(mock_request)
+        assert "Session expired" in str(exc_info.value.detail)
@@ -0,0 +1,36 @@
+"""Tests for the per-user Grist document index."""
+
+from app.core.grist_index import merge_updates
+from app.models.grist import GristDocument
+
+
+def _document(doc_id: str, updated_at: str, name: str | None = None) -> GristDocument:
+    return GristDocument(
+        id=doc_id,
+        name=name or doc_id,
+        access="owners",
+        is_pinned=False,
+        url_id=doc_id,
+        created_at="2024-01-01T10:00:00Z",
+        updated_at=updated_at,
+    )
+
+
+class TestMergeUpdates:
+    def test_builds_sorted_index_without_previous(self) -> None:
+        documents = [_document("a", "2024-01-10"), _document("b", "2024-01-30"), _document("c", "2024-01-20")]
+
+        assert [doc.id for doc in merge_updates([], documents)] == ["b", "c", "a"]
+
+    def test_merges_updated_new_and_removed_documents(self) -> None:
+        previous = [_document("b", "2024-01-30"), _document("c", "2024-01-20"), _document("a", "2024-01-10")]
+        documents = [
+            _document("a", "2024-02-05", name="renamed"),  # updated
+            _document("b", "2024-01-30"),
+            _document("d", "2024-01-25"),  # new; c was removed
+        ]
+
+        index = merge_updates(previous, documents)
+
+        assert [doc.id for doc in index] == ["a", "b", "d"]
+        assert index[0].name == "renamed"
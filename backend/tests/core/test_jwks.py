@@ -0,0 +1,150 @@
+"""Tests for local access token verification against the JWKS."""
+
+import asyncio
+import base64
+import time
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from app.core.jwks import JWKSCache, verify_access_token
+from app.exceptions import CredentialError
+from jose import jwt
+
+SECRET = "test-signing-secret-with-enough-entropy"
+
+
+def _jwk(kid: str = "key-1", secret: str = SECRET) -> dict[str, Any]:
+    return {
+        "kty": "oct",
+        "kid": kid,
+        "use": "sig",
+        "alg": "HS256",
+        "k": base64.urlsafe_b64encode(secret.encode()).rstrip(b"=").decode(),
+    }
+
+
+def _token(kid: str = "key-1", secret: str = SECRET, **overrides: Any) -> str:  # noqa: ANN401
+    claims = {
+        "sub": "user123",
+        "azp": "bureaublad",
+        "aud": "account",
+        "exp": int(time.time()) + 300,
+        "name": "Test User",
+        "email": "test@example.com",
+        **overrides,
+    }
+    return jwt.encode(claims, secret, algorithm="HS256", headers={"kid": kid})
+
+
+def _loaded_cache(*keys: dict[str, Any]) -> JWKSCache:
+    cache = JWKSCache(refresh_interval=3600, min_refresh_interval=60)
+    cache.keys = {key["kid"]: key for key in keys}
+    cache.last_refresh = time.monotonic()
+    return cache
+
+
+class TestJWKSCache:
+    @pytest.fixture
+    def mock_http_client(self) -> MagicMock:
+        response = MagicMock()
+        response.json.return_value = {"keys": [_jwk("key-1"), _jwk("key-2"), {**_jwk("enc-1"), "use": "enc"}]}
+        http_client = MagicMock()
+        http_client.get = AsyncMock(return_value=response)
+        return http_client
+
+    async def test_refresh_indexes_signing_keys_by_kid(self, mock_http_client: MagicMock) -> None:
+        cache = JWKSCache(refresh_interval=3600, min_refresh_interval=60)
+
+        with patch("app.core.jwks.http_client_dependency", AsyncMock(return_value=mock_http_client)):
+            await cache.refresh()
+
+        assert set(cache.keys) == {"key-1", "key-2"}
+        assert cache.last_refresh > 0
+
+    async def test_get_key_unknown_kid_refreshes(self, mock_http_client: MagicMock) -> None:
+        cache = JWKSCache(refresh_interval=3600, min_refresh_interval=60)
+
+        with patch("app.core.jwks.http_client_dependency", AsyncMock(return_value=mock_http_client)):
+            key = await cache.get_key("key-2")
+
+        assert key is not None
+        assert key["kid"] == "key-2"
+        mock_http_client.get.assert_called_once()
+
+    async def test_get_key_unknown_kid_is_rate_limited(self, mock_http_client: MagicMock) -> None:
+        cache = _loaded_cache(_jwk("key-1"))
+
+        with patch("app.core.jwks.http_client_dependency", AsyncMock(return_value=mock_http_client)):
+            key = await cache.get_key("forged-kid")
+
+        assert key is None
+        mock_http_client.get.assert_not_called()
+
+    async def test_concurrent_unknown_kids_share_one_refresh(self, mock_http_client: MagicMock) -> None:
+        cache = JWKSCache(refresh_interval=3600, min_refresh_interval=60)
+
+        with patch("app.core.jwks.http_client_dependency", AsyncMock(return_value=mock_http_client)):
+            keys = await asyncio.gather(*(cache.get_key(f"forged-{i}") for i in range(5)), cache.get_key("key-2"))
+
+        assert keys[:5] == [None] * 5
+        assert keys[5] is not None
+        mock_http_client.get.assert_called_once()
+
+    async def test_failed_refresh_is_rate_limited(self, mock_http_client: MagicMock) -> None:
+        cache = JWKSCache(refresh_interval=3600, min_refresh_interval=60)
+        mock_http_client.get.side_effect = httpx.ConnectError("IdP down")
+
+        with patch("app.core.jwks.http_client_dependency", AsyncMock(return_value=mock_http_client)):
+            with pytest.raises(httpx.ConnectError):
+                await cache.get_key("key-1")
+            key = await cache.get_key("key-1")
+
+        assert key is None
+        mock_http_client.get.assert_called_once()
+
+    async def test_start_and_stop_background_rotation(self, mock_http_client: MagicMock) -> None:
+        cache = JWKSCache(refresh_interval=3600, min_refresh_interval=60)
+
+        with patch("app.core.jwks.http_client_dependency", AsyncMock(return_value=mock_http_client)):
+            await cache.start()
+            assert cache._task is not None
+            await cache.stop()
+
+        assert cache._task is None
+        assert "key-1" in cache.keys
+
+
+class TestVerifyAccessToken:
+    async def test_valid_token_returns_claims(self) -> None:
+        with patch("app.core.jwks.jwks_cache", _loaded_cache(_jwk())):
+            claims = await verify_access_token(_token())
+
+        assert claims["sub"] == "user123"
+
+    async def test_audience_match(self) -> None:
+        with patch("app.core.jwks.jwks_cache", _loaded_cache(_jwk())):
+            claims = await verify_access_token(_token(azp="other-client", aud=["bureaublad", "account"]))
+
+        assert claims["azp"] == "other-client"
+
+    async def test_wrong_audience_rejected(self) -> None:
+        with patch("app.core.jwks.jwks_cache", _loaded_cache(_jwk())), pytest.raises(CredentialError):
+            await verify_access_token(_token(azp="other-client"))
+
+    async def test_expired_token_rejected(self) -> None:
+        with patch("app.core.jwks.jwks_cache", _loaded_cache(_jwk())), pytest.raises(CredentialError):
+            await verify_access_token(_token(exp=int(time.time()) - 10))
+
+    async def test_bad_signature_rejected(self) -> None:
+        with patch("app.core.jwks.jwks_cache", _loaded_cache(_jwk())), pytest.raises(CredentialError):
+            await verify_access_token(_token(secret="some-other-secret-with-enough-entropy"))
+
+    async def test_unknown_kid_rejected(self) -> None:
+        with patch("app.core.jwks.jwks_cache", _loaded_cache(_jwk())), pytest.raises(CredentialError):
+            await verify_access_token(_token(kid="unknown"))
+
+    async def test_malformed_token_rejected(self) -> None:
+        with patch("app.core.jwks.jwks_cache", _loaded_cache(_jwk())), pytest.raises(CredentialError):
+            await verify_access_token("not-a-jwt")
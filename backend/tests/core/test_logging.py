@@ -0,0 +1,121 @@
+"""Tests for the structured, queue-backed logging pipeline."""
+
+import io
+import json
+import logging
+from collections.abc import Generator
+
+import pytest
+from app.context import set_request_id
+from app.core.config import settings
+from app.core.logging import BoundedQueueHandler, JSONFormatter, RequestIDFilter, configure_logging, stop_logging
+
+
+def _record(message: str, level: int = logging.INFO, **extra: object) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", level, __file__, 1, message, None, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+@pytest.fixture
+def restore_logging() -> Generator[None]:
+    yield
+    configure_logging(
+        settings.LOGGING_LEVEL, settings.LOGGING_CONFIG, settings.LOGGING_FORMAT, settings.LOGGING_QUEUE_SIZE
+    )
+
+
+class TestJSONFormatter:
+    def test_formats_extra_fields(self) -> None:
+        record = _record("GET /api 200", request_id="req-1", path="/api", duration_ms=1.5)
+
+        body = json.loads(JSONFormatter().format(record))
+
+        assert body["message"] == "GET /api 200"
+        assert body["level"] == "INFO"
+        assert body["request_id"] == "req-1"
+        assert body["path"] == "/api"
+        assert body["duration_ms"] == 1.5
+        assert "args" not in body
+
+    def test_formats_exception(self) -> None:
+        error = ValueError("boom")
+        record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "failed", None, (ValueError, error, None))
+
+        body = json.loads(JSONFormatter().format(record))
+
+        assert "ValueError: boom" in body["exc_info"]
+
+
+class TestBoundedQueueHandler:
+    def test_merges_arguments_before_enqueueing(self) -> None:
+        handler = BoundedQueueHandler(maxsize=10)
+        record = logging.LogRecord("app.test", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+
+        handler.handle(record)
+
+        queued = handler.records.get_nowait()
+        assert queued.msg == "hello world"
+        assert queued.args is None
+
+    def test_drops_when_full_and_reports_count(self) -> None:
+        handler = BoundedQueueHandler(maxsize=2, overload_ratio=1.0)
+        for i in range(4):
+            handler.handle(_record(f"message {i}", level=logging.WARNING))
+        assert handler.dropped == 2
+
+        handler.records.get_nowait()
+        handler.records.get_nowait()
+        handler.handle(_record("after", level=logging.WARNING))
+
+        assert handler.records.get_nowait().getMessage() == "Dropped 2 log records under load"
+        assert handler.records.get_nowait().getMessage() == "after"
+
+    def test_samples_low_levels_under_overload(self) -> None:
+        handler = BoundedQueueHandler(maxsize=100, sample_rate=10, overload_ratio=0.0)
+
+        for i in range(20):
+            handler.handle(_record(f"debug {i}", level=logging.DEBUG))
+        handler.handle(_record("warning", level=logging.WARNING))
+
+        messages = [handler.records.get_nowait().getMessage() for _ in range(handler.records.qsize())]
+        assert messages == [
+            "Dropped 9 log records under load",
+            "debug 9",
+            "Dropped 9 log records under load",
+            "debug 19",
+            "warning",
+        ]
+
+
+class TestConfigureLogging:
+    def test_writes_through_listener_with_request_id(self, restore_logging: None) -> None:
+        stream = io.StringIO()
+        config = {
+            "handlers": {
+                "console": {"formatter": "json", "class": "logging.StreamHandler", "stream": stream},
+            },
+            "loggers": {"": {"handlers": ["console"], "level": "DEBUG"}},
+        }
+        configure_logging("INFO", config, queue_size=100)
+        root_handlers = logging.getLogger().handlers
+        assert len(root_handlers) == 1
+        assert isinstance(root_handlers[0], BoundedQueueHandler)
+
+        set_request_id("req-42")
+        logging.getLogger("app.test").info("handled", extra={"status_code": 200})
+        set_request_id("")
+        stop_logging()
+
+        body = json.loads(stream.getvalue().strip())
+        assert body["message"] == "handled"
+        assert body["request_id"] == "req-42"
+        assert body["status_code"] == 200
+
+    def test_request_id_filter_keeps_existing_id(self) -> None:
+        record = _record("queued", request_id="req-1")
+
+        RequestIDFilter().filter(record)
+
+        assert record.request_id == "req-1"
@@ -0,0 +1,97 @@
+"""Tests for the event loop watchdog."""
+
+import asyncio
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from app.context import set_request_id
+from app.core.loop_watchdog import LoopWatchdog
+from app.core.metrics import event_loop_blocked, event_loop_lag
+
+# Reading the request id of the blocked task needs Task.get_context()
+requires_task_context = pytest.mark.skipif(sys.version_info < (3, 12), reason="Task.get_context() is new in 3.12")
+
+
+def blocking_call() -> None:
+    time.sleep(0.2)
+
+
+async def handle_request() -> None:
+    set_request_id("req-blocked")
+    blocking_call()
+
+
+async def test_measures_loop_lag() -> None:
+    watchdog = LoopWatchdog(interval=0.01, threshold=1)
+    before = sum(event_loop_lag.counts.get((), []))
+
+    assert watchdog.start()
+    assert not watchdog.start()
+    await asyncio.sleep(0.05)
+    await watchdog.stop()
+
+    assert sum(event_loop_lag.counts[()]) > before
+
+
+@requires_task_context
+async def test_logs_stack_of_blocking_call_once() -> None:
+    watchdog = LoopWatchdog(interval=0.01, threshold=0.05)
+    blocked_before = event_loop_blocked.values.get((), 0)
+
+    with patch("app.core.loop_watchdog.logger") as logger:
+        watchdog.start()
+        await asyncio.sleep(0.02)
+        await asyncio.create_task(handle_request())
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+
+    logger.warning.assert_called_once()
+    message = logger.warning.call_args.args[0]
+    assert message.startswith("Event loop blocked for more than")
+    assert "in blocking_call" in message
+    assert "handle_request" in message
+    assert event_loop_blocked.values[()] == blocked_before + 1
+
+
+@requires_task_context
+async def test_logs_request_id_of_blocked_task() -> None:
+    watchdog = LoopWatchdog(interval=0.01, threshold=0.05)
+
+    with patch("app.core.loop_watchdog.logger") as logger:
+        watchdog.start()
+        await asyncio.sleep(0.02)
+        await asyncio.create_task(handle_request())
+        await watchdog.stop()
+
+    assert logger.warning.call_args.kwargs["extra"]["request_id"] == "req-blocked"
+
+
+async def test_no_report_without_blocking() -> None:
+    watchdog = LoopWatchdog(interval=0.01, threshold=0.05)
+
+    with patch("app.core.loop_watchdog.logger") as logger:
+        watchdog.start()
+        await asyncio.sleep(0.1)
+        await watchdog.stop()
+
+    logger.warning.assert_not_called()
+
+
+@requires_task_context
+async def test_blocked_counter_is_updated_on_the_loop() -> None:
+    watchdog = LoopWatchdog(interval=0.01, threshold=0.05)
+    before = event_loop_blocked.values.get((), 0)
+    # Joined without awaiting, so the loop is blocked while the watcher thread reports
+    watcher = threading.Thread(target=watchdog.report, args=(asyncio.get_running_loop(), threading.get_ident(), 0.1))
+
+    with patch("app.core.loop_watchdog.logger"):
+        watcher.start()
+        watcher.join()
+    during_stall = event_loop_blocked.values.get((), 0)
+    await asyncio.sleep(0)
+
+    assert during_stall == before
+    assert event_loop_blocked.values[()] == before + 1
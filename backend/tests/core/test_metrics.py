@@ -0,0 +1,74 @@
+"""Tests for the Prometheus metrics registry."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from app.core.http_clients import HTTPClientDependency
+from app.core.metrics import Counter, Gauge, Histogram, Registry
+from app.core.redis import InstrumentedRedis
+
+
+class TestMetrics:
+    def test_counter_renders_labels(self) -> None:
+        counter = Counter("upstream_errors_total", "Failed calls", ("service", "reason"), registry=None)
+        counter.inc("Docs", "status")
+        counter.inc("Docs", "status")
+        counter.inc('Nextcloud "OCS"', "transport")
+
+        assert counter.render().splitlines() == [
+            "# HELP upstream_errors_total Failed calls",
+            "# TYPE upstream_errors_total counter",
+            'upstream_errors_total{service="Docs",reason="status"} 2',
+            'upstream_errors_total{service="Nextcloud \\"OCS\\"",reason="transport"} 1',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        histogram = Histogram("duration_seconds", "Duration", ("route",), buckets=(0.1, 1.0), registry=None)
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.1, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(3.0, "/a")
+
+        assert histogram.render().splitlines()[2:] == [
+            'duration_seconds_bucket{route="/a",le="0.1"} 2',
+            'duration_seconds_bucket{route="/a",le="1.0"} 3',
+            'duration_seconds_bucket{route="/a",le="+Inf"} 4',
+            'duration_seconds_sum{route="/a"} 3.65',
+            'duration_seconds_count{route="/a"} 4',
+        ]
+
+    def test_time_outcome_labels_errors(self) -> None:
+        histogram = Histogram("refresh_seconds", "Refresh", ("source", "outcome"), registry=None)
+
+        with histogram.time_outcome("request"):
+            pass
+        with pytest.raises(ValueError, match="boom"), histogram.time_outcome("request"):
+            raise ValueError("boom")
+
+        assert set(histogram.counts) == {("request", "success"), ("request", "error")}
+
+    def test_gauge_callback_and_registry(self) -> None:
+        registry = Registry()
+        Gauge("pool_connections", "Pool", ("state",), callback=lambda: {("idle",): 3}, registry=registry)
+
+        assert registry.render().endswith('pool_connections{state="idle"} 3\n')
+
+
+class TestInstrumentation:
+    async def test_redis_commands_are_observed(self) -> None:
+        client = InstrumentedRedis()
+        histogram = Histogram("redis_seconds", "Redis", ("command",), registry=None)
+
+        with (
+            patch("app.core.redis.redis_command_duration", histogram),
+            patch("redis.asyncio.Redis.execute_command", AsyncMock(return_value="value")),
+        ):
+            assert await client.get("key") == "value"
+
+        assert histogram.counts[("GET",)] == [1] + [0] * len(histogram.buckets)
+
+    def test_pool_limit(self) -> None:
+        assert HTTPClientDependency().max_connections() == {(): 100}  # httpx default limit
+        assert HTTPClientDependency(limits=httpx.Limits(max_connections=10)).max_connections() == {(): 10}
+        assert HTTPClientDependency(limits=httpx.Limits(max_connections=None)).max_connections() == {}
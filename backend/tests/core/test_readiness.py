@@ -0,0 +1,91 @@
+"""Tests for the cached readiness checks."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from app.core.readiness import ReadinessMonitor, create_readiness_monitor, http_check
+
+
+async def _ok() -> None:
+    return None
+
+
+async def _fail() -> None:
+    raise ConnectionError("connection refused")
+
+
+async def _hang() -> None:
+    await asyncio.sleep(10)
+
+
+class TestReadinessMonitor:
+    async def test_not_ready_before_first_run(self) -> None:
+        monitor = ReadinessMonitor(interval=10, timeout=1)
+        monitor.add_check("redis", _ok)
+
+        assert not monitor.ready
+
+    async def test_ready_when_required_checks_pass(self) -> None:
+        monitor = ReadinessMonitor(interval=10, timeout=1)
+        monitor.add_check("redis", _ok)
+        monitor.add_check("docs", _fail, required=False)
+
+        await monitor.run_once()
+
+        assert monitor.ready
+        assert monitor.results["docs"].error == "ConnectionError: connection refused"
+
+    async def test_failing_or_hanging_required_check(self) -> None:
+        monitor = ReadinessMonitor(interval=10, timeout=0.01)
+        monitor.add_check("redis", _ok)
+        monitor.add_check("oidc", _hang)
+
+        await monitor.run_once()
+
+        assert not monitor.ready
+        assert monitor.results["oidc"].error == "timed out after 0.01s"
+
+    async def test_stale_results_are_not_ready(self) -> None:
+        monitor = ReadinessMonitor(interval=10, timeout=1)
+        monitor.add_check("redis", _ok)
+        await monitor.run_once()
+
+        monitor.checked_at -= 31
+
+        assert not monitor.ready
+
+    async def test_start_and_stop(self) -> None:
+        monitor = ReadinessMonitor(interval=10, timeout=1)
+        monitor.add_check("redis", _ok)
+
+        assert await monitor.start()
+        assert not await monitor.start()
+        assert monitor.running
+        assert monitor.ready
+
+        await monitor.stop()
+        assert not monitor.running
+
+
+class TestChecks:
+    async def test_http_check_accepts_client_errors_for_backends(self) -> None:
+        http_client = AsyncMock()
+        http_client.get.return_value = Mock(status_code=401)
+
+        with patch("app.core.readiness.http_client_dependency", AsyncMock(return_value=http_client)):
+            await http_check("https://docs.example.com", accept_client_errors=True)()
+            with pytest.raises(RuntimeError, match="status 401"):
+                await http_check("https://idp.example.com/certs")()
+
+    def test_backends_are_optional_checks(self) -> None:
+        with (
+            patch("app.core.readiness.settings.READINESS_CHECK_BACKENDS", True),
+            patch("app.core.readiness.settings.DOCS_URL", "https://docs.example.com"),
+            patch("app.core.readiness.settings.OIDC_JWKS_ENDPOINT", "https://idp.example.com/certs"),
+        ):
+            monitor = create_readiness_monitor()
+
+        assert monitor.checks["redis"][1] is True
+        assert monitor.checks["oidc"][1] is True
+        assert monitor.checks["docs"][1] is False
@@ -0,0 +1,125 @@
+"""Tests for the fan-out search and its scorers."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from app.core.search import (
+    SearchProvider,
+    fan_out_search,
+    parse_timestamp,
+    recency,
+    recency_scorer,
+    title_match,
+)
+from app.exceptions import TooManyRequestsError
+from app.models.search import SearchHit
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+
+
+def _provider(source: str, titles: list[str], delay: float = 0.0) -> SearchProvider:
+    async def search(term: str, limit: int) -> list[SearchHit]:
+        await asyncio.sleep(delay)
+        return [SearchHit(source=source, title=title) for title in titles[:limit]]
+
+    return search
+
+
+def _failing_provider() -> SearchProvider:
+    async def search(term: str, limit: int) -> list[SearchHit]:
+        raise RuntimeError("service down")
+
+    return search
+
+
+class TestScorers:
+    def test_title_match_ranks_exact_over_prefix_over_substring(self) -> None:
+        scores = [title_match(title, "report") for title in ("Report", "Reports 2025", "Q1 reports", "myreport", "x")]
+
+        assert scores == sorted(scores, reverse=True)
+        assert scores[0] == 1.0
+
+    def test_recency_halves_every_half_life(self) -> None:
+        assert recency(NOW, NOW) == 1.0
+        assert recency(NOW - timedelta(days=30), NOW) == 0.5
+        assert recency(None, NOW) == 0.0
+
+    def test_recency_scorer_prefers_recent_results(self) -> None:
+        old = SearchHit(source="docs", title="report", updated_at=NOW - timedelta(days=300))
+        new = SearchHit(source="docs", title="unrelated", updated_at=NOW - timedelta(days=1))
+
+        assert recency_scorer(new, "report", NOW) > recency_scorer(old, "report", NOW)
+
+    def test_parse_timestamp(self) -> None:
+        assert parse_timestamp("2026-03-01T12:00:00") == NOW
+        assert parse_timestamp("2026-03-01T12:00:00+00:00") == NOW
+        assert parse_timestamp("yesterday") is None
+        assert parse_timestamp(None) is None
+
+
+class TestFanOutSearch:
+    async def test_merges_and_ranks_all_sources(self) -> None:
+        providers = {
+            "docs": _provider("docs", ["Quarterly report", "Notes"]),
+            "drive": _provider("drive", ["report"]),
+        }
+
+        response = await fan_out_search(providers, "report", limit=10, deadline=1.0)
+
+        assert [hit.title for hit in response.results] == ["report", "Quarterly report", "Notes"]
+        assert response.results[0].score > response.results[1].score
+        assert response.sources == {"docs": "ok", "drive": "ok"}
+
+    async def test_failed_source_does_not_fail_search(self) -> None:
+        providers = {"docs": _provider("docs", ["report"]), "drive": _failing_provider()}
+
+        response = await fan_out_search(providers, "report", limit=10, deadline=1.0)
+
+        assert len(response.results) == 1
+        assert response.sources == {"docs": "ok", "drive": "error"}
+
+    async def test_rate_limited_source_is_throttled(self) -> None:
+        async def throttled(term: str, limit: int) -> list[SearchHit]:
+            raise TooManyRequestsError("NextCloud OCS", retry_after=10)
+
+        response = await fan_out_search({"ocs": throttled}, "report", limit=10, deadline=1.0)
+
+        assert response.sources == {"ocs": "throttled"}
+
+    async def test_deadline_answers_with_partial_results(self) -> None:
+        providers = {"docs": _provider("docs", ["report"]), "drive": _provider("drive", ["report"], delay=5)}
+
+        response = await asyncio.wait_for(fan_out_search(providers, "report", limit=10, deadline=0.05), timeout=1)
+
+        assert [hit.source for hit in response.results] == ["docs"]
+        assert response.sources == {"docs": "ok", "drive": "timeout"}
+
+    async def test_cancels_stragglers_once_enough_results(self) -> None:
+        cancelled = asyncio.Event()
+
+        async def slow(term: str, limit: int) -> list[SearchHit]:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return []
+
+        providers = {"docs": _provider("docs", ["a report", "b report"]), "drive": slow}
+
+        response = await fan_out_search(providers, "report", limit=2, deadline=5.0, grace=0.01)
+
+        assert len(response.results) == 2
+        assert response.sources == {"docs": "ok", "drive": "cancelled"}
+        assert cancelled.is_set()
+
+    async def test_ranks_sources_that_answer_within_the_grace_period(self) -> None:
+        providers = {
+            "docs": _provider("docs", ["Notes", "Old report"]),
+            "drive": _provider("drive", ["report"], delay=0.02),
+        }
+
+        response = await fan_out_search(providers, "report", limit=2, deadline=5.0, grace=1.0)
+
+        assert [hit.title for hit in response.results] == ["report", "Old report"]
+        assert response.sources == {"docs": "ok", "drive": "ok"}
@@ -0,0 +1,104 @@
+"""Tests for the open task query, ordering and cursors."""
+
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+from app.core.task_query import decode_cursor, encode_cursor, open_todos_queries, sort_key, top_tasks
+from app.exceptions import BadRequestError
+from app.models.task import Task
+
+
+def _task(uid: str | None, due: datetime | None, ref: str = "") -> Task:
+    return Task(title=uid or ref, start=None, end=due, uid=uid, ref=ref or f"/{uid}.ics")
+
+
+TASKS = [
+    _task("later", datetime(2024, 11, 20, 12)),
+    _task("undated", None),
+    _task("soon", datetime(2024, 11, 2, 9)),
+    _task("zoned", datetime(2024, 11, 10, 12, tzinfo=timezone(timedelta(hours=2)))),
+    _task("also-soon", datetime(2024, 11, 2, 9)),
+]
+
+
+class TestOpenTodosQueries:
+    def test_filters_completed_todos(self) -> None:
+        for query in open_todos_queries():
+            assert '<C:comp-filter name="VTODO">' in query
+            assert '<C:prop-filter name="COMPLETED"><C:is-not-defined/></C:prop-filter>' in query
+            assert "time-range" not in query
+
+    def test_todos_without_status_are_asked_for_separately(self) -> None:
+        without_status, open_status = open_todos_queries()
+
+        assert '<C:prop-filter name="STATUS"><C:is-not-defined/></C:prop-filter>' in without_status
+        assert "text-match" not in without_status
+        assert '<C:prop-filter name="STATUS"><C:is-not-defined/>' not in open_status
+
+    def test_filters_completed_status(self) -> None:
+        _without_status, open_status = open_todos_queries()
+
+        assert (
+            '<C:prop-filter name="STATUS">'
+            '<C:text-match negate-condition="yes" collation="i;ascii-casemap">COMPLETED</C:text-match>'
+            "</C:prop-filter>"
+        ) in open_status
+
+    def test_filters_cancelled_status(self) -> None:
+        _without_status, open_status = open_todos_queries()
+
+        assert (
+            '<C:prop-filter name="STATUS">'
+            '<C:text-match negate-condition="yes" collation="i;ascii-casemap">CANCELLED</C:text-match>'
+            "</C:prop-filter>"
+        ) in open_status
+
+    def test_due_before_becomes_utc_time_range(self) -> None:
+        for query in open_todos_queries(datetime(2024, 12, 1, 1, tzinfo=timezone(timedelta(hours=1)))):
+            assert '<C:time-range end="20241201T000000Z"/>' in query
+
+
+class TestTopTasks:
+    def test_sorts_by_due_date_with_undated_last(self) -> None:
+        page, next_key = top_tasks(TASKS, limit=10)
+
+        assert [task.uid for task in page] == ["also-soon", "soon", "zoned", "later", "undated"]
+        assert next_key is None
+
+    def test_pages_follow_the_cursor(self) -> None:
+        seen: list[str | None] = []
+        after = None
+        while True:
+            page, after = top_tasks(TASKS, limit=2, after=after)
+            seen.extend(task.uid for task in page)
+            if after is None:
+                break
+            after = decode_cursor(encode_cursor(after))
+
+        assert seen == ["also-soon", "soon", "zoned", "later", "undated"]
+
+    def test_ties_are_not_lost_across_pages(self) -> None:
+        # Tasks without a UID, and one UID in two calendars, share everything but their href
+        tasks = [_task(None, datetime(2024, 11, 2), ref=f"/t{index}.ics") for index in range(5)]
+        tasks += [_task("shared", None, ref="/work/shared.ics"), _task("shared", None, ref="/home/shared.ics")]
+        seen: list[str] = []
+        after = None
+        while True:
+            page, after = top_tasks(tasks, limit=2, after=after)
+            seen.extend(task.ref for task in page)
+            if after is None:
+                break
+            after = decode_cursor(encode_cursor(after))
+
+        assert seen == [f"/t{index}.ics" for index in range(5)] + ["/home/shared.ics", "/work/shared.ics"]
+
+
+def test_sort_key_compares_zoned_due_dates_in_utc() -> None:
+    assert sort_key(TASKS[3])[1] == datetime(2024, 11, 10, 10)
+    assert sort_key(_task("utc", datetime(2024, 11, 10, 10, tzinfo=UTC)))[1] == datetime(2024, 11, 10, 10)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90LWpzb24", "WzEsMiwzXQ"])
+def test_invalid_cursor(cursor: str) -> None:
+    with pytest.raises(BadRequestError):
+        decode_cursor(cursor)
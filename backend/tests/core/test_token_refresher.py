@@ -0,0 +1,192 @@
+"""Tests for the background token refresher."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.core.token_refresher import TokenRefresher
+from app.models.user import AuthState, User
+
+
+def _auth_state(expires_in: int, refresh_token: str | None = "refresh-token") -> AuthState:  # noqa: S107
+    return AuthState(
+        sub="user123",
+        user=User(name="Test User", email="test@example.com"),
+        access_token="old-access-token",
+        refresh_token=refresh_token,
+        expires_at=int(time.time()) + expires_in,
+    )
+
+
+@pytest.fixture
+def refresher() -> TokenRefresher:
+    return TokenRefresher(interval=30, lead_time=120, jitter=0, active_window=900, concurrency=2)
+
+
+@pytest.fixture
+def mock_session() -> MagicMock:
+    mock_session = MagicMock()
+    mock_session.load_auth = AsyncMock()
+    mock_session.replace_auth = AsyncMock(return_value=True)
+    mock_session.forget_session = AsyncMock()
+    mock_session.acquire_refresh_lock = AsyncMock(return_value=True)
+    mock_session.release_refresh_lock = AsyncMock()
+    mock_session.get_active_session_ids = AsyncMock(return_value=[])
+    return mock_session
+
+
+@pytest.fixture
+def mock_oauth() -> MagicMock:
+    mock_oauth = MagicMock()
+    mock_oauth.oidc.fetch_access_token = AsyncMock(
+        return_value={
+            "access_token": "new-access-token",
+            "expires_at": int(time.time()) + 300,
+            "refresh_token": "new-refresh-token",
+        }
+    )
+    return mock_oauth
+
+
+class TestTokenRefresher:
+    async def test_refreshes_session_expiring_soon(
+        self, refresher: TokenRefresher, mock_session: MagicMock, mock_oauth: MagicMock
+    ) -> None:
+        mock_session.load_auth.return_value = _auth_state(expires_in=60)
+
+        with (
+            patch("app.core.token_refresher.session", mock_session),
+            patch("app.core.token_refresher.oauth", mock_oauth),
+        ):
+            refreshed = await refresher.refresh_session("session-1")
+
+        assert refreshed is True
+        mock_oauth.oidc.fetch_access_token.assert_called_once_with(
+            grant_type="refresh_token", refresh_token="refresh-token"
+        )
+        stored = mock_session.replace_auth.call_args[0][1]
+        assert mock_session.replace_auth.call_args[0][0] == "session-1"
+        assert stored.access_token == "new-access-token"
+        assert stored.refresh_token == "new-refresh-token"
+
+    async def test_skips_session_not_due(
+        self, refresher: TokenRefresher, mock_session: MagicMock, mock_oauth: MagicMock
+    ) -> None:
+        mock_session.load_auth.return_value = _auth_state(expires_in=3600)
+
+        with (
+            patch("app.core.token_refresher.session", mock_session),
+            patch("app.core.token_refresher.oauth", mock_oauth),
+        ):
+            refreshed = await refresher.refresh_session("session-1")
+
+        assert refreshed is False
+        mock_oauth.oidc.fetch_access_token.assert_not_called()
+
+    async def test_skips_session_locked_by_other_replica(
+        self, refresher: TokenRefresher, mock_session: MagicMock, mock_oauth: MagicMock
+    ) -> None:
+        mock_session.load_auth.return_value = _auth_state(expires_in=60)
+        mock_session.acquire_refresh_lock.return_value = False
+
+        with (
+            patch("app.core.token_refresher.session", mock_session),
+            patch("app.core.token_refresher.oauth", mock_oauth),
+        ):
+            refreshed = await refresher.refresh_session("session-1")
+
+        assert refreshed is False
+        mock_oauth.oidc.fetch_access_token.assert_not_called()
+
+    async def test_skips_session_refreshed_before_the_lock_was_free(
+        self, refresher: TokenRefresher, mock_session: MagicMock, mock_oauth: MagicMock
+    ) -> None:
+        # A request refreshed the tokens while this pass waited for the lock
+        mock_session.load_auth.side_effect = [_auth_state(expires_in=60), _auth_state(expires_in=3600)]
+
+        with (
+            patch("app.core.token_refresher.session", mock_session),
+            patch("app.core.token_refresher.oauth", mock_oauth),
+        ):
+            refreshed = await refresher.refresh_session("session-1")
+
+        assert refreshed is False
+        mock_oauth.oidc.fetch_access_token.assert_not_called()
+        mock_session.release_refresh_lock.assert_called_once_with("session-1")
+
+    async def test_forgets_session_without_refresh_token(
+        self, refresher: TokenRefresher, mock_session: MagicMock, mock_oauth: MagicMock
+    ) -> None:
+        mock_session.load_auth.return_value = _auth_state(expires_in=60, refresh_token=None)
+
+        with (
+            patch("app.core.token_refresher.session", mock_session),
+            patch("app.core.token_refresher.oauth", mock_oauth),
+        ):
+            refreshed = await refresher.refresh_session("session-1")
+
+        assert refreshed is False
+        mock_session.forget_session.assert_called_once_with("session-1")
+
+    async def test_session_cleared_during_refresh_is_not_revived(
+        self, refresher: TokenRefresher, mock_session: MagicMock, mock_oauth: MagicMock
+    ) -> None:
+        mock_session.load_auth.return_value = _auth_state(expires_in=60)
+        mock_session.replace_auth.return_value = False
+        prefetch = AsyncMock()
+
+        with (
+            patch("app.core.token_refresher.session", mock_session),
+            patch("app.core.token_refresher.oauth", mock_oauth),
+            patch("app.core.token_refresher.prefetch_tokens", prefetch),
+        ):
+            refreshed = await refresher.refresh_session("session-1")
+
+        assert refreshed is False
+        prefetch.assert_not_called()
+        mock_session.forget_session.assert_called_once_with("session-1")
+
+    async def test_run_once_continues_after_failure(
+        self, refresher: TokenRefresher, mock_session: MagicMock, mock_oauth: MagicMock
+    ) -> None:
+        mock_session.get_active_session_ids.return_value = ["session-1", "session-2"]
+        mock_session.load_auth.return_value = _auth_state(expires_in=60)
+        mock_oauth.oidc.fetch_access_token.side_effect = [
+            Exception("invalid_grant: Token is not active"),
+            {"access_token": "new-access-token", "expires_at": int(time.time()) + 300},
+        ]
+
+        with (
+            patch("app.core.token_refresher.session", mock_session),
+            patch("app.core.token_refresher.oauth", mock_oauth),
+        ):
+            refreshed = await refresher.run_once()
+
+        assert refreshed == 1
+        mock_session.forget_session.assert_called_once()
+
+    async def test_prefetch_holds_the_refresh_slot(self, mock_session: MagicMock, mock_oauth: MagicMock) -> None:
+        refresher = TokenRefresher(interval=30, lead_time=120, jitter=0, active_window=900, concurrency=1)
+        mock_session.get_active_session_ids.return_value = ["session-1", "session-2"]
+        mock_session.load_auth.side_effect = lambda session_id: _auth_state(expires_in=60)
+        slot_held: list[bool] = []
+
+        async def prefetch(session_id: str, access_token: str) -> None:
+            slot_held.append(refresher._semaphore.locked())
+
+        with (
+            patch("app.core.token_refresher.session", mock_session),
+            patch("app.core.token_refresher.oauth", mock_oauth),
+            patch("app.core.token_refresher.prefetch_tokens", side_effect=prefetch),
+        ):
+            refreshed = await refresher.run_once()
+
+        assert refreshed == 2
+        assert slot_held == [True, True]
+
+    async def test_start_and_stop(self, refresher: TokenRefresher) -> None:
+        refresher.start()
+        assert refresher._task is not None
+
+        await refresher.stop()
+        assert refresher._task is None
@@ -0,0 +1,92 @@
+"""Tests for OpenTelemetry tracing, using an in-memory exporter."""
+
+from collections.abc import Generator
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from app.clients.docs import DocsClient
+from app.core.http_clients import add_request_id_header
+from app.core.redis import InstrumentedRedis
+from app.core.tracing import setup_tracing, shutdown_tracing, span, start_span, tracing_enabled
+from app.middleware.tracing import TracedMiddleware, TracingMiddleware
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from starlette.middleware.gzip import GZipMiddleware
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+@pytest.fixture
+def exporter() -> Generator[InMemorySpanExporter]:
+    exporter = InMemorySpanExporter()
+    assert setup_tracing(exporter, sample_ratio=1.0, batch=False)
+    yield exporter
+    shutdown_tracing()
+
+
+def test_disabled_tracing_is_a_no_op() -> None:
+    assert not tracing_enabled()
+    with span("ignored"):
+        pass
+    assert start_span("ignored") is None
+
+
+def test_spans_nest(exporter: InMemorySpanExporter) -> None:
+    with span("outer"), span("inner", audience="docs"):
+        pass
+
+    inner, outer = exporter.get_finished_spans()
+    assert inner.name == "inner"
+    assert inner.attributes == {"audience": "docs"}
+    assert inner.parent is not None
+    assert inner.parent.span_id == outer.context.span_id
+
+
+async def test_traceparent_is_propagated_to_backends(exporter: InMemorySpanExporter) -> None:
+    request = httpx.Request("GET", "https://docs.example.com/api")
+
+    with span("Docs"):
+        await add_request_id_header(request)
+
+    (docs_span,) = exporter.get_finished_spans()
+    expected = f"00-{docs_span.context.trace_id:032x}-{docs_span.context.span_id:016x}-"
+    assert request.headers["traceparent"].startswith(expected)
+
+
+async def test_client_and_redis_calls_are_traced(exporter: InMemorySpanExporter) -> None:
+    http_client = AsyncMock(spec=httpx.AsyncClient)
+    http_client.get.return_value = Mock(status_code=200, headers={}, json=Mock(return_value={"results": []}))
+    client = DocsClient(http_client=http_client, base_url="https://docs.example.com", token="token")
+
+    with patch("redis.asyncio.Redis.execute_command", AsyncMock(return_value=None)):
+        await InstrumentedRedis().get("auth:session")
+    await client.get_documents()
+
+    assert [finished.name for finished in exporter.get_finished_spans()] == ["redis GET", "Docs", "Docs validate"]
+
+
+def test_request_span_continues_incoming_trace(exporter: InMemorySpanExporter) -> None:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> dict[str, int]:
+        with span("handler"):
+            return {"id": item_id}
+
+    app.add_middleware(TracedMiddleware, middleware=GZipMiddleware)
+    app.add_middleware(TracingMiddleware)
+
+    response = TestClient(app).get("/items/42", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+
+    assert response.status_code == 200
+    handler, middleware, request = exporter.get_finished_spans()
+    assert request.name == "GET /items/{item_id}"
+    assert request.context.trace_id == int(TRACE_ID, 16)
+    assert request.attributes is not None
+    assert request.attributes["http.response.status_code"] == 200
+    assert middleware.name == "GZipMiddleware"
+    assert middleware.parent is not None
+    assert middleware.parent.span_id == request.context.span_id
+    assert handler.context.trace_id == int(TRACE_ID, 16)
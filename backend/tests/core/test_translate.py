@@ -0,0 +1,86 @@
+"""Tests for translation catalogs and Accept-Language negotiation."""
+
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from app.core import translate
+from app.core.translate import (
+    _,
+    get_catalog,
+    load_catalogs,
+    negotiate_locale,
+    normalize_locale,
+    parse_accept_language,
+    set_locale,
+)
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import write_mo
+from fastapi import Request
+
+
+@pytest.fixture
+def locales_dir(tmp_path: Path) -> Generator[Path]:
+    """Compile a Dutch catalog into a temporary locales directory and load it."""
+    catalog = Catalog(locale="nl_NL")
+    catalog.add("Invalid access token", "Ongeldig toegangstoken")
+    mo_file = tmp_path / "nl_NL" / "LC_MESSAGES" / "messages.mo"
+    mo_file.parent.mkdir(parents=True)
+    with mo_file.open("wb") as fp:
+        write_mo(fp, catalog)
+
+    load_catalogs(tmp_path)
+    yield tmp_path
+    load_catalogs()
+
+
+def _request(accept_language: str) -> Request:
+    request = MagicMock(spec=Request)
+    request.headers = {"Accept-Language": accept_language}
+    return request
+
+
+class TestAcceptLanguage:
+    def test_normalize_locale(self) -> None:
+        assert normalize_locale("nl-nl") == "nl_NL"
+        assert normalize_locale(" EN ") == "en"
+
+    def test_parse_orders_by_quality(self) -> None:
+        assert parse_accept_language("en;q=0.5, nl-NL, fr;q=0.8, de;q=0") == ("nl_NL", "fr", "en")
+
+    def test_parse_ignores_wildcard_and_invalid_quality(self) -> None:
+        assert parse_accept_language("*, en;q=abc, nl") == ("nl",)
+
+    def test_negotiate_falls_back_to_language(self, locales_dir: Path) -> None:
+        assert negotiate_locale("fr, nl;q=0.9") == "nl_NL"
+        assert negotiate_locale("nl-BE") == "nl_NL"
+        assert negotiate_locale("fr-FR, de;q=0.9") is None
+
+    def test_negotiate_source_locale(self, locales_dir: Path) -> None:
+        assert negotiate_locale("en-US,en;q=0.9,nl;q=0.8") == "en_US"
+        assert negotiate_locale("en-GB, nl;q=0.5") == "en_US"
+
+
+class TestCatalogs:
+    def test_load_catalogs_finds_shipped_locales(self, locales_dir: Path) -> None:
+        assert load_catalogs(locales_dir) == frozenset({"nl_NL", "en_US"})
+
+    async def test_set_locale_uses_preloaded_catalog(self, locales_dir: Path) -> None:
+        await set_locale(_request("nl-NL,nl;q=0.9,en;q=0.8"))
+
+        assert _("Invalid access token") == "Ongeldig toegangstoken"
+
+    async def test_set_locale_without_match(self, locales_dir: Path) -> None:
+        await set_locale(_request("en-US"))
+
+        assert _("Invalid access token") == "Invalid access token"
+
+    async def test_set_locale_prefers_english(self, locales_dir: Path) -> None:
+        await set_locale(_request("en-US,en;q=0.9,nl;q=0.8"))
+
+        assert _("Invalid access token") == "Invalid access token"
+
+    def test_source_locale_has_no_catalog(self, locales_dir: Path) -> None:
+        assert get_catalog("en_US") is translate._fallback
+        assert get_catalog(None) is translate._fallback
@@ -0,0 +1,59 @@
+"""Tests for the bounded in-process cache with expiring entries."""
+
+from unittest.mock import patch
+
+from app.core.ttl_cache import TTLCache
+
+
+def test_get_returns_fresh_values_by_key() -> None:
+    cache = TTLCache[tuple[str, int], list[str]](ttl=60, max_entries=10)
+    cache.put(("user-1", 1), ["a"])
+
+    assert cache.get(("user-1", 1)) == ["a"]
+    assert cache.get(("user-1", 2)) is None
+    assert cache.get(("user-2", 1)) is None
+
+
+def test_stale_entries_are_dropped() -> None:
+    cache = TTLCache[str, str](ttl=60, max_entries=10)
+    with patch("app.core.ttl_cache.time.monotonic", return_value=1000.0):
+        cache.put("key", "value")
+
+    with patch("app.core.ttl_cache.time.monotonic", return_value=1061.0):
+        assert cache.get("key") is None
+        assert cache.entry("key") is None
+
+
+def test_entry_is_kept_when_stale() -> None:
+    cache = TTLCache[str, str](ttl=60, max_entries=10)
+    with patch("app.core.ttl_cache.time.monotonic", return_value=1000.0):
+        cache.put("key", "value")
+
+    entry = cache.entry("key")
+    assert entry is not None
+    with patch("app.core.ttl_cache.time.monotonic", return_value=1059.0):
+        assert entry.is_fresh(cache.ttl) is True
+    with patch("app.core.ttl_cache.time.monotonic", return_value=1061.0):
+        assert entry.is_fresh(cache.ttl) is False
+        assert cache.entry("key") is entry
+
+
+def test_age_counts_toward_the_ttl() -> None:
+    cache = TTLCache[str, str](ttl=60, max_entries=10)
+    cache.put("old", "value", age=61)
+    cache.put("recent", "value", age=30)
+
+    assert cache.get("old") is None
+    assert cache.get("recent") == "value"
+
+
+def test_least_recently_used_entry_is_dropped() -> None:
+    cache = TTLCache[str, str](ttl=60, max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
@@ -0,0 +1,103 @@
+"""Tests for search-as-you-type support."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.core.typeahead import InFlightSearches, is_complete, load_prefix_results, save_prefix_results
+from app.models.search import SearchHit, SearchResponse
+
+
+def _response(*titles: str, sources: dict[str, str] | None = None) -> SearchResponse:
+    return SearchResponse.model_validate(
+        {"results": [{"source": "docs", "title": title} for title in titles], "sources": sources or {"docs": "ok"}}
+    )
+
+
+class TestInFlightSearches:
+    async def test_newer_search_supersedes_older(self) -> None:
+        searches = InFlightSearches()
+        started = asyncio.Event()
+
+        async def slow() -> str:
+            started.set()
+            await asyncio.sleep(5)
+            return "slow"
+
+        async def fast() -> str:
+            return "fast"
+
+        older = asyncio.create_task(searches.run("session-1", slow()))
+        await started.wait()
+        newer = await searches.run("session-1", fast())
+
+        assert newer == "fast"
+        assert await older is None
+
+    async def test_other_sessions_are_not_affected(self) -> None:
+        searches = InFlightSearches()
+
+        async def result(value: str) -> str:
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(searches.run("session-1", result("a")), searches.run("session-2", result("b")))
+
+        assert results == ["a", "b"]
+
+    async def test_cancelling_the_request_cancels_the_search(self) -> None:
+        searches = InFlightSearches()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow() -> None:
+            started.set()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        request = asyncio.create_task(searches.run("session-1", slow()))
+        await started.wait()
+        request.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+
+
+class TestPrefixCache:
+    def test_is_complete(self) -> None:
+        assert is_complete(_response("a", "b"), limit=5) is True
+        assert is_complete(_response("a", "b"), limit=2) is False
+        assert is_complete(_response("a", sources={"docs": "ok", "ocs": "timeout"}), limit=5) is False
+
+    async def test_longest_cached_prefix_is_filtered_locally(self) -> None:
+        redis_client = MagicMock()
+        redis_client.mget = AsyncMock(return_value=[None, _response("Rapport Q1", "Rappel").model_dump_json(), None])
+
+        with patch("app.core.typeahead.get_redis_client", return_value=redis_client):
+            response = await load_prefix_results("user-1", "Rappo")
+
+        assert response is not None
+        assert [hit.title for hit in response.results] == ["Rapport Q1"]
+        keys = redis_client.mget.call_args[0][0]
+        assert keys == [f"search:typeahead:user-1:{prefix}" for prefix in ("rappo", "rapp", "rap", "ra")]
+
+    async def test_cache_miss(self) -> None:
+        redis_client = MagicMock()
+        redis_client.mget = AsyncMock(return_value=[None, None])
+
+        with patch("app.core.typeahead.get_redis_client", return_value=redis_client):
+            assert await load_prefix_results("user-1", "ra") is None
+
+    async def test_short_terms_are_not_cached(self) -> None:
+        redis_client = MagicMock()
+        redis_client.set = AsyncMock()
+
+        with patch("app.core.typeahead.get_redis_client", return_value=redis_client):
+            await save_prefix_results("user-1", "r", SearchResponse(results=[SearchHit(source="docs", title="r")]))
+
+        redis_client.set.assert_not_called()
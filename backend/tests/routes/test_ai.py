@@ -1,5 +1,6 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, patch
 
+from app.core.ai_admission import AIAdmission
 from fastapi.testclient import TestClient
 
 
@@ -27,6 +28,17 @@ class TestAIChatCompletions:
         data = response.json()
         assert "AI service is not configured" in data["msg"]
 
+    @patch("app.core.config.settings.AI_URL", "https://api.test.com")
+    @patch("app.core.config.settings.AI_MODEL", "test-model")
+    @patch("app.core.config.settings.AI_API_KEY", "test-key")
+    def test_chat_completions_queue_full(self, authenticated_client: TestClient) -> None:
+        """Test that endpoint returns 429 when no stream slot is free and the queue is full."""
+        with patch("app.routes.ai.ai_admission", AIAdmission(max_streams=0, max_streams_per_user=1, queue_size=0)):
+            response = authenticated_client.post("/api/v1/ai/chat/completions", json={"prompt": "Hello, world!"})
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "5"
+
     def test_chat_completions_invalid_request_body(self, authenticated_client: TestClient) -> None:
         """Test that endpoint returns 422 for invalid request body."""
         # Missing required prompt field
@@ -40,8 +52,8 @@ class TestAIChatCompletions:
     @patch("app.core.config.settings.AI_URL", "https://api.test.com")
     @patch("app.core.config.settings.AI_MODEL", "test-model")
     @patch("app.core.config.settings.AI_API_KEY", "test-key")
-    @patch("app.clients.ai.AIClient.stream_response")
-    def test_chat_completions_success(self, mock_stream_response: MagicMock, authenticated_client: TestClient) -> None:
+    @patch("app.clients.ai.AIClient.start_stream")
+    def test_chat_completions_success(self, mock_start_stream: AsyncMock, authenticated_client: TestClient) -> None:
         """Test successful chat completions request."""
 
         # Mock the streaming response
@@ -50,70 +62,68 @@ class TestAIChatCompletions:
             yield '{"id": "test-2", "content": " there!", "finish_reason": null}\n\n'
             yield '{"id": "test-3", "content": null, "finish_reason": "stop"}\n\n'
 
-        mock_stream_response.return_value = mock_stream()
+        mock_start_stream.return_value = (mock_stream(), None)
 
         response = authenticated_client.post("/api/v1/ai/chat/completions", json={"prompt": "Hello, world!"})
 
         assert response.status_code == 200
         assert response.headers["content-type"] == "text/event-stream; charset=utf-8"
 
-        # Check that AIClient.stream_response was called with the correct request
-        mock_stream_response.assert_called_once()
-        call_args = mock_stream_response.call_args[1]
+        # Check that AIClient.start_stream was called with the correct request
+        mock_start_stream.assert_called_once()
+        call_args = mock_start_stream.call_args[1]
         assert call_args["chat_request"].prompt == "Hello, world!"
 
     @patch("app.core.config.settings.AI_URL", "https://api.test.com")
     @patch("app.core.config.settings.AI_MODEL", "test-model")
     @patch("app.core.config.settings.AI_API_KEY", "test-key")
-    @patch("app.clients.ai.AIClient.stream_response")
+    @patch("app.clients.ai.AIClient.start_stream")
     def test_chat_completions_empty_prompt(
-        self, mock_stream_response: MagicMock, authenticated_client: TestClient
+        self, mock_start_stream: AsyncMock, authenticated_client: TestClient
     ) -> None:
         """Test chat completions with empty prompt."""
 
         async def mock_stream():
             yield '{"id": "test-1", "content": "Please provide a prompt.", "finish_reason": "stop"}\n\n'
 
-        mock_stream_response.return_value = mock_stream()
+        mock_start_stream.return_value = (mock_stream(), None)
 
         response = authenticated_client.post("/api/v1/ai/chat/completions", json={"prompt": ""})
 
         assert response.status_code == 200
-        mock_stream_response.assert_called_once()
+        mock_start_stream.assert_called_once()
 
     @patch("app.core.config.settings.AI_MODEL", "test-model")
     @patch("app.core.config.settings.AI_URL", "https://api.test.com")
     @patch("app.core.config.settings.AI_API_KEY", "test-key")
-    @patch("app.clients.ai.AIClient.stream_response")
-    def test_chat_completions_long_prompt(
-        self, mock_stream_response: MagicMock, authenticated_client: TestClient
-    ) -> None:
+    @patch("app.clients.ai.AIClient.start_stream")
+    def test_chat_completions_long_prompt(self, mock_start_stream: AsyncMock, authenticated_client: TestClient) -> None:
         """Test chat completions with a long prompt."""
         long_prompt = "What is the meaning of life? " * 100  # Very long prompt
 
         async def mock_stream():
             yield '{"id": "test-1", "content": "That is a complex question.", "finish_reason": "stop"}\n\n'
 
-        mock_stream_response.return_value = mock_stream()
+        mock_start_stream.return_value = (mock_stream(), None)
 
         response = authenticated_client.post("/api/v1/ai/chat/completions", json={"prompt": long_prompt})
 
         assert response.status_code == 200
-        mock_stream_response.assert_called_once()
-        call_args = mock_stream_response.call_args[1]
+        mock_start_stream.assert_called_once()
+        call_args = mock_start_stream.call_args[1]
         assert call_args["chat_request"].prompt == long_prompt
 
     @patch("app.core.config.settings.AI_MODEL", "test-model")
     @patch("app.core.config.settings.AI_URL", "https://api.test.com")
     @patch("app.core.config.settings.AI_API_KEY", "test-key")
-    @patch("app.clients.ai.AIClient.stream_response")
+    @patch("app.clients.ai.AIClient.start_stream")
     def test_chat_completions_ai_connection_error(
-        self, mock_stream_response: MagicMock, authenticated_client: TestClient
+        self, mock_start_stream: AsyncMock, authenticated_client: TestClient
     ) -> None:
         """Test chat completions when AI service has connection error."""
         from app.exceptions import ExternalServiceError
 
-        mock_stream_response.side_effect = ExternalServiceError("AI", "Connection failed")
+        mock_start_stream.side_effect = ExternalServiceError("AI", "Connection failed")
 
         response = authenticated_client.post("/api/v1/ai/chat/completions", json={"prompt": "Hello, world!"})
 
@@ -124,14 +134,14 @@ class TestAIChatCompletions:
     @patch("app.core.config.settings.AI_MODEL", "test-model")
     @patch("app.core.config.settings.AI_URL", "https://api.test.com")
     @patch("app.core.config.settings.AI_API_KEY", "test-key")
-    @patch("app.clients.ai.AIClient.stream_response")
+    @patch("app.clients.ai.AIClient.start_stream")
     def test_chat_completions_ai_auth_error(
-        self, mock_stream_response: MagicMock, authenticated_client: TestClient
+        self, mock_start_stream: AsyncMock, authenticated_client: TestClient
     ) -> None:
         """Test chat completions when AI service has authentication error."""
         from app.exceptions import ExternalServiceError
 
-        mock_stream_response.side_effect = ExternalServiceError("AI", "Authentication failed")
+        mock_start_stream.side_effect = ExternalServiceError("AI", "Authentication failed")
 
         response = authenticated_client.post("/api/v1/ai/chat/completions", json={"prompt": "Hello, world!"})
 
@@ -144,20 +154,20 @@ class TestAIChatCompletions:
     @patch("app.core.config.settings.AI_API_KEY", "test-key")
     def test_chat_completions_special_characters(self, authenticated_client: TestClient) -> None:
         """Test chat completions with special characters in prompt."""
-        with patch("app.clients.ai.AIClient.stream_response") as mock_stream_response:
+        with patch("app.clients.ai.AIClient.start_stream") as mock_start_stream:
 
             async def mock_stream():
                 yield '{"id": "test-1", "content": "I understand special chars.", "finish_reason": "stop"}\n\n'
 
-            mock_stream_response.return_value = mock_stream()
+            mock_start_stream.return_value = (mock_stream(), None)
 
             special_prompt = "Hello! How are you? 🤖 What about émojis and ñoñó?"
 
             response = authenticated_client.post("/api/v1/ai/chat/completions", json={"prompt": special_prompt})
 
             assert response.status_code == 200
-            mock_stream_response.assert_called_once()
-            call_args = mock_stream_response.call_args[1]
+            mock_start_stream.assert_called_once()
+            call_args = mock_start_stream.call_args[1]
             assert call_args["chat_request"].prompt == special_prompt
 
     @patch("app.core.config.settings.AI_MODEL", "test-model")
@@ -165,7 +175,7 @@ class TestAIChatCompletions:
     @patch("app.core.config.settings.AI_API_KEY", "test-key")
     def test_chat_completions_response_format(self, authenticated_client: TestClient) -> None:
         """Test that the response format is correct for streaming."""
-        with patch("app.clients.ai.AIClient.stream_response") as mock_stream_response:
+        with patch("app.clients.ai.AIClient.start_stream") as mock_start_stream:
 
             async def mock_stream():
                 yield '{"id": "test-1", "content": "Hello", "finish_reason": null}\n\n'
@@ -173,7 +183,7 @@ class TestAIChatCompletions:
                 yield '{"id": "test-3", "content": "!", "finish_reason": null}\n\n'
                 yield '{"id": "test-4", "content": null, "finish_reason": "stop"}\n\n'
 
-            mock_stream_response.return_value = mock_stream()
+            mock_start_stream.return_value = (mock_stream(), None)
 
             response = authenticated_client.post("/api/v1/ai/chat/completions", json={"prompt": "Say hello world"})
 
@@ -1,10 +1,10 @@
 """Tests for the CalDAV endpoints."""
 
-from datetime import datetime
-from unittest.mock import MagicMock, patch
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.models.calendar import Calendar
-from app.models.task import Task
+from app.models.task import Task, TaskPage
 from fastapi.testclient import TestClient
 
 
@@ -48,7 +48,7 @@ class TestCaldavEndpoints:
         mock_get_token.return_value = "test-caldav-token"
 
         # Mock CaldavClient
-        mock_client_instance = MagicMock()
+        mock_client_instance = AsyncMock()
         mock_client_instance.get_calendars.return_value = [
             Calendar(
                 title="Team Meeting",
@@ -76,7 +76,7 @@ class TestCaldavEndpoints:
         assert data[1]["end"] == "2024-11-01T15:30:00"
 
         # Verify CaldavClient was called correctly
-        mock_client_instance.get_calendars.assert_called_once_with(check_date=datetime(2024, 11, 1, 0, 0, 0))
+        mock_client_instance.get_calendars.assert_called_once_with(check_date=date(2024, 11, 1))
 
     @patch("app.routes.caldav.settings.TASK_URL", "https://caldav.example.com")
     @patch("app.routes.caldav.settings.TASK_AUDIENCE", "caldav")
@@ -93,35 +93,41 @@ class TestCaldavEndpoints:
         mock_get_token.return_value = "test-caldav-token"
 
         # Mock CaldavClient
-        mock_client_instance = MagicMock()
-        mock_client_instance.get_tasks.return_value = [
-            Task(
-                title="Complete project documentation",
-                start=datetime(2024, 11, 1, 9, 0, 0),
-                end=datetime(2024, 11, 5, 17, 0, 0),
-            ),
-            Task(
-                title="Review pull requests",
-                start=None,
-                end=datetime(2024, 11, 2, 12, 0, 0),
-            ),
-        ]
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get_tasks.return_value = TaskPage(
+            results=[
+                Task(
+                    title="Review pull requests",
+                    start=None,
+                    end=datetime(2024, 11, 2, 12, 0, 0),
+                ),
+                Task(
+                    title="Complete project documentation",
+                    start=datetime(2024, 11, 1, 9, 0, 0),
+                    end=datetime(2024, 11, 5, 17, 0, 0),
+                ),
+            ],
+            next_cursor="next-page",
+        )
         mock_caldav_client.return_value = mock_client_instance
 
-        response = authenticated_client.get("/api/v1/caldav/tasks")
+        response = authenticated_client.get("/api/v1/caldav/tasks?limit=2&due_before=2024-12-01T00:00:00")
 
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 2
-        assert data[0]["title"] == "Complete project documentation"
-        assert data[0]["start"] == "2024-11-01T09:00:00"
-        assert data[0]["end"] == "2024-11-05T17:00:00"
-        assert data[1]["title"] == "Review pull requests"
-        assert data[1]["start"] is None
-        assert data[1]["end"] == "2024-11-02T12:00:00"
+        assert len(data["results"]) == 2
+        assert data["results"][0]["title"] == "Review pull requests"
+        assert data["results"][0]["start"] is None
+        assert data["results"][0]["end"] == "2024-11-02T12:00:00"
+        assert data["results"][1]["title"] == "Complete project documentation"
+        assert data["results"][1]["start"] == "2024-11-01T09:00:00"
+        assert data["results"][1]["end"] == "2024-11-05T17:00:00"
+        assert data["next_cursor"] == "next-page"
 
         # Verify CaldavClient was called correctly
-        mock_client_instance.get_tasks.assert_called_once()
+        mock_client_instance.get_tasks.assert_called_once_with(
+            limit=2, cursor=None, due_before=datetime(2024, 12, 1, 0, 0, 0)
+        )
 
     @patch("app.routes.caldav.settings.TASK_URL", "https://caldav.example.com")
     @patch("app.routes.caldav.settings.TASK_AUDIENCE", "caldav")
@@ -138,7 +144,7 @@ class TestCaldavEndpoints:
         mock_get_token.return_value = "test-caldav-token"
 
         # Mock CaldavClient
-        mock_client_instance = MagicMock()
+        mock_client_instance = AsyncMock()
         mock_client_instance.get_calendars.return_value = []
         mock_caldav_client.return_value = mock_client_instance
 
@@ -163,15 +169,56 @@ class TestCaldavEndpoints:
         mock_get_token.return_value = "test-caldav-token"
 
         # Mock CaldavClient
-        mock_client_instance = MagicMock()
-        mock_client_instance.get_tasks.return_value = []
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get_tasks.return_value = TaskPage(results=[])
         mock_caldav_client.return_value = mock_client_instance
 
         response = authenticated_client.get("/api/v1/caldav/tasks")
 
         assert response.status_code == 200
         data = response.json()
-        assert data == []
+        assert data == {"results": [], "next_cursor": None}
+
+    @patch("app.routes.caldav.settings.TASK_URL", "https://caldav.example.com")
+    @patch("app.routes.caldav.settings.TASK_AUDIENCE", "caldav")
+    @patch("app.routes.caldav.get_token")
+    @patch("app.routes.caldav.CaldavClient")
+    def test_caldav_calendar_range(
+        self,
+        mock_caldav_client: MagicMock,
+        mock_get_token: MagicMock,
+        authenticated_client: TestClient,
+    ) -> None:
+        """Test calendar events for a range of days, cached per user."""
+        mock_get_token.return_value = "test-caldav-token"
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get_events.return_value = [
+            Calendar(title="Standup", start=datetime(2024, 11, 4, 9, 0, 0), end=datetime(2024, 11, 4, 9, 15, 0)),
+        ]
+        mock_caldav_client.return_value = mock_client_instance
+
+        response = authenticated_client.get("/api/v1/caldav/calendars?start=2024-11-04&end=2024-11-10")
+
+        assert response.status_code == 200
+        assert response.json()[0]["title"] == "Standup"
+        mock_client_instance.get_events.assert_called_once_with(date(2024, 11, 4), date(2024, 11, 10))
+        assert mock_caldav_client.call_args.kwargs["cache_key"] == "test-user-123"
+
+    def test_caldav_calendar_range_end_before_start(self, authenticated_client: TestClient) -> None:
+        """Test calendar range endpoint with the end before the start."""
+        response = authenticated_client.get("/api/v1/caldav/calendars?start=2024-11-10&end=2024-11-04")
+        assert response.status_code == 400
+
+    @patch("app.routes.caldav.settings.CALDAV_MAX_RANGE_DAYS", 7)
+    def test_caldav_calendar_range_too_long(self, authenticated_client: TestClient) -> None:
+        """Test calendar range endpoint with more days than allowed."""
+        response = authenticated_client.get("/api/v1/caldav/calendars?start=2024-11-04&end=2024-11-11")
+        assert response.status_code == 400
+
+    def test_caldav_tasks_invalid_limit(self, authenticated_client: TestClient) -> None:
+        """Test tasks endpoint with a limit below 1."""
+        response = authenticated_client.get("/api/v1/caldav/tasks?limit=0")
+        assert response.status_code == 400
 
     def test_caldav_calendar_invalid_date_format(self, authenticated_client: TestClient) -> None:
         """Test calendar endpoint with invalid date format."""
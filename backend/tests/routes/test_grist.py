@@ -347,3 +347,35 @@ class TestGristEndpoints:
         response = authenticated_client.get("/api/v1/grist/docs?organization_id=999")
 
         assert response.status_code == 502  # ExternalServiceError returns 502
+
+    @patch("app.routes.grist.settings.GRIST_URL", "https://grist.example.com")
+    @patch("app.routes.grist.get_token")
+    @patch("app.routes.grist.GristClient")
+    def test_grist_recent_docs(
+        self,
+        mock_grist_client: MagicMock,
+        mock_get_token: AsyncMock,
+        authenticated_client: TestClient,
+    ) -> None:
+        """Test the overview of recent documents across organizations."""
+        mock_get_token.return_value = "test-grist-token"
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get_recent_documents.return_value = [
+            GristDocument(
+                id="doc1",
+                name="Document 1",
+                access="owners",
+                is_pinned=False,
+                url_id="url-doc1",
+                created_at="2024-01-01T10:00:00Z",
+                updated_at="2024-01-20T10:00:00Z",
+            )
+        ]
+        mock_grist_client.return_value = mock_client_instance
+
+        response = authenticated_client.get("/api/v1/grist/docs/recent?limit=3")
+
+        assert response.status_code == 200
+        assert [doc["id"] for doc in response.json()] == ["doc1"]
+        mock_client_instance.get_recent_documents.assert_called_once_with(limit=3, concurrency=4)
+        assert mock_grist_client.call_args[1]["cache_key"] == "test-user-123"
@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from app.core.readiness import CheckResult
 from fastapi.testclient import TestClient
 
 
@@ -16,3 +19,13 @@ def test_health_get_liveness(client: TestClient) -> None:
     response = client.get("/liveness")
 
     assert response.status_code == 204
+
+
+def test_health_get_readiness_unavailable(client: TestClient) -> None:
+    with patch("app.core.readiness.readiness_monitor.results", {"redis": CheckResult(False, True, 2.0, "timeout")}):
+        response = client.get("/readiness")
+
+    assert response.status_code == 503
+    assert response.json() == {
+        "checks": {"redis": {"ok": False, "required": True, "duration_ms": 2.0, "error": "timeout"}}
+    }
@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+
+
+def test_metrics_exposes_request_latency_by_route(client: TestClient) -> None:
+    client.get("/liveness")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'bureaublad_http_request_duration_seconds_count{method="GET",route="/liveness",status="204"}' in response.text
+    )
+    assert "bureaublad_ai_streams_in_flight 0" in response.text
+
+
+def test_metrics_labels_unmatched_paths(client: TestClient) -> None:
+    client.get("/does-not-exist/12345")
+
+    response = client.get("/metrics")
+
+    assert 'route="unmatched",status="404"' in response.text
+    assert "12345" not in response.text
@@ -0,0 +1,137 @@
+"""Tests for the unified search endpoint."""
+
+import json
+from base64 import b64encode
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.config import settings
+from app.models.activity import FileActivity, FileActivityResponse, FileInfo
+from app.models.conversation import Conversation
+from app.models.note import Note
+from app.models.pagination import PaginatedResponse
+from app.models.search import SearchHit, SearchResponse
+from fastapi.testclient import TestClient
+from itsdangerous import TimestampSigner
+
+
+def session_cookie(session_id: str) -> str:
+    """Signed session cookie, as the session middleware sets it after login."""
+    data = b64encode(json.dumps({"session_id": session_id}).encode())
+    return TimestampSigner(settings.SECRET_KEY).sign(data).decode()
+
+
+class TestSearchEndpoint:
+    def test_search_requires_auth(self, fresh_client: TestClient) -> None:
+        response = fresh_client.get("/api/v1/search?term=report")
+        assert response.status_code == 401
+
+    @patch("app.routes.search.settings.OCS_URL", None)
+    @patch("app.routes.search.settings.DRIVE_URL", None)
+    @patch("app.routes.search.settings.DOCS_URL", "https://docs.example.com")
+    @patch("app.routes.search.settings.CONVERSATION_URL", "https://conversation.example.com")
+    @patch("app.routes.search.get_conversations_client")
+    @patch("app.routes.search.get_docs_client")
+    def test_search_merges_enabled_services(
+        self,
+        mock_get_docs_client: AsyncMock,
+        mock_get_conversations_client: AsyncMock,
+        authenticated_client: TestClient,
+    ) -> None:
+        docs_client = MagicMock()
+        docs_client.get_documents = AsyncMock(
+            return_value=PaginatedResponse[Note](
+                count=1,
+                results=[
+                    Note(
+                        id="1",
+                        created_at="2026-01-01T10:00:00Z",
+                        path="0001",
+                        title="Quarterly report",
+                        updated_at="2026-01-02T10:00:00Z",
+                        user_role="owner",
+                    )
+                ],
+            )
+        )
+        conversations_client = MagicMock()
+        conversations_client.get_chats = AsyncMock(
+            return_value=PaginatedResponse[Conversation](
+                count=1,
+                results=[
+                    Conversation(
+                        id="c1",
+                        title="Report",
+                        created_at="2026-01-01T10:00:00Z",
+                        updated_at="2026-01-01T10:00:00Z",
+                    )
+                ],
+            )
+        )
+        mock_get_docs_client.return_value = docs_client
+        mock_get_conversations_client.return_value = conversations_client
+
+        response = authenticated_client.get("/api/v1/search?term=report&limit=5")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["sources"] == {"docs": "ok", "conversation": "ok"}
+        assert [hit["title"] for hit in data["results"]] == ["Report", "Quarterly report"]
+        assert data["results"][0]["source"] == "conversation"
+        docs_client.get_documents.assert_called_once_with(page_size=5, title="report")
+
+    def test_search_with_blank_term(self, authenticated_client: TestClient) -> None:
+        response = authenticated_client.get("/api/v1/search?term=%20")
+
+        assert response.status_code == 200
+        assert response.json() == {"results": [], "sources": {}, "superseded": False}
+
+    @patch("app.routes.search.settings.OCS_URL", None)
+    @patch("app.routes.search.settings.DRIVE_URL", None)
+    @patch("app.routes.search.settings.CONVERSATION_URL", None)
+    @patch("app.routes.search.settings.DOCS_URL", "https://docs.example.com")
+    @patch("app.routes.search.load_prefix_results", new_callable=AsyncMock)
+    @patch("app.routes.search.fan_out_search", new_callable=AsyncMock)
+    def test_typeahead_answers_from_prefix_cache(
+        self, mock_fan_out: AsyncMock, mock_load_prefix: AsyncMock, authenticated_client: TestClient
+    ) -> None:
+        mock_load_prefix.return_value = SearchResponse(
+            results=[SearchHit(source="docs", title="Rapport"), SearchHit(source="docs", title="Rapport Q1")],
+            sources={"docs": "ok"},
+        )
+
+        response = authenticated_client.get("/api/v1/search?term=rappo&typeahead=true&limit=1")
+
+        assert response.status_code == 200
+        assert [hit["title"] for hit in response.json()["results"]] == ["Rapport"]
+        mock_load_prefix.assert_called_once_with("test-user-123", "rappo")
+        mock_fan_out.assert_not_called()
+
+    @patch("app.routes.search.settings.OCS_URL", "https://nextcloud.example.com")
+    @patch("app.routes.search.settings.DRIVE_URL", None)
+    @patch("app.routes.search.settings.CONVERSATION_URL", None)
+    @patch("app.routes.search.settings.DOCS_URL", None)
+    @patch("app.routes.search.save_prefix_results", new_callable=AsyncMock)
+    @patch("app.routes.search.load_prefix_results", new_callable=AsyncMock, return_value=None)
+    @patch("app.routes.search.get_ocs_client")
+    def test_typeahead_does_not_cache_a_full_page(
+        self,
+        mock_get_ocs_client: AsyncMock,
+        mock_load_prefix: AsyncMock,
+        mock_save_prefix: AsyncMock,
+        authenticated_client: TestClient,
+    ) -> None:
+        ocs_client = MagicMock()
+        ocs_client.search_files = AsyncMock(
+            return_value=FileActivityResponse(
+                results=[FileActivity(files=[FileInfo(name=f"Rapport {i}.odt")]) for i in range(2)], last_given=2
+            )
+        )
+        mock_get_ocs_client.return_value = ocs_client
+        authenticated_client.cookies.set("bureaublad_session", session_cookie("session-1"))
+
+        response = authenticated_client.get("/api/v1/search?term=rapp&typeahead=true&limit=2")
+
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 2
+        ocs_client.search_files.assert_called_once_with(term="rapp", limit=2)
+        mock_save_prefix.assert_not_called()
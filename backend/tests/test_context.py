@@ -0,0 +1,50 @@
+"""Tests for per-request span timings."""
+
+import asyncio
+from unittest.mock import patch
+
+from app.context import RequestTimings, span_name, start_request_timings, timed
+from fastapi.testclient import TestClient
+
+
+class TestRequestTimings:
+    def test_span_name(self) -> None:
+        assert span_name("NextCloud OCS") == "nextcloud-ocs"
+        assert span_name("exchange_token") == "exchange_token"
+
+    def test_sums_spans_with_the_same_name(self) -> None:
+        timings = RequestTimings()
+        timings.add("session", 0.001)
+        timings.add("docs", 0.010)
+        timings.add("session", 0.002)
+
+        assert timings.as_milliseconds() == {"session": 3.0, "docs": 10.0}
+        assert timings.server_timing(total_seconds=0.02) == "session;dur=3.0, docs;dur=10.0, total;dur=20.0"
+
+    def test_timed_without_collection_is_a_no_op(self) -> None:
+        with timed("session"):
+            pass
+
+    async def test_spans_in_child_tasks_reach_the_request(self) -> None:
+        timings = start_request_timings()
+
+        async def child() -> None:
+            with timed("docs"):
+                await asyncio.sleep(0)
+
+        await asyncio.gather(child(), child())
+
+        assert set(timings.durations) == {"docs"}
+
+
+def test_server_timing_header(client: TestClient) -> None:
+    with patch("app.middleware.logging.settings.SERVER_TIMING_ENABLED", True):
+        response = client.get("/liveness")
+
+    assert response.headers["Server-Timing"].startswith("total;dur=")
+
+
+def test_server_timing_header_disabled_by_default(client: TestClient) -> None:
+    response = client.get("/liveness")
+
+    assert "Server-Timing" not in response.headers
@@ -0,0 +1,134 @@
+"""Tests for token exchange and the per-session exchanged token cache."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.exceptions import CredentialError
+from app.models.user import AuthState, ExchangedToken, User
+from app.token_exchange import exchange_token, get_token, prefetch_tokens
+from fastapi import Request
+
+
+def _token_response(status_code: int = 200, access_token: str = "exchanged-token") -> MagicMock:  # noqa: S107
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = {"access_token": access_token, "expires_in": 300}
+    return response
+
+
+@pytest.fixture
+def mock_http_client() -> MagicMock:
+    http_client = MagicMock()
+    http_client.post = AsyncMock(return_value=_token_response())
+    return http_client
+
+
+@pytest.fixture
+def mock_request() -> Request:
+    request = MagicMock(spec=Request)
+    request.session = {"session_id": "session-1"}
+    return request
+
+
+@pytest.fixture
+def auth_state() -> AuthState:
+    return AuthState(
+        sub="user123",
+        user=User(name="Test User", email="test@example.com"),
+        access_token="session-access-token",
+        refresh_token="refresh-token",
+        expires_at=int(time.time()) + 3600,
+    )
+
+
+class TestExchangeToken:
+    async def test_exchange_returns_token_with_expiry(self, mock_http_client: MagicMock) -> None:
+        with patch("app.token_exchange.http_client_dependency", AsyncMock(return_value=mock_http_client)):
+            result = await exchange_token(token="access-token", audience="docs")
+
+        assert result.access_token == "exchanged-token"
+        assert result.expires_at >= int(time.time()) + 299
+        assert mock_http_client.post.call_args[1]["data"]["audience"] == "docs"
+
+    async def test_exchange_unauthorized(self, mock_http_client: MagicMock) -> None:
+        mock_http_client.post.return_value = _token_response(status_code=401)
+
+        with (
+            patch("app.token_exchange.http_client_dependency", AsyncMock(return_value=mock_http_client)),
+            pytest.raises(CredentialError),
+        ):
+            await exchange_token(token="access-token", audience="docs")
+
+
+class TestPrefetchTokens:
+    @patch("app.token_exchange._enabled_audiences", return_value={"docs", "drive", "meet"})
+    @patch("app.token_exchange.session")
+    async def test_prefetch_stores_all_successful_exchanges(
+        self, mock_session: MagicMock, mock_audiences: MagicMock
+    ) -> None:
+        mock_session.store_exchanged_tokens = AsyncMock()
+
+        async def fake_exchange(token: str, audience: str) -> ExchangedToken:
+            if audience == "meet":
+                raise CredentialError("Access denied")
+            return ExchangedToken(access_token=f"{audience}-token", expires_at=int(time.time()) + 300)
+
+        with patch("app.token_exchange.exchange_token", side_effect=fake_exchange) as mock_exchange:
+            await prefetch_tokens("session-1", "access-token")
+
+        assert mock_exchange.call_count == 3
+        session_id, tokens = mock_session.store_exchanged_tokens.call_args[0]
+        assert session_id == "session-1"
+        assert set(tokens) == {"docs", "drive"}
+        assert tokens["docs"].access_token == "docs-token"
+
+    @patch("app.token_exchange._enabled_audiences", return_value=set())
+    @patch("app.token_exchange.session")
+    async def test_prefetch_without_enabled_services(self, mock_session: MagicMock, mock_audiences: MagicMock) -> None:
+        mock_session.store_exchanged_tokens = AsyncMock()
+
+        await prefetch_tokens("session-1", "access-token")
+
+        mock_session.store_exchanged_tokens.assert_not_called()
+
+
+class TestGetToken:
+    @patch("app.token_exchange.exchange_token")
+    @patch("app.token_exchange.session")
+    async def test_get_token_uses_cached_token(
+        self, mock_session: MagicMock, mock_exchange: AsyncMock, mock_request: Request, auth_state: AuthState
+    ) -> None:
+        mock_session.get_auth = AsyncMock(return_value=auth_state)
+        mock_session.get_exchanged_token = AsyncMock(return_value="cached-token")
+
+        token = await get_token(mock_request, "docs")
+
+        assert token == "cached-token"
+        mock_session.get_exchanged_token.assert_called_once_with("session-1", "docs")
+        mock_exchange.assert_not_called()
+
+    @patch("app.token_exchange.exchange_token")
+    @patch("app.token_exchange.session")
+    async def test_get_token_exchanges_and_caches_on_miss(
+        self, mock_session: MagicMock, mock_exchange: AsyncMock, mock_request: Request, auth_state: AuthState
+    ) -> None:
+        exchanged = ExchangedToken(access_token="fresh-token", expires_at=int(time.time()) + 300)
+        mock_session.get_auth = AsyncMock(return_value=auth_state)
+        mock_session.get_exchanged_token = AsyncMock(return_value=None)
+        mock_session.store_exchanged_tokens = AsyncMock()
+        mock_exchange.return_value = exchanged
+
+        token = await get_token(mock_request, "docs")
+
+        assert token == "fresh-token"
+        mock_exchange.assert_called_once_with(token="session-access-token", audience="docs")
+        mock_session.store_exchanged_tokens.assert_called_once_with("session-1", {"docs": exchanged})
+
+    @patch("app.token_exchange.session")
+    async def test_get_token_not_authenticated(self, mock_session: MagicMock, mock_request: Request) -> None:
+        mock_session.get_auth = AsyncMock(return_value=None)
+        mock_request.state = MagicMock(spec=[])
+
+        with pytest.raises(CredentialError):
+            await get_token(mock_request, "docs")
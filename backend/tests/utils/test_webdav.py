@@ -0,0 +1,66 @@
+"""Tests for the streaming WebDAV multistatus reader."""
+
+from collections.abc import AsyncIterator
+
+import pytest
+from app.models.activity import FileInfo
+from app.utils.webdav import iter_multistatus_files
+from defusedxml import DefusedXmlException
+
+BASE_URL = "https://nextcloud.example.com"
+BASE_PATH = "/remote.php/dav/files/testuser/"
+
+
+def _response(file_id: int, name: str, status: str = "HTTP/1.1 200 OK") -> str:
+    return (
+        "<d:response>"
+        f"<d:href>{BASE_PATH}Documents/{name}</d:href>"
+        "<d:propstat>"
+        f"<d:prop><d:displayname>{name}</d:displayname><oc:fileid>{file_id}</oc:fileid></d:prop>"
+        f"<d:status>{status}</d:status>"
+        "</d:propstat>"
+        "</d:response>"
+    )
+
+
+def _multistatus(*responses: str) -> bytes:
+    return (
+        '<?xml version="1.0"?><d:multistatus xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">'
+        + "".join(responses)
+        + "</d:multistatus>"
+    ).encode()
+
+
+async def _chunks(body: bytes, size: int = 16) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def _collect(body: bytes) -> list[FileInfo]:
+    return [file async for file in iter_multistatus_files(_chunks(body), BASE_URL, BASE_PATH)]
+
+
+class TestIterMultistatusFiles:
+    """Tests for iter_multistatus_files."""
+
+    async def test_yields_file_info_across_chunks(self) -> None:
+        files = await _collect(_multistatus(_response(1, "a.docx"), _response(2, "b.docx")))
+
+        assert files == [
+            FileInfo(id=1, name="a.docx", path="Documents/a.docx", link=f"{BASE_URL}/f/1"),
+            FileInfo(id=2, name="b.docx", path="Documents/b.docx", link=f"{BASE_URL}/f/2"),
+        ]
+
+    async def test_skips_unsuccessful_propstat(self) -> None:
+        files = await _collect(_multistatus(_response(1, "a.docx", status="HTTP/1.1 404 Not Found")))
+
+        assert files == []
+
+    async def test_rejects_entity_expansion(self) -> None:
+        body = (
+            b'<?xml version="1.0"?><!DOCTYPE d:multistatus [<!ENTITY lol "lol">]>'
+            b'<d:multistatus xmlns:d="DAV:"><d:response><d:href>&lol;</d:href></d:response></d:multistatus>'
+        )
+
+        with pytest.raises(DefusedXmlException):
+            await _collect(body)